@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks 패키지 - 합성 메시지 코퍼스 기반 성능 측정 및 기준선(baseline) 회귀 검사
+"""
+
+from .corpus import make_corpus
+from .fake_llm import FakeLLMClient
+from .suite import BENCHMARKS, run_suite, compare_to_baseline
+
+__all__ = ['make_corpus', 'FakeLLMClient', 'BENCHMARKS', 'run_suite', 'compare_to_baseline']
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+합성 메시지 코퍼스 - collect_messages()가 만드는 공통 포맷과 같은 dict를 생성
+긴급/마감/회의/요청 키워드 비율을 실제 업무 메시지와 비슷하게 섞고, seed로 재현 가능하게 만든다.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+SENDERS = ["김과장", "박대리", "이부장", "최팀장", "정사원", "한책임", "오선임", "윤매니저", "강이사", "조주임"]
+ROOMS = ["개발팀", "기획팀", "디자인", "운영", "영업", "QA", "인프라", "마케팅"]
+
+TEMPLATES = [
+    "내일 오전 {h}시에 팀 미팅 있습니다. 준비해주세요.",
+    "프로젝트 문서 검토 부탁드립니다. {d}까지 피드백 주세요.",
+    "긴급! 서버 장애가 발생했습니다. 즉시 확인 부탁드립니다.",
+    "{d}까지 보고서 제출해주세요. deadline 꼭 지켜주세요.",
+    "점심 메뉴 추천 받습니다 ㅎㅎ",
+    "회의록 공유드립니다. 결정 사항: {topic} 일정 확정, 담당자 지정 필요.",
+    "오늘까지 {topic} 관련 자료 정리 부탁드려요.",
+    "고객사에서 {topic} 요청이 들어왔습니다. 검토 후 회신 부탁드립니다.",
+    "ASAP please review the {topic} PR before the release.",
+    "다음 주 {topic} 일정 조율 가능할까요? 미팅 시간 알려주세요.",
+    "확인했습니다. 감사합니다.",
+    "{topic} 배포 완료했습니다. 이슈 있으면 알려주세요.",
+]
+TOPICS = ["결제 모듈", "로그인 개편", "분기 실적", "신규 온보딩", "API 문서", "마케팅 캠페인", "보안 점검", "데이터 이관"]
+SUBJECTS = ["[공지] 주간 회의", "검토 요청", "긴급 장애 보고", "보고서 제출 안내", "일정 조율", ""]
+
+
+def make_corpus(n: int, seed: int = 42, email_ratio: float = 0.2) -> List[Dict]:
+    """n개의 합성 메시지 생성 (최신순 정렬)"""
+    rng = random.Random(seed)
+    base = datetime(2025, 10, 1, 9, 0, tzinfo=timezone(timedelta(hours=9)))
+    messages = []
+    t = base
+    for i in range(n):
+        t += timedelta(seconds=rng.randint(5, 240))
+        tpl = rng.choice(TEMPLATES)
+        body = tpl.format(h=rng.randint(9, 17), d=f"{rng.randint(1, 12)}월 {rng.randint(1, 28)}일",
+                          topic=rng.choice(TOPICS))
+        if rng.random() < 0.15:
+            body += " " + " ".join(rng.choice(TEMPLATES).format(h=10, d="금요일", topic=rng.choice(TOPICS))
+                                   for _ in range(rng.randint(1, 4)))
+        sender = rng.choice(SENDERS)
+        if rng.random() < email_ratio:
+            messages.append({
+                "msg_id": f"bench_email_{i}",
+                "sender": f"{sender} <{i % 97}@example.com>",
+                "subject": rng.choice(SUBJECTS),
+                "body": body,
+                "content": body,
+                "date": t.isoformat(),
+                "type": "email",
+                "platform": "email",
+            })
+        else:
+            room = rng.choice(ROOMS)
+            messages.append({
+                "msg_id": f"bench_chat_{i}",
+                "sender": sender,
+                "subject": "",
+                "body": body,
+                "content": body,
+                "date": t.isoformat(),
+                "type": "messenger",
+                "platform": room,
+                "room": room,
+            })
+    messages.reverse()
+    return messages
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+프로세스 내 가짜 LLM 클라이언트 - AsyncOpenAI의 chat.completions.create()와 같은 모양
+네트워크 없이 요약 경로의 오버헤드(프롬프트 생성, 동시성 제어, 파싱)만 측정할 때 사용한다.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import Dict, List
+
+from services.canned_llm import estimate_tokens, fake_completion_text
+
+
+class _Stream:
+    """AsyncOpenAI 스트리밍 응답 흉내 (async for chunk in stream)"""
+
+    def __init__(self, text: str, usage, model: str, chunk_size: int = 4, interval: float = 0.0):
+        self.text = text
+        self.usage = usage
+        self.model = model
+        self.chunk_size = chunk_size
+        self.interval = interval
+
+    async def __aiter__(self):
+        for i in range(0, len(self.text), self.chunk_size):
+            if self.interval:
+                await asyncio.sleep(self.interval)
+            delta = SimpleNamespace(content=self.text[i:i + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)], usage=None,
+                                  model=self.model)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason="stop")],
+                              usage=self.usage, model=self.model)
+
+
+class _Completions:
+    def __init__(self, owner: "FakeLLMClient"):
+        self.owner = owner
+
+    async def create(self, model: str = "", messages: List[Dict] = None, **kwargs):
+        self.owner.calls += 1
+        if self.owner.latency:
+            await asyncio.sleep(self.owner.latency)
+        text = fake_completion_text(messages or [])
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages or [])
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=estimate_tokens(text))
+        if kwargs.get("stream"):
+            return _Stream(text, usage, model, interval=self.owner.stream_interval)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text), finish_reason="stop")],
+            usage=usage,
+            model=model,
+        )
+
+
+class FakeLLMClient:
+    """latency초 대기 후 결정적 응답을 돌려주는 가짜 클라이언트"""
+
+    def __init__(self, latency: float = 0.0, stream_interval: float = 0.0):
+        self.latency = latency
+        self.stream_interval = stream_interval  # 스트리밍 조각 사이 간격(초)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
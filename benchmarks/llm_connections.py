@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 연결 재사용 벤치마크 - 같은 요청을 차가운 연결과 따뜻한 연결로 보내 호출당 지연 분포를 비교한다.
+OpenAI 호환 서버가 필요하다. (기본: LLM_CONFIG["mock_base_url"]의 로컬 가짜 서버)
+
+- cold : 호출마다 새 AsyncOpenAI + 연결 풀 (예전처럼 실행마다 요약기/클라이언트를 새로 만들던 경우)
+         → 매번 TCP 연결(+https면 TLS 핸드셰이크) 비용 포함
+- warm : nlp.llm_client 레지스트리의 공용 클라이언트 (준비 호출 1회 뒤 keep-alive 연결 재사용)
+
+    python run_mock_llm.py --latency-dist fixed --latency-mean 0          # 다른 터미널에서
+    python -m benchmarks.llm_connections --calls 200
+    python -m benchmarks.llm_connections --provider openrouter --model openai/gpt-4o-mini --calls 30
+
+로컬 가짜 서버는 http라 TLS 비용이 빠져 있다. 실제 API(https)에서는 차이가 더 크다.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from config.settings import LLM_CONFIG
+from nlp.llm_client import AsyncOpenAI, ClientSpec, build_client, client_spec, get_client, http2_enabled
+
+_REQUEST = [{"role": "user", "content": "ping"}]
+
+
+def _quantile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize_latencies(values: List[float]) -> Dict:
+    return {
+        "calls": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3),
+        "p50_ms": round(_quantile(values, 0.5) * 1000, 3),
+        "p90_ms": round(_quantile(values, 0.9) * 1000, 3),
+        "p99_ms": round(_quantile(values, 0.99) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+async def _call(client, model: str):
+    await client.chat.completions.create(model=model, messages=_REQUEST, max_tokens=8, temperature=0)
+
+
+async def measure(spec: ClientSpec, model: str, calls: int, warm: bool) -> List[float]:
+    """순차 호출 calls회의 호출당 지연(초)"""
+    if warm:
+        await _call(get_client(spec), model)  # 연결 준비 (측정 제외)
+    latencies = []
+    for _ in range(calls):
+        client = get_client(spec) if warm else build_client(spec)
+        started = time.perf_counter()
+        await _call(client, model)
+        latencies.append(time.perf_counter() - started)
+        if not warm:
+            await client.close()
+    return latencies
+
+
+async def run_connection_bench(spec: ClientSpec, model: str, calls: int) -> Dict:
+    cold = await measure(spec, model, calls, warm=False)
+    warm = await measure(spec, model, calls, warm=True)
+    result = {
+        "generated_at": datetime.now().isoformat(),
+        "provider": spec.provider,
+        "base_url": spec.base_url,
+        "model": model,
+        "http2": http2_enabled(),
+        "cold": summarize_latencies(cold),
+        "warm": summarize_latencies(warm),
+    }
+    result["p50_saved_ms"] = round(result["cold"]["p50_ms"] - result["warm"]["p50_ms"], 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 연결 재사용(keep-alive) 벤치마크")
+    parser.add_argument("--provider", default="mock", help="openai | openrouter | mock (기본 mock)")
+    parser.add_argument("--model", default=LLM_CONFIG.get("model", "openrouter/auto"))
+    parser.add_argument("--calls", type=int, default=100, help="방식별 순차 호출 수")
+    parser.add_argument("--output", default="", help="결과 JSON 경로 (기본 benchmarks/results/llm_connections_<시각>.json)")
+    args = parser.parse_args()
+
+    if AsyncOpenAI is None:
+        print("⚠️ openai 패키지가 없어 실행할 수 없습니다.")
+        return 1
+    spec = client_spec(args.provider)
+    if spec is None:
+        print(f"⚠️ {args.provider} API 키가 설정되지 않았습니다.")
+        return 1
+
+    print(f"🔌 LLM 연결 벤치마크: {spec.base_url} ({args.model}), 방식별 {args.calls}회")
+    result = asyncio.run(run_connection_bench(spec, args.model, args.calls))
+    for name in ("cold", "warm"):
+        r = result[name]
+        print(f"  {name:<5} p50 {r['p50_ms']:8.2f}ms  p90 {r['p90_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms  "
+              f"평균 {r['mean_ms']:8.2f}ms")
+    print(f"  → 따뜻한 연결로 호출당 p50 {result['p50_saved_ms']:.2f}ms 단축")
+
+    output = Path(args.output) if args.output else \
+        Path(__file__).parent / "results" / f"llm_connections_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"💾 결과 저장: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
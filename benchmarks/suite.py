@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+벤치마크 스위트 - 각 벤치마크는 합성 코퍼스를 받아 처리량(메시지/초)을 측정한다.
+
+- coalesce        : coalesce_messages (채팅 버스트 병합)
+- rank            : PriorityRanker.rank_messages
+- extract         : ActionExtractor.batch_extract_actions
+- summarize       : MessageSummarizer.batch_summarize (가짜 LLM)
+- analyze_full    : SmartAssistant.analyze_messages + generate_todo_list (가짜 LLM, 임시 assistant.db)
+"""
+import asyncio
+import gc
+import logging
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .corpus import make_corpus
+from .fake_llm import FakeLLMClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+async def bench_coalesce(corpus: List[Dict], llm_latency: float) -> int:
+    from main import coalesce_messages
+    coalesce_messages(corpus, window_seconds=90, max_chars=1200)
+    return len(corpus)
+
+
+async def bench_rank(corpus: List[Dict], llm_latency: float) -> int:
+    from nlp.priority_ranker import PriorityRanker
+    await PriorityRanker().rank_messages(corpus)
+    return len(corpus)
+
+
+async def bench_extract(corpus: List[Dict], llm_latency: float) -> int:
+    from nlp.action_extractor import ActionExtractor
+    await ActionExtractor().batch_extract_actions(corpus)
+    return len(corpus)
+
+
+async def bench_summarize(corpus: List[Dict], llm_latency: float) -> int:
+    from nlp.summarize import MessageSummarizer
+    summarizer = MessageSummarizer()
+    summarizer.client = FakeLLMClient(latency=llm_latency)
+    summarizer.is_available = True
+    summarizer.cache = None  # 응답 캐시 없이 요청 경로 자체를 측정
+    await summarizer.batch_summarize(corpus)
+    return len(corpus)
+
+
+async def bench_analyze_full(corpus: List[Dict], llm_latency: float) -> int:
+    from main import SmartAssistant
+    from store.sqlite_store import AssistantStore
+    from store.semantic_index import SemanticIndex
+
+    tmp = tempfile.mkdtemp(prefix="sa_bench_")
+    db = AssistantStore(str(Path(tmp) / "assistant.db"))
+    index = SemanticIndex(Path(tmp) / "faiss_index")
+    try:
+        assistant = SmartAssistant(db=db, semantic_index=index)
+        assistant.summarizer.client = FakeLLMClient(latency=llm_latency)
+        assistant.summarizer.is_available = True
+        assistant.summarizer.cache = None
+        assistant.collected_messages = list(corpus)
+        results = await assistant.analyze_messages()
+        await assistant.generate_todo_list(results)
+        await assistant.cleanup()
+    finally:
+        db.close()
+        index.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return len(corpus)
+
+
+BENCHMARKS: Dict[str, Callable[[List[Dict], float], Awaitable[int]]] = {
+    "coalesce": bench_coalesce,
+    "rank": bench_rank,
+    "extract": bench_extract,
+    "summarize": bench_summarize,
+    "analyze_full": bench_analyze_full,
+}
+
+
+def run_suite(sizes: List[int] = None, names: List[str] = None, repeat: int = 3,
+              llm_latency: float = 0.0, seed: int = 42, min_time: float = 1.0) -> Dict:
+    """
+    벤치마크 실행. 크기별로 최소 repeat회, 누적 min_time초가 될 때까지(최대 50회) 반복해
+    최단 시간 기준 처리량을 기록한다. (작은 입력의 측정 잡음 완화, 100k는 1회)
+    """
+    sizes = sizes or DEFAULT_SIZES
+    names = names or list(BENCHMARKS)
+    results: Dict[str, Dict[str, Dict]] = {}
+
+    # 측정 중 로그 출력 비용이 섞이지 않도록 WARNING 이하 억제
+    previous = logging.root.manager.disable
+    logging.disable(logging.WARNING)
+    try:
+        for n in sizes:
+            corpus = make_corpus(n, seed=seed)
+            runs = repeat if n < 100_000 else 1
+            for name in names:
+                fn = BENCHMARKS[name]
+                times = []
+                while len(times) < max(1, runs) or (runs > 1 and sum(times) < min_time and len(times) < 50):
+                    gc.collect()
+                    started = time.perf_counter()
+                    items = asyncio.run(fn(corpus, llm_latency))
+                    times.append(time.perf_counter() - started)
+                best = min(times)
+                results.setdefault(name, {})[str(n)] = {
+                    "items": items,
+                    "seconds": round(best, 6),
+                    "throughput": round(items / best, 2) if best > 0 else float("inf"),
+                    "runs": len(times),
+                }
+                print(f"  {name:<13} n={n:<7} {best:9.3f}s  {items / best:12.1f} msg/s", flush=True)
+    finally:
+        logging.disable(previous)
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "llm_latency": llm_latency,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float = 0.3) -> List[Dict]:
+    """기준선 대비 처리량이 (1 - tolerance) 배 미만으로 떨어진 항목 목록"""
+    regressions = []
+    for name, by_size in report.get("results", {}).items():
+        for size, cur in by_size.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if not base or not base.get("throughput"):
+                continue
+            ratio = cur["throughput"] / base["throughput"]
+            cur["baseline_ratio"] = round(ratio, 3)
+            if ratio < 1.0 - tolerance:
+                regressions.append({"benchmark": name, "size": int(size), "ratio": round(ratio, 3),
+                                    "throughput": cur["throughput"], "baseline": base["throughput"]})
+    return regressions
+
+
+def load_json(path: Path) -> Optional[Dict]:
+    import json
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
@@ -38,7 +38,7 @@ EMAIL_CONFIG = {
 
 # LLM 설정
 LLM_CONFIG = {
-    # ✅ 공급자 선택: openai | openrouter
+    # ✅ 공급자 선택: openai | openrouter | mock (로컬 가짜 서버, run_mock_llm.py)
     "provider": os.getenv("LLM_PROVIDER", "openrouter"),
 
     # OpenAI 쓸 때만 사용
@@ -48,14 +48,169 @@ LLM_CONFIG = {
     "openrouter_api_key": os.getenv("OPENROUTER_API_KEY"),
     "openrouter_base_url": "https://openrouter.ai/api/v1",
 
+    # OpenAI 호환 서버 주소 덮어쓰기 (openai 공급자에서 사용, 비우면 공식 API)
+    "openai_base_url": os.getenv("OPENAI_BASE_URL"),
+
+    # ✅ 로컬 가짜 LLM 서버 (오프라인 부하/재시도/캐시 테스트용)
+    "mock_base_url": os.getenv("LLM_MOCK_URL", "http://127.0.0.1:8799/v1"),
+    "request_timeout": float(os.getenv("LLM_TIMEOUT", "30")),
+
+    # ✅ 스트리밍 응답: 분석 탭의 개요/대화 요약을 도착하는 대로 표시 (stream=True)
+    "stream": os.getenv("LLM_STREAM", "true").lower() in ("1", "true", "yes"),
+
     # ✅ OpenRouter 모델명 예시
     #   - 자동 라우팅: "openrouter/auto"
     #   - 특정 모델: "anthropic/claude-3.5-sonnet" | "openai/gpt-4o-mini" 등
     "model": os.getenv("LLM_MODEL", "openrouter/auto"),
 
-    "embedding_model": "text-embedding-3-small",   # (지금 프로젝트에선 안 씀)
+    # ✅ 의미 검색 인덱스용 로컬 CPU 임베딩 모델 (sentence-transformers, 한국어 포함 다국어)
+    "embedding_model": os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"),
     "max_tokens": 300,
     "temperature": 0.2,
+
+    # ✅ 묶음 요약: 여러 메시지를 한 요청에 담아 JSON 배열로 받음 (packed | single)
+    "batch_mode": os.getenv("LLM_BATCH_MODE", "packed"),
+    "pack_max_items": 12,           # 묶음 1건의 최대 메시지 수
+    "pack_item_max_tokens": 220,    # 메시지당 응답 토큰 예산 (max_tokens = 항목 수 × 예산)
+    "pack_item_prompt_tokens": 600, # 묶음 모드에서 메시지 1개 본문 토큰 상한
+
+    # ✅ 용도별 프롬프트 토큰 예산 (모델 컨텍스트 크기를 넘으면 자동으로 줄임)
+    "prompt_budgets": {
+        "message": 1200,        # 단건 메시지 요약
+        "packed": 3000,         # 묶음 요약 1건
+        "conversation": 6000,   # 대화 전체 요약
+        "overview": 3000,       # 분석 탭 전체 개요
+        "topic": 3000,          # 주제 묶음 1개 요약
+    },
+
+    # ✅ 긴 대화 요약 (map-reduce): 대화가 conversation 예산을 넘으면 구간별로 요약한 뒤 통합
+    "conversation_chunk_tokens": 2500,      # 구간 1개 토큰 상한
+    "conversation_chunk_gap_minutes": 120,  # 이 이상 대화가 끊기면 구간을 나눔 (구간이 절반 이상 찼을 때)
+    "conversation_max_chunks": 32,          # 구간 수 상한 (넘으면 구간을 키움 → 전체 소요 시간 상한)
+
+    # ✅ 프로세스 공용 HTTP 연결 풀 (nlp/llm_client.py) - 주기/작업 스레드가 바뀌어도 keep-alive·TLS 세션 재사용
+    "pool_max_connections": 64,       # 동시 연결 상한 (concurrency_max보다 크게)
+    "pool_max_keepalive": 32,         # 유지할 유휴 연결 수
+    "pool_keepalive_expiry": 360.0,   # 유휴 연결 유지 시간(초) - 스케줄러 주기(5분)보다 길게 (서버가 먼저 끊으면 재연결)
+    "http2": os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes"),  # h2 패키지가 있을 때만 적용
+
+    # ✅ 요청 합치기 (nlp/single_flight.py) - 같은 프롬프트가 동시에 진행 중이면 API를 한 번만 호출
+    "single_flight": os.getenv("LLM_SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes"),
+
+    # ✅ 적응형 동시 호출 제한 (성공 시 증가, 429/타임아웃 시 절반) + 재시도
+    "concurrency_initial": 5,
+    "concurrency_min": 1,
+    "concurrency_max": 32,
+    "max_retries": 4,
+    "retry_base_delay": 0.5,
+    "retry_max_delay": 20.0,
+}
+
+# LLM 응답 캐시 (같은 프롬프트 재요청 방지)
+LLM_CACHE_CONFIG = {
+    "enabled": os.getenv("LLM_CACHE_ENABLED", "1") == "1",
+    "path": "data/llm_cache.db",
+    "max_entries": 5000,
+    "max_bytes": 50 * 1024 * 1024,
+    "ttl_seconds": 7 * 86400,  # 7일
+}
+
+# 분석 설정
+ANALYSIS_CONFIG = {
+    "top_n": 60,                          # LLM 요약/액션 추출 대상 상위 N개
+    "analysis_store_max_entries": 20000,  # 내용 해시 기반 분석 결과 보관 상한
+    "summarize_workers": 32,              # 파이프라인 요약 스테이지 워커 수 (실제 LLM 동시 호출은 적응형 제한기가 결정)
+    "pipeline_queue_size": 32,            # 스테이지 간 bounded queue 크기
+    "offline_batch_size": 256,            # LLM 없이 추출 요약할 때 한 번에 처리할 메시지 수
+    "persist": True,                      # assistant.db(DATABASE_PATH)에 결과 영구 저장
+}
+
+# 모델 등급 라우팅 (nlp/model_router.py) - 우선순위 점수/길이에 따라 요약 모델을 고름
+#   tiers는 위에서부터 조건(min_score 이상, min_chars 이상)이 맞는 첫 등급을 사용
+#   model: None이면 LLM_CONFIG["model"], "local"이면 LLM 없이 로컬 추출 요약
+MODEL_ROUTING_CONFIG = {
+    "enabled": os.getenv("MODEL_ROUTING_ENABLED", "1") == "1",
+    "tiers": [
+        {"name": "premium", "model": None, "max_tokens": 300, "min_score": 0.6, "min_chars": 0},
+        {"name": "fast", "model": os.getenv("LLM_FAST_MODEL", "openai/gpt-4o-mini"), "max_tokens": 160,
+         "min_score": 0.3, "min_chars": 20},
+        {"name": "local", "model": "local", "min_score": 0.0, "min_chars": 0},
+    ],
+    # 비용 추정용 단가 (USD / 100만 토큰, [입력, 출력]) - 없는 모델은 default_price
+    "prices": {
+        "openai/gpt-4o-mini": [0.15, 0.60],
+        "gpt-4o-mini": [0.15, 0.60],
+        "openai/gpt-4o": [2.50, 10.00],
+        "gpt-4o": [2.50, 10.00],
+        "anthropic/claude-3.5-sonnet": [3.00, 15.00],
+        "local": [0.0, 0.0],
+    },
+    "default_price": [3.00, 15.00],
+}
+
+# 규칙 기반 확신 게이트 (nlp/confidence_gate.py) - 규칙 점수만으로 결론이 분명한 메시지는 LLM 없이 로컬 요약
+#   잡담/확인 응답, 시스템 알림, 액션 키워드 없는 한 줄 메시지 중 긴급/마감 점수가 0인 것만 해당
+CONFIDENCE_GATE_CONFIG = {
+    "enabled": os.getenv("CONFIDENCE_GATE_ENABLED", "1") == "1",
+    "max_urgency_score": 0.2,     # 시간 표현 2개("오늘", "점심" 등)까지는 허용 (긴급 키워드는 1개만 있어도 0.4)
+    "one_liner_chars": 40,        # 이 길이 이하의 물음표 없는 한 줄 메시지
+    "chit_chat_chars": 80,        # 잡담 패턴이 있으면 이 길이까지 허용
+    "shadow_rate": 0.1,           # 게이트를 통과한 메시지 중 LLM으로도 요약해 일치율을 재는 비율 (0이면 측정 안 함)
+    "chit_chat_patterns": ["ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅇㅋ", "넵", "네네", "감사합니다", "고맙습니다", "수고하셨습니다",
+                           "수고하세요", "확인했습니다", "알겠습니다", "좋아요", "점심", "커피", "lol", "thanks", "thank you"],
+    "system_senders": ["noreply", "no-reply", "donotreply", "mailer-daemon", "notification", "bot", "system", "알림"],
+    "system_prefixes": ["[자동]", "[알림]", "[system]", "[bot]", "[auto]", "automated"],
+    "ack_phrases": ["확인했습니다", "확인했어요", "확인 감사합니다"],  # 키워드 판정에서 빼는 확인 응답 문구
+}
+
+# 우선순위 LLM 디스패치 (nlp/llm_limiter.py 대기열) - 중요한 메시지의 요약이 먼저 끝나도록
+#   디스패치 우선순위 = overall_score + deadline_weight × 마감 임박도(0~1, 남은 시간이 horizon보다 짧을수록 1에 가까움)
+DISPATCH_CONFIG = {
+    "enabled": os.getenv("LLM_PRIORITY_DISPATCH", "1") == "1",   # 0이면 도착 순서(FIFO)
+    "deadline_weight": 0.5,
+    "deadline_horizon_hours": 72,
+    "undated_deadline_proximity": 0.3,  # 마감 키워드는 있는데 날짜를 읽지 못한 경우의 임박도
+}
+
+# 주제 군집 요약 (nlp/topic_cluster.py) - 메시지가 많은 대화방은 메시지마다가 아니라 주제마다 한 번 요약
+TOPIC_CONFIG = {
+    "enabled": os.getenv("TOPIC_CLUSTER_ENABLED", "1") == "1",
+    "min_room_messages": 12,     # 요약 대상(상위 N개) 중 한 방의 메시지가 이 이상이면 주제로 묶음
+    "max_topics": 8,             # 방 하나의 최대 주제 수 (= 방 하나의 최대 LLM 호출 수)
+    "min_cluster_size": 3,       # 이보다 작은 묶음의 메시지는 개별 요약
+    "use_embeddings": True,      # 의미 검색 인덱스의 임베딩 모델이 있으면 사용 (없으면 TF-IDF)
+    "hashing_dim": 1024,         # TF-IDF 해시 차원
+    "kmeans_batch_size": 256,
+    "kmeans_iterations": 50,
+    "seed": 42,
+}
+
+# 근접 중복 묶기 (nlp/dedup.py) - 교차 게시 공지/전달 메일/반복 봇 알림을 대표 1개로 분석
+DEDUP_CONFIG = {
+    "enabled": os.getenv("DEDUP_ENABLED", "1") == "1",
+    "shingle_size": 4,                   # 글자 n-gram 크기
+    "num_perm": 64,                      # MinHash 해시 함수 수
+    "bands": 16,                         # LSH 밴드 수 (밴드당 4행 → Jaccard 약 0.5부터 후보)
+    "jaccard_threshold": 0.8,            # 이 이상이면 중복
+    "use_embeddings": True,              # 애매한 후보는 의미 검색 인덱스의 임베딩 모델로 재판정
+    "embedding_candidate_jaccard": 0.5,
+    "cosine_threshold": 0.95,
+    "min_chars": 20,                     # 이보다 짧은 메시지("네", "확인했습니다")는 묶지 않음
+}
+
+# 메시지 이력 의미 검색 인덱스 (store/semantic_index.py, FAISS_INDEX_PATH에 저장)
+SEMANTIC_INDEX_CONFIG = {
+    "enabled": os.getenv("SEMANTIC_INDEX_ENABLED", "1") == "1",
+    "device": "cpu",
+    "embed_batch_size": 64,       # 임베딩 묶음 크기
+    "hnsw_threshold": 20000,      # 벡터 수가 이 이상이면 Flat(전수 비교) → HNSW(근사 검색)로 전환
+    "hnsw_m": 32,
+    "hnsw_ef_construction": 40,
+    "hnsw_ef_search": 64,
+    "hashing_dim": 512,           # sentence-transformers가 없을 때 해시 임베딩 차원
+    "preview_chars": 200,
+    "save_min_new": 2000,         # 인덱스 파일은 새 벡터가 이만큼 쌓였거나
+    "save_interval_seconds": 600, # 마지막 저장 후 이 시간이 지났을 때만 다시 씀 (종료 시에는 항상 저장)
 }
 
 # 스케줄러 설정
@@ -63,6 +218,24 @@ SCHEDULER_CONFIG = {
     "email_poll_interval": 300,  # 5분
     "daily_reminder_time": "09:00",
     "cleanup_interval": 86400,  # 24시간
+    "jitter_seconds": 15,  # 주기마다 0~N초 무작위 지연 (여러 인스턴스 동시 실행 분산)
+    "retention_days": 30,  # 정리 작업 시 메시지/실행 이력 보관 기간
+    "shutdown_grace_seconds": 60,  # 종료 시 진행 중인 작업을 기다리는 시간 (넘으면 취소)
+}
+
+# 로컬 HTTP API 설정
+API_CONFIG = {
+    "host": os.getenv("API_HOST", "127.0.0.1"),
+    "port": int(os.getenv("API_PORT", "8765")),
+    "max_page_size": 200,
+    "sse_poll_interval": 1.0,  # SSE 스트림이 새 결과를 확인하는 주기(초)
+}
+
+# 계측 설정 (비활성화 시 오버헤드 거의 없음)
+METRICS_CONFIG = {
+    "enabled": os.getenv("METRICS_ENABLED", "0") == "1",
+    "port": int(os.getenv("METRICS_PORT", "0")),  # 0이면 HTTP 엔드포인트 미사용 (스케줄러 전용)
+    "snapshot_path": "data/metrics.json",         # 스케줄러 주기마다 JSON 스냅샷 저장
 }
 
 # UI 설정
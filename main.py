@@ -4,11 +4,13 @@ Smart Assistant 메인 애플리케이션
 이메일과 메신저 메시지를 수집하고, LLM으로 분석하여 TODO 리스트를 생성하는 시스템
 """
 import asyncio
+import heapq
 import logging
 import sys
 import os
+from dataclasses import replace
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
 from pathlib import Path
 
 from datetime import datetime, timezone, timedelta
@@ -29,10 +31,24 @@ sys.path.insert(0, str(project_root))
 from config.settings import LOGGING_CONFIG
 from ingestors.email_imap import EmailIMAPCollector, EmailMessage
 from ingestors.messenger_adapter import MessengerAdapter, Message
-from nlp.summarize import MessageSummarizer
-from nlp.priority_ranker import PriorityRanker
+from nlp.summarize import GATE_SOURCE, OFFLINE_SOURCE, MessageSummarizer, MessageSummary, PROMPT_VERSION
+from nlp.llm_limiter import with_priority
+from nlp.priority_ranker import PriorityRanker, dispatch_priority
 from nlp.action_extractor import ActionExtractor
-from config.settings import LLM_CONFIG
+from nlp.room_summary import RollingRoomSummarizer
+from nlp.dedup import NearDuplicateDetector
+from nlp.topic_cluster import Topic, TopicClusterer
+from nlp.model_router import ModelRouter, RoutingReport
+from nlp.confidence_gate import ConfidenceGate, GateReport
+from nlp.single_flight import FlightStats
+from config.settings import (LLM_CONFIG, ANALYSIS_CONFIG, DATABASE_PATH, METRICS_CONFIG, SEMANTIC_INDEX_CONFIG,
+                             DEDUP_CONFIG, TOPIC_CONFIG, MODEL_ROUTING_CONFIG,
+                             CONFIDENCE_GATE_CONFIG)
+from store.analysis_store import AnalysisStore
+from store.sqlite_store import AssistantStore, get_store
+from store.semantic_index import SemanticIndex, SimilarMessage
+from pipeline.engine import Pipeline, Stage
+from pipeline.metrics import METRICS
 
 
 
@@ -75,31 +91,99 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 분석 탭 개요/대화방 요약의 LLM 디스패치 우선순위 (메시지 요약보다 낮고 게이트 섀도 요청보다 높음)
+_REPORT_PRIORITY = -0.5
+
+def _coalesce_key(m: dict) -> tuple:
+    """버스트 인덱스 키: (platform, room, sender)"""
+    return (m.get("platform") or "", m.get("room") or "", m.get("sender") or "")
+
+
+def _clip(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars] + " ..."
+
+
+def iter_coalesced_messages(msgs, window_seconds=90, max_chars=1200):
+    """
+    같은 (platform, room, sender)의 연속 발화를 버스트 단위로 묶어 스트리밍 반환.
+
+    - 발신자별로 열린 버스트를 인덱스(dict)로 유지하므로, 두 사람이 번갈아
+      말하는(interleaving) 방에서도 각자의 발화가 합쳐진다.
+    - 각 버스트는 마지막 메시지 기준 window_seconds의 슬라이딩 윈도를 가진다.
+    - 만료된 버스트는 시작 시각 기준 힙을 거쳐 시간순으로 내보낸다.
+      (열린 버스트 수 k에 대해 메시지당 O(log k))
+    - 합치면 max_chars를 넘는 경우 현재 버스트를 닫고 새 버스트를 시작한다.
+    """
+    window = timedelta(seconds=window_seconds)
+    ordered = sorted(msgs, key=_sort_key)
+
+    open_bursts = {}   # key -> burst dict
+    expiry_heap = []   # (마지막 메시지 시각 + window, seq, key)
+    start_heap = []    # (시작 시각, seq, key) - 열린 버스트의 시작 시각
+    closed_heap = []   # (시작 시각, seq, burst) - 닫혔지만 아직 내보내지 않은 버스트
+    seq = 0
+
+    def _close(key):
+        burst = open_bursts.pop(key)
+        heapq.heappush(closed_heap, (burst["_start"], burst["_seq"], burst))
+
+    def _drain():
+        # 아직 열린 버스트보다 먼저 시작한 닫힌 버스트만 내보낸다(시간순 보장)
+        while start_heap and open_bursts.get(start_heap[0][2], {}).get("_seq") != start_heap[0][1]:
+            heapq.heappop(start_heap)  # 이미 닫힌 버스트의 항목
+        earliest_open = start_heap[0][0] if start_heap else None
+        while closed_heap and (earliest_open is None or closed_heap[0][0] <= earliest_open):
+            _, _, burst = heapq.heappop(closed_heap)
+            burst.pop("_start", None); burst.pop("_last", None); burst.pop("_seq", None)
+            yield burst
+
+    for m in ordered:
+        ts = _sort_key(m)
+
+        # 윈도가 지난 버스트 닫기 (lazy expiry)
+        while expiry_heap and expiry_heap[0][0] < ts:
+            _, bseq, key = heapq.heappop(expiry_heap)
+            burst = open_bursts.get(key)
+            if burst is not None and burst["_seq"] == bseq and burst["_last"] + window < ts:
+                _close(key)
+        yield from _drain()
+
+        key = _coalesce_key(m)
+        burst = open_bursts.get(key)
+        text = m.get("content") or ""
+
+        if burst is not None:
+            merged = burst["content"] + "\n" + text
+            if len(merged) <= max_chars:
+                burst["content"] = merged
+                burst["body"] = merged
+                burst["msg_id"] += f"+{m['msg_id']}"
+                burst["date"] = m["date"]  # 최신으로
+                burst["_last"] = ts
+                heapq.heappush(expiry_heap, (ts + window, burst["_seq"], key))
+                continue
+            # 용량 초과 → 현재 버스트를 닫고 새로 시작
+            _close(key)
+            yield from _drain()
+
+        mm = dict(m)
+        if len(text) > max_chars:
+            mm["content"] = mm["body"] = _clip(text, max_chars)
+        mm["_start"] = mm["_last"] = ts
+        mm["_seq"] = seq
+        open_bursts[key] = mm
+        heapq.heappush(expiry_heap, (ts + window, seq, key))
+        heapq.heappush(start_heap, (ts, seq, key))
+        seq += 1
+
+    for key in list(open_bursts):
+        _close(key)
+    start_heap.clear()
+    yield from _drain()
+
+
 def coalesce_messages(msgs, window_seconds=90, max_chars=1200):
-    out = []
-    last = None
-    for m in sorted(msgs, key=lambda x: x["date"]):
-        if last and (m["platform"] == last["platform"]
-                     and m["sender"] == last["sender"]
-                     and abs(datetime.fromisoformat(m["date"]) - datetime.fromisoformat(last["date"])) <= timedelta(seconds=window_seconds)):
-            # 합치기
-            merged = last["content"] + "\n" + (m["content"] or "")
-            if len(merged) > max_chars:
-                merged = merged[:max_chars] + " ..."
-            last["content"] = merged
-            last["body"]    = merged
-            last["msg_id"] += f"+{m['msg_id']}"
-            last["date"]     = m["date"]  # 최신으로
-        else:
-            mm = dict(m)
-            text = mm.get("content") or ""
-            if len(text) > max_chars:
-                text = text[:max_chars] + " ..."
-                mm["content"] = text
-                mm["body"]    = text
-            out.append(mm)
-            last = mm
-    return out
+    return list(iter_coalesced_messages(msgs, window_seconds=window_seconds, max_chars=max_chars))
 
 def _trim(s: str, n: int) -> str:
     if not s:
@@ -107,42 +191,63 @@ def _trim(s: str, n: int) -> str:
     s = s.strip()
     return s if len(s) <= n else s[:n] + " ..."
 
-async def build_overall_analysis_text(self, analysis_results: list, max_chars_total: int = 8000) -> str:
+async def build_overview(self, messages: list, max_tokens_total: int = None,
+                         on_overview: Optional[Callable[[str], None]] = None) -> str:
     """
-    분석 탭에 뿌릴 통합 텍스트 생성:
-      - 전체 메시지(제목/내용) 묶어 1회 요약
-      - High / Medium / Low 섹션과 구분선
+    분석 탭 개요: 전체 메시지(제목/내용)를 묶어 1회 요약 (토큰 예산 초과 시 우선순위 낮은 줄부터 생략)
+    messages는 우선순위 순 메시지 목록이라 메시지별 요약을 기다리지 않고 순위가 나오면 바로 만들 수 있다.
+    on_overview(개요)를 주면 스트리밍 모드에서 개요가 도착하는 대로 호출한다.
     """
     # 1) 전체 메시지에서 제목/내용 취합
     buffet = []
-    acc = 0
-    for r in analysis_results:
-        msg = r["message"]
+    for msg in messages:
         sender = msg.get("sender") or ""
         subj = (msg.get("subject") or msg.get("content") or msg.get("body") or "").strip()
-        line = f"{sender}: {subj}"
-        if acc + len(line) > max_chars_total:
-            break
-        buffet.append(line); acc += len(line) + 1
+        buffet.append(f"{sender}: {subj}")
+    if max_tokens_total is None:
+        max_tokens_total = self.summarizer.budget_for("overview") - 400  # 요약 지시문 몫
+    tokens = self.summarizer.tokens
+    buffet = tokens.fit_lines(buffet, max_tokens_total, scores=[-i for i in range(len(buffet))],
+                              max_line_tokens=80)
     big_text = "\n".join(buffet)
 
-    # 2) 1회 요약
-    ov = await self.summarizer.summarize_message(big_text, sender="multi", subject="전체 메시지 요약")
-    overview = ov.summary if hasattr(ov, "summary") else str(ov)
+    # 2) 1회 요약 (같은 입력이면 저장소 재사용)
+    ov_key = self.analysis_store.aggregate_key(self.summarizer.model, PROMPT_VERSION, big_text)
+    overview = self.analysis_store.get_aggregate("overview", ov_key)
+    METRICS.cache("aggregate.overview", overview is not None)
+    if overview is None:
+        if on_overview and self.summarizer.stream:
+            overview = ""
+            async for partial in self.summarizer.summarize_message_stream(
+                    big_text, sender="multi", subject="전체 메시지 요약", budget="overview"):
+                if partial.get("summary") and partial["summary"] != overview:
+                    overview = partial["summary"]
+                    on_overview(overview)
+        else:
+            ov = await self.summarizer.summarize_message(big_text, sender="multi", subject="전체 메시지 요약",
+                                                         budget="overview")
+            overview = ov.summary if hasattr(ov, "summary") else str(ov)
+        self.analysis_store.put_aggregate("overview", ov_key, overview)
+    elif on_overview:
+        on_overview(overview)
+    return overview
+
 
-    # 3) 우선순위 섹션
-    lines = []
-    lines.append("📊 분석 결과 (통합)")
-    lines.append("=" * 60)
-    lines.append(overview)
-    lines.append("")
+def compose_overall_text(overview: str, sections: str) -> str:
+    return "\n".join(["📊 분석 결과 (통합)", "=" * 60, overview or "(개요 생성 중...)", "", sections])
 
+
+def format_priority_sections(analysis_results: list) -> str:
+    """High / Medium / Low 섹션 (메시지별 요약 결과만 사용, LLM 호출 없음)"""
+    lines = []
     buckets = {"high": [], "medium": [], "low": []}
     for r in analysis_results:
         pr = r["priority"]
         level = (pr.get("priority_level") if isinstance(pr, dict) else getattr(pr, "priority_level", "low")).lower()
         buckets.setdefault(level, []).append(r)
 
+    seen_topics = set()
+
     def push_bucket(name, items):
         lines.append(f"\n--- [{name.upper()}] {'-'*42}")
         for r in items[:8]:
@@ -152,7 +257,13 @@ async def build_overall_analysis_text(self, analysis_results: list, max_chars_to
             sum_obj = r.get("summary")
             sum_txt = (sum_obj.get("summary") if isinstance(sum_obj, dict) else getattr(sum_obj, "summary", ""))[:100]
             lines.append(f"• {msg.get('sender','')} / {ttl}")
-            if sum_txt:
+            topic = r.get("topic")
+            if topic and topic["topic_id"] in seen_topics:
+                lines.append(f"  주제: {topic['label']} (위 주제 요약 참고)")
+            elif topic:
+                seen_topics.add(topic["topic_id"])
+                lines.append(f"  주제 요약 [{topic['label']} · {topic['size']}개]: {sum_txt}")
+            elif sum_txt:
                 lines.append(f"  요약: {sum_txt}")
             if r.get("actions"):
                 lines.append(f"  액션: {len(r['actions'])}개")
@@ -164,16 +275,112 @@ async def build_overall_analysis_text(self, analysis_results: list, max_chars_to
     return "\n".join(lines)
 
 
+def format_room_summaries(states: Dict) -> str:
+    """대화방별 누적 요약 (최근 갱신된 방부터)"""
+    blocks = []
+    for state in sorted(states.values(), key=lambda st: st.watermark, reverse=True):
+        body = format_conversation_summary(state.summary)
+        if not body:
+            continue
+        blocks.append(f"💬 [{state.room}] 메시지 {state.message_count}개 · 마지막 {state.watermark[:16]}\n{body}")
+    return "\n\n".join(blocks)
+
+
+def format_conversation_summary(conv) -> str:
+    """summarize_conversation 결과(dict 또는 문자열)를 분석 탭용 텍스트로"""
+    def _bullets(title, items, limit=6):
+        if not items:
+            return []
+        if isinstance(items, list):
+            items = items[:limit]
+        lines = [f"■ {title}"]
+        for it in items:
+            lines.append(f"- {it}")
+        lines.append("")
+        return lines
+
+    parts = []
+    if isinstance(conv, dict):
+        if conv.get("summary"):
+            parts += ["■ 대화 흐름 요약", "═"*60, conv["summary"].strip(), ""]
+        parts += _bullets("핵심 포인트", conv.get("key_points"))
+        parts += _bullets("결정 사항", conv.get("decisions"))
+        parts += _bullets("미해결/후속 필요", conv.get("unresolved"))
+        parts += _bullets("리스크/주의", conv.get("risks"))
+
+        # 액션아이템이 dict 리스트일 수도 있음
+        ai = conv.get("action_items") or []
+        if ai:
+            parts.append("■ 액션 아이템")
+            for a in ai[:8]:
+                if isinstance(a, dict):
+                    title = a.get("title") or a.get("task") or str(a)
+                    pr    = a.get("priority")
+                    owner = a.get("owner")
+                    due   = a.get("due")
+                    meta = ", ".join([x for x in [
+                        f"우선:{pr}" if pr else None,
+                        f"담당:{owner}" if owner else None,
+                        f"마감:{due}" if due else None
+                    ] if x])
+                    parts.append(f"- {title}" + (f" ({meta})" if meta else ""))
+                else:
+                    parts.append(f"- {a}")
+            parts.append("")
+
+        if conv.get("participants"):
+            parts += ["참여자: " + ", ".join(conv["participants"]), ""]
+
+    # 혹시 문자열이 오면 그대로 사용
+    if not parts and isinstance(conv, str):
+        parts = ["■ 대화 흐름 요약", "═"*60, conv.strip()]
+
+    return "\n".join(parts).strip()
+
+
 
 class SmartAssistant:
     """스마트 어시스턴트 메인 클래스"""
     
-    def __init__(self):
+    def __init__(self, db: Optional[AssistantStore] = None, semantic_index: Optional[SemanticIndex] = None):
+        if METRICS_CONFIG.get("enabled"):
+            METRICS.enable()
         self.email_collector = None
         self.messenger_adapter = None
         self.summarizer = MessageSummarizer()
+        # 우선순위/길이별 요약 모델 등급 라우팅 (비활성화 시 모든 메시지를 기본 모델로)
+        self.router = ModelRouter(self.summarizer) if MODEL_ROUTING_CONFIG.get("enabled", True) else None
+        self.routing_report: Optional[RoutingReport] = None
+        # 규칙 점수가 결정적인 메시지(잡담/시스템 알림/한 줄 메시지)는 LLM 없이 로컬 요약
+        self.gate = ConfidenceGate(self.summarizer) if CONFIDENCE_GATE_CONFIG.get("enabled", True) else None
+        self.gate_report: Optional[GateReport] = None
+        self._shadow_watch: Optional[asyncio.Future] = None  # 섀도 측정 마무리(백그라운드)
+        # 진행 중 호출에 합쳐진 동일 프롬프트 요청 수 (이번 분석 동안, 프로세스 전체 기준)
+        self.coalesce_report: Optional[FlightStats] = None
         self.priority_ranker = PriorityRanker()
         self.action_extractor = ActionExtractor()
+
+        # assistant.db 영구 저장소 (재시작 후에도 분석 결과/TODO 재사용)
+        if db is None and ANALYSIS_CONFIG.get("persist", True):
+            try:
+                db = get_store(DATABASE_PATH)
+            except Exception as e:
+                logger.error(f"assistant.db 초기화 오류: {e}")
+        self.db = db
+        self.analysis_store = AnalysisStore(ANALYSIS_CONFIG.get("analysis_store_max_entries", 20000), backend=self.db)
+        self.room_summarizer = RollingRoomSummarizer(self.summarizer, store=self.db)
+
+        # 메시지 이력 의미 검색 인덱스 (FAISS_INDEX_PATH)
+        if semantic_index is None and SEMANTIC_INDEX_CONFIG.get("enabled", True):
+            try:
+                semantic_index = SemanticIndex()
+            except Exception as e:
+                logger.error(f"의미 검색 인덱스 초기화 오류: {e}")
+        self.semantic_index = semantic_index
+        embedder = semantic_index.embedder if semantic_index is not None and semantic_index.is_available else None
+        self.dedup = NearDuplicateDetector(embedder=embedder) if DEDUP_CONFIG.get("enabled", True) else None
+        self.topic_clusterer = TopicClusterer(embedder=embedder) if TOPIC_CONFIG.get("enabled", True) else None
+        self.cycle_started_at = None
         
         self.collected_messages = []
         self.summaries = []
@@ -181,7 +388,7 @@ class SmartAssistant:
         self.extracted_actions = []
 
         self.analysis_report_text = ""     # 분석 결과 탭에 뿌릴 통합 리포트 문자열
-        self.conversation_summary = None   # 대화 단위 요약(딕셔너리)   
+        self.conversation_summary = None   # 대화방 → 누적 요약(딕셔너리)
 
     
     async def initialize(self, email_config: Dict = None, messenger_config: Dict = None):
@@ -214,203 +421,529 @@ class SmartAssistant:
                             overall_limit: int | None = None):
         """여러 소스에서 메시지 수집 후 공통 포맷으로 반환"""
         logger.info("📥 메시지 수집 시작...")
+        self.cycle_started_at = datetime.now().isoformat()
         all_messages = []
             
 
         # 1) 이메일 (기존)
-        if self.email_collector:
-            try:
-                if await self.email_collector.connect():
-                    emails = await self.email_collector.get_unread_emails(email_limit)
-                    for email in emails:
+        with METRICS.stage("collect.email") as t:
+            if self.email_collector:
+                try:
+                    if await self.email_collector.connect():
+                        emails = await self.email_collector.get_unread_emails(email_limit)
+                        for email in emails:
+                            all_messages.append({
+                                "msg_id": email.msg_id,
+                                "sender": email.sender,
+                                "subject": email.subject,
+                                "body": email.body,
+                                "content": email.body,
+                                "date": _to_aware_iso(email.date.isoformat()),
+                                "type": "email",
+                                "platform": "email",
+                            })
+                        t.add(len(emails))
+                        logger.info(f"📧 {len(emails)}개의 이메일 수집")
+                    else:
+                        logger.warning("이메일 연결 실패")
+                except Exception as e:
+                    logger.error(f"이메일 수집 오류: {e}")
+
+        # 2) 메신저 어댑터 (기존)
+        with METRICS.stage("collect.messenger") as t:
+            if self.messenger_adapter:
+                try:
+                    messages = await self.messenger_adapter.get_all_unread_messages(messenger_limit)
+                    for msg in messages:
                         all_messages.append({
-                            "msg_id": email.msg_id,
-                            "sender": email.sender,
-                            "subject": email.subject,
-                            "body": email.body,
-                            "content": email.body,
-                            "date": _to_aware_iso(email.date.isoformat()),
-                            "type": "email",
-                            "platform": "email",
+                            "msg_id": msg.msg_id,
+                            "sender": msg.sender,
+                            "subject": "",
+                            "body": msg.content,
+                            "content": msg.content,
+                            "date": _to_aware_iso(msg.timestamp.isoformat()),
+                            "type": "messenger",
+                            "platform": msg.platform,
                         })
-                    logger.info(f"📧 {len(emails)}개의 이메일 수집")
-                else:
-                    logger.warning("이메일 연결 실패")
-            except Exception as e:
-                logger.error(f"이메일 수집 오류: {e}")
+                    t.add(len(messages))
+                    logger.info(f"📱 {len(messages)}개의 메신저 메시지 수집")
+                except Exception as e:
+                    logger.error(f"메신저 수집 오류: {e}")
 
-        # 2) 메신저 어댑터 (기존)
-        if self.messenger_adapter:
+        # 3) data/messenger/*.json (신규)
+        with METRICS.stage("collect.json") as t:
             try:
-                messages = await self.messenger_adapter.get_all_unread_messages(messenger_limit)
-                for msg in messages:
+                mlogs = iter_messenger_messages(
+                    root="data/messenger",
+                    rooms=rooms,
+                    include_system=include_system,
+                    limit=json_limit
+                )
+                count_json = 0
+                for i, m in enumerate(mlogs):
+                    iso = _to_aware_iso(getattr(m, "timestamp", None))
                     all_messages.append({
-                        "msg_id": msg.msg_id,
-                        "sender": msg.sender,
+                        "msg_id": f"json_{iso}_{i}",
+                        "sender": getattr(m, "username", None) or "unknown",
                         "subject": "",
-                        "body": msg.content,
-                        "content": msg.content,
-                        "date": _to_aware_iso(msg.timestamp.isoformat()),
-                        "type": "messenger",
-                        "platform": msg.platform,
+                        "body": getattr(m, "message", None) or "",
+                        "content": getattr(m, "message", None) or "",
+                        "date": iso,
+                        "type": "messenger",                 # 파이프라인 일관성 위해 messenger로 통일
+                        "platform": getattr(m, "room", None) or "json",
+                        "room": getattr(m, "room", None),
                     })
-                logger.info(f"📱 {len(messages)}개의 메신저 메시지 수집")
+                    count_json += 1
+                t.add(count_json)
+                logger.info(f"🗂️ JSON 로드: {count_json}개")
             except Exception as e:
-                logger.error(f"메신저 수집 오류: {e}")
-
-        # 3) data/messenger/*.json (신규)
-        try:
-            mlogs = iter_messenger_messages(
-                root="data/messenger",
-                rooms=rooms,
-                include_system=include_system,
-                limit=json_limit
-            )
-            count_json = 0
-            for i, m in enumerate(mlogs):
-                iso = _to_aware_iso(getattr(m, "timestamp", None))
-                all_messages.append({
-                    "msg_id": f"json_{iso}_{i}",
-                    "sender": getattr(m, "username", None) or "unknown",
-                    "subject": "",
-                    "body": getattr(m, "message", None) or "",
-                    "content": getattr(m, "message", None) or "",
-                    "date": iso,
-                    "type": "messenger",                 # 파이프라인 일관성 위해 messenger로 통일
-                    "platform": getattr(m, "room", None) or "json",
-                })
-                count_json += 1
-            logger.info(f"🗂️ JSON 로드: {count_json}개")
-        except Exception as e:
-            logger.error(f"JSON 메시지 로드 오류: {e}")
+                logger.error(f"JSON 메시지 로드 오류: {e}")
 
         # 4) 최신순 정렬 → 전체 상한
-        all_messages = coalesce_messages(all_messages, window_seconds=90, max_chars=1200)
-        all_messages.sort(key=_sort_key, reverse=True)
+        with METRICS.stage("collect.coalesce", items=len(all_messages)):
+            all_messages = coalesce_messages(all_messages, window_seconds=90, max_chars=1200)
+            all_messages.sort(key=_sort_key, reverse=True)
 
         if overall_limit:
             all_messages = all_messages[:overall_limit]
 
         self.collected_messages = all_messages
+        if self.db is not None:
+            with METRICS.stage("collect.save", items=len(all_messages)):
+                self.db.save_messages(all_messages, {m["msg_id"]: self._content_key(m) for m in all_messages})
         logger.info(f"📥 총 {len(all_messages)}개 메시지 수집 완료")
         return all_messages
     # main.py (핵심 흐름 정리 예시)
 
-    async def analyze_messages(self):
-        if not self.collected_messages:
-            logger.warning("분석할 메시지가 없습니다.")
+    async def index_messages(self, messages: List[Dict]) -> int:
+        """수집한 메시지를 의미 검색 인덱스에 추가 (임베딩은 별도 스레드에서, 이미 색인한 메시지는 건너뜀)"""
+        if self.semantic_index is None or not self.semantic_index.is_available:
+            return 0
+        try:
+            return await asyncio.to_thread(self.semantic_index.add_messages, messages)
+        except Exception as e:
+            logger.error(f"의미 검색 인덱스 추가 오류: {e}")
+            return 0
+
+    def search_similar(self, text: str, k: int = 5) -> List[SimilarMessage]:
+        """질의와 의미가 가까운 과거 메시지 (예: "지난번에 이 건 어떻게 하기로 했지")"""
+        if self.semantic_index is None:
             return []
+        return self.semantic_index.search_similar(text, k=k)
 
-        logger.info("🔍 메시지 분석 시작...")
+    def related_history(self, msg_id: str, k: int = 5) -> List[SimilarMessage]:
+        """해당 메시지보다 이전의 관련 메시지"""
+        if self.semantic_index is None:
+            return []
+        message = next((m for m in self.collected_messages if m.get("msg_id") == msg_id), None)
+        if message is None and self.db is not None:
+            message = self.db.get_message(msg_id)
+        return self.semantic_index.related_history(msg_id, k=k, message=message)
+
+    def deduplicate(self, messages: List[Dict]) -> List[Dict]:
+        """근접 중복을 묶어 대표 메시지만 반환 (나머지는 대표의 duplicates 참조로)"""
+        if self.dedup is None or len(messages) < 2:
+            return messages
+        try:
+            return self.dedup.deduplicate(messages).messages
+        except Exception as e:
+            logger.error(f"근접 중복 묶기 오류: {e}")
+            return messages
+
+    def plan_topics(self, messages: List[Dict]):
+        """
+        요약 대상 중 메시지가 많은 방(min_room_messages 이상)을 주제로 묶음
+        채팅방(room)이 있는 메신저 메시지만 묶고, 이메일 등은 메시지별 요약으로 둔다.
+        반환: (id(메시지) → Topic, topic_id → 메시지 목록)
+        """
+        topic_of: Dict[int, Topic] = {}
+        members: Dict[str, List[Dict]] = {}
+        if self.topic_clusterer is None:
+            return topic_of, members
+        by_room: Dict[str, List[Dict]] = {}
+        for m in messages:
+            if m.get("room") and m.get("type") != "email":
+                by_room.setdefault(m["room"], []).append(m)
+        for room, msgs in by_room.items():
+            if len(msgs) < TOPIC_CONFIG.get("min_room_messages", 12):
+                continue
+            try:
+                topics = self.topic_clusterer.cluster(msgs, room=room)
+            except Exception as e:
+                logger.error(f"[{room}] 주제 군집 오류: {e}")
+                continue
+            by_id = {m.get("msg_id"): m for m in msgs}
+            for topic in topics:
+                members[topic.topic_id] = [by_id[i] for i in topic.message_ids]
+                for m in members[topic.topic_id]:
+                    topic_of[id(m)] = topic
+            if topics:
+                logger.info(f"🗂️ [{room}] {len(msgs)}개 메시지 중 {sum(t.size for t in topics)}개를 주제 {len(topics)}개로 묶음")
+        return topic_of, members
+
+    def _content_key(self, message: Dict) -> str:
+        return self.analysis_store.content_key(message, self.summarizer.model, PROMPT_VERSION)
+
+    def _summary_source(self, message: Dict, priority) -> str:
+        """
+        이번 실행에서 이 메시지 요약을 만들 주체 (게이트 → 모델 등급 → 기본 모델, LLM이 없으면 로컬)
+        저장된 요약의 source가 이와 다르면(LLM 실패로 대체된 로컬 요약, 등급/모델 변경 등) 다시 요약한다.
+        """
+        if not (self.summarizer.is_available and self.summarizer.client):
+            return OFFLINE_SOURCE
+        if self.gate is not None and self.gate.decide(message, priority) is not None:
+            return GATE_SOURCE
+        if self.router is not None:
+            route = self.router.route(message, priority)
+            return OFFLINE_SOURCE if route.is_local else route.model
+        return self.summarizer.model
+
+    def _stored_summary(self, item: Dict):
+        """저장소의 요약 (없거나 지금 만들 주체와 다르면 None)"""
+        summary = self.analysis_store.entry(item["key"]).summary
+        hit = summary is not None and summary.source == self._summary_source(item["message"], item["priority"])
+        METRICS.cache("analysis.summary", hit)
+        return summary if hit else None
+
+    async def _rank_with_store(self, messages: List[Dict]):
+        """우선순위 분류 (저장소에 없는 메시지만 계산). (ranked, keys) 반환"""
+        store = self.analysis_store
+        keys = {id(m): self._content_key(m) for m in messages}
+        store.preload(keys.values())
+        scores = {}
+        to_rank = []
+        for m in messages:
+            entry = store.get(keys[id(m)])
+            if entry is not None and entry.priority is not None:
+                scores[id(m)] = entry.priority
+            else:
+                to_rank.append(m)
+        METRICS.cache("analysis.priority", True, len(messages) - len(to_rank))
+        METRICS.cache("analysis.priority", False, len(to_rank))
+
+        for m, score in await self.priority_ranker.rank_messages(to_rank):
+            store.update(keys[id(m)], priority=score)
+            scores[id(m)] = score
+
+        ranked = [(m, scores[id(m)]) for m in messages if id(m) in scores]
+        ranked.sort(key=lambda x: x[1].overall_score, reverse=True)
+        return ranked, keys
+
+    async def analyze_messages_stream(self, messages: List[Dict] = None, top_n: int = None):
+        """
+        메시지 분석 결과를 완료되는 즉시 하나씩 내보내는 스트리밍 분석.
+
+        우선순위 분류는 규칙 기반(CPU)이고 상위 N개 선정에 전체 순위가 필요하므로 먼저 수행하고,
+        이후 summarize → extract → merge 스테이지를 bounded queue로 연결해 파이프라인으로 처리한다.
+        상위 메시지부터 투입되므로 첫 결과는 LLM 1회 왕복 시간 안에 나온다.
+        """
+        messages = self.deduplicate(self.collected_messages) if messages is None else messages
+        store = self.analysis_store
+        top_n = ANALYSIS_CONFIG.get("top_n", 60) if top_n is None else top_n
 
         # 1) 우선순위 분류
         logger.info("🎯 우선순위 분류 중...")
-        self.ranked_messages = await self.priority_ranker.rank_messages(self.collected_messages)
+        with METRICS.stage("analyze.rank", items=len(messages)):
+            ranked, keys = await self._rank_with_store(messages)
+        self.ranked_messages = ranked
 
-        TOP_N = 60
-        top_msgs = [m for (m, _) in self.ranked_messages][:TOP_N]
+        summaries = {}
+        actions = []
+        if self.router is not None:
+            self.router.reset()
+        if self.gate is not None:
+            self.gate.reset()
+        flights = self.summarizer.flights
+        flights_before = flights.stats() if flights is not None else None
 
-        # 2) 상위 N개 요약
-        logger.info(f"📝 상위 {TOP_N}개 메시지 요약 중...")
-        self.summaries = await self.summarizer.batch_summarize(top_msgs)
+        # 1') 메시지가 많은 방은 상위 N개를 주제로 묶어 주제마다 한 번만 요약 (LLM 호출 수 ≤ 주제 수)
+        topic_of, topic_members = self.plan_topics([m for m, _ in ranked[:top_n]])
+        topic_tasks: Dict[str, asyncio.Future] = {}
 
-        # msg_id → summary 맵
-        summary_by_id = {}
-        for m, s in zip(top_msgs, self.summaries):
-            if s and not getattr(s, "original_id", None):
-                s.original_id = m.get("msg_id")
-            summary_by_id[m["msg_id"]] = s
+        async def summarize_topic(topic: Topic, priority: float) -> MessageSummary:
+            """저장된 주제 요약(구성 메시지 키 + 모델 + 프롬프트 버전 기준)이 있으면 재사용, 없으면 요약 후 저장"""
+            members = topic_members[topic.topic_id]
+            agg_key = store.aggregate_key(self.summarizer.model, PROMPT_VERSION, topic.label,
+                                          *sorted(keys[id(m)] for m in members))
+            stored = store.get_aggregate("topic", agg_key)
+            expected = self.summarizer.model if self.summarizer.is_available and self.summarizer.client \
+                else OFFLINE_SOURCE
+            s = MessageSummary.from_dict(stored) if stored is not None else None
+            METRICS.cache("aggregate.topic", s is not None and s.source == expected)
+            if s is None or s.source != expected:
+                s = await with_priority(priority, self.summarizer.summarize_topic(members, topic.label))
+                store.put_aggregate("topic", agg_key, s.to_dict())
+            return s
 
-        # 3) 액션 추출
-        logger.info("⚡ 액션 추출 중...")
-        actions = await self.action_extractor.batch_extract_actions(top_msgs)
-        self.extracted_actions = actions
+        def topic_summary(topic: Topic, priority: float) -> asyncio.Future:
+            """주제 요약 요청은 주제당 1회 (첫 메시지가 자기 우선순위로 시작, 나머지는 같은 결과를 기다림)"""
+            task = topic_tasks.get(topic.topic_id)
+            if task is None:
+                task = asyncio.ensure_future(summarize_topic(topic, priority))
+                topic_tasks[topic.topic_id] = task
+            return task
 
-        actions_by_id = {}
-        for a in actions:
-            src = getattr(a, "source_message_id", None) or (a.get("source_message_id") if isinstance(a, dict) else None)
-            if not src:
-                continue
-            actions_by_id.setdefault(src, []).append(a)
+        # LLM 디스패치 우선순위 (점수 + 마감 임박도): 상위 N개 안에서 높은 것부터 파이프라인에 넣고,
+        # 제한기 대기열에서도 이 순서로 슬롯을 받는다. (결과 순서는 analyze_messages가 rank로 다시 정렬)
+        dispatch = [dispatch_priority(score, m) if i < top_n else 0.0 for i, (m, score) in enumerate(ranked)]
+        feed = sorted(range(len(ranked)), key=lambda i: (i >= top_n, -dispatch[i]))
 
-        # 4) 결과 병합 (전체 랭킹 순서 보존)
-        results = []
-        for message, priority in self.ranked_messages:
-            mid = message["msg_id"]
-            s   = summary_by_id.get(mid)
-            pr  = priority.to_dict() if hasattr(priority, "to_dict") else priority
-            acts = [x.to_dict() if hasattr(x, "to_dict") else x for x in actions_by_id.get(mid, [])]
-            results.append({
-                "message": message,
-                "summary": (s.to_dict() if hasattr(s, "to_dict") else (s.__dict__ if s else None)),
-                "priority": pr,
-                "actions": acts,
+        def source():
+            for i in feed:
+                m, score = ranked[i]
+                yield {"message": m, "key": keys[id(m)], "priority": score, "rank": i, "dispatch": dispatch[i],
+                       "top": i < top_n, "topic": topic_of.get(id(m)), "summary": None, "actions": []}
+
+        async def summarize_new(items):
+            """저장소에 없는 메시지 요약: 확신 게이트(로컬 요약) → 모델 등급 라우팅 → 요약기. 입력 순서 보존"""
+            found = [None] * len(items)
+            rest = list(range(len(items)))
+            if self.gate is not None:
+                gated, rest = self.gate.split([it["message"] for it in items], [it["priority"] for it in items])
+                for i, s in zip(gated, self.gate.summarize([items[i]["message"] for i in gated])):
+                    found[i] = s
+            if rest:
+                msgs = [items[i]["message"] for i in rest]
+                if self.router is not None:
+                    done = await self.router.batch_summarize(msgs, [items[i]["priority"] for i in rest])
+                elif len(msgs) == 1:
+                    done = [await with_priority(items[rest[0]]["dispatch"], self.summarizer.summarize_item(msgs[0]))]
+                else:
+                    done = await self.summarizer.batch_summarize(msgs, [items[i]["dispatch"] for i in rest])
+                for i, s in zip(rest, done):
+                    found[i] = s
+            return found
+
+        # 2) 상위 N개 요약 (저장소에 없는 메시지만 LLM 호출, 주제로 묶인 메시지는 주제 요약 공유)
+        async def summarize(item):
+            if item["top"] and item["topic"] is not None:
+                s = await topic_summary(item["topic"], item["dispatch"])
+                item["summary"] = replace(s, original_id=item["message"].get("msg_id"))
+            elif item["top"]:
+                s = self._stored_summary(item)
+                if s is None:
+                    s = (await summarize_new([item]))[0]
+                    store.update(item["key"], summary=s)
+                item["summary"] = replace(s, original_id=item["message"].get("msg_id"))
+            return item
+
+        # 2') 묶음 모드: 도착한 항목을 모아 저장소에 없는 메시지만 한 요청으로 요약
+        #     (LLM이 없으면 같은 묶음을 로컬 추출 요약기로 한 번에 처리)
+        async def summarize_batch(items):
+            pending = []
+            grouped = [(item, topic_summary(item["topic"], item["dispatch"]))
+                       for item in items if item["top"] and item["topic"] is not None]
+            for item in items:
+                if item["top"] and item["topic"] is None:
+                    s = self._stored_summary(item)
+                    if s is None:
+                        pending.append(item)
+                    else:
+                        item["summary"] = replace(s, original_id=item["message"].get("msg_id"))
+            if pending:
+                for it, s in zip(pending, await summarize_new(pending)):
+                    store.update(it["key"], summary=s)
+                    it["summary"] = replace(s, original_id=it["message"].get("msg_id"))
+            for item, task in grouped:
+                item["summary"] = replace(await task, original_id=item["message"].get("msg_id"))
+            return items
+
+        # 3) 액션 추출 (저장소에 없는 메시지만)
+        async def extract(item):
+            if item["top"]:
+                entry = store.entry(item["key"])
+                METRICS.cache("analysis.actions", entry.actions is not None)
+                if entry.actions is None:
+                    try:
+                        found = self.action_extractor.extract_actions(item["message"])
+                    except Exception as e:
+                        logger.error(f"메시지 액션 추출 오류: {e}")
+                        found = []
+                    store.update(item["key"], actions=found)
+                mid = item["message"]["msg_id"]
+                item["actions"] = [replace(a, source_message_id=mid) for a in entry.actions]
+            return item
+
+        # 4) 결과 병합
+        async def merge(item):
+            s = item["summary"]
+            if s is not None:
+                summaries[item["rank"]] = s
+            actions.extend(item["actions"])
+            pr = item["priority"]
+            return {
+                "message": item["message"],
+                "summary": s.to_dict() if s is not None else None,
+                "priority": pr.to_dict() if hasattr(pr, "to_dict") else pr,
+                "actions": [x.to_dict() for x in item["actions"]],
+                "topic": item["topic"].to_dict() if item["topic"] is not None else None,
                 "analysis_timestamp": datetime.now().isoformat()
-            })
+            }
+
+        workers = ANALYSIS_CONFIG.get("summarize_workers", 5)
+        if not self.summarizer.is_available:
+            summarize_stage = Stage("summarize", summarize_batch, workers=1,
+                                    batch_size=ANALYSIS_CONFIG.get("offline_batch_size", 256))
+        elif self.summarizer.batch_mode == "packed":
+            summarize_stage = Stage("summarize", summarize_batch, workers=workers,
+                                    batch_size=self.summarizer.pack_max_items)
+        else:
+            summarize_stage = Stage("summarize", summarize, workers=workers)
+
+        pipeline = Pipeline([
+            summarize_stage,
+            Stage("extract", extract),
+            Stage("merge", merge),
+        ], queue_size=ANALYSIS_CONFIG.get("pipeline_queue_size", 32), name="analyze")
+
+        logger.info(f"📝 상위 {top_n}개 메시지 요약/액션 추출 파이프라인 시작...")
+        async for result in pipeline.run(source()):
+            yield result
+
+        self.summaries = [summaries[i] for i in sorted(summaries)]
+        priority_order = {"high": 3, "medium": 2, "low": 1}
+        actions.sort(key=lambda x: (priority_order.get(x.priority, 1), x.deadline or datetime.max), reverse=True)
+        self.extracted_actions = actions
+        if self.gate is not None:
+            self.gate_report = self.gate.report()
+            if self.gate_report.seen:
+                logger.info(self.gate_report.format())
+            if self.gate_report.shadow_pending:
+                # 섀도 요청(우선순위 최하)은 분석을 붙잡지 않고 백그라운드로 끝난 뒤 일치율을 보고
+                self._shadow_watch = asyncio.ensure_future(self._report_shadow(self.gate_report))
+        if self.router is not None:
+            self.routing_report = self.router.report()
+            if self.routing_report.items:
+                logger.info(self.routing_report.format())
+        if flights is not None:
+            self.coalesce_report = flights.stats().since(flights_before)
+            if self.coalesce_report.coalesced:
+                logger.info(self.coalesce_report.format())
+
+    async def _report_shadow(self, report: GateReport):
+        await self.gate.drain(report)
+        self.gate.report(report)
+        if report.shadow:
+            logger.info("🚦 섀도 측정 완료\n" + report.format())
+
+    async def wait_shadow(self):
+        """마지막 실행의 섀도 측정이 끝날 때까지 대기 (대기를 취소해도 측정은 계속됨)"""
+        task = self._shadow_watch
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def summarize_conversation_text(self, on_update: Optional[Callable[[str], None]] = None) -> str:
+        """
+        메신저 대화방별 누적 요약 텍스트 (분석 탭 프리앰블)
+        방마다 지난 실행 이후 새 메시지만 이전 요약에 반영한다. on_update(텍스트)는 방 하나가 끝날 때마다 호출.
+        """
+        chat_msgs = [m for m in self.collected_messages if m.get("type") == "messenger"]
+        if not chat_msgs:
+            return ""
+        done = {}
+
+        def on_room(state):
+            done[state.room] = state
+            if on_update:
+                on_update(format_room_summaries(done))
 
-        # 5) (선택) 메신저 대화 전체 요약을 프리앰블로 생성
-        conv_text = ""
         try:
-            chat_msgs = [m for m in self.collected_messages if m.get("type") == "messenger"]
-            if chat_msgs:
-                conv = await self.summarizer.summarize_conversation(chat_msgs)
-
-                def _bullets(title, items, limit=6):
-                    if not items:
-                        return []
-                    if isinstance(items, list):
-                        items = items[:limit]
-                    lines = [f"■ {title}"]
-                    for it in items:
-                        lines.append(f"- {it}")
-                    lines.append("")
-                    return lines
-
-                parts = []
-                if isinstance(conv, dict):
-                    if conv.get("summary"):
-                        parts += ["■ 대화 흐름 요약", "═"*60, conv["summary"].strip(), ""]
-                    parts += _bullets("핵심 포인트", conv.get("key_points"))
-                    parts += _bullets("결정 사항", conv.get("decisions"))
-                    parts += _bullets("미해결/후속 필요", conv.get("unresolved"))
-                    parts += _bullets("리스크/주의", conv.get("risks"))
-
-                    # 액션아이템이 dict 리스트일 수도 있음
-                    ai = conv.get("action_items") or []
-                    if ai:
-                        parts.append("■ 액션 아이템")
-                        for a in ai[:8]:
-                            if isinstance(a, dict):
-                                title = a.get("title") or a.get("task") or str(a)
-                                pr    = a.get("priority")
-                                owner = a.get("owner")
-                                due   = a.get("due")
-                                meta = ", ".join([x for x in [
-                                    f"우선:{pr}" if pr else None,
-                                    f"담당:{owner}" if owner else None,
-                                    f"마감:{due}" if due else None
-                                ] if x])
-                                parts.append(f"- {title}" + (f" ({meta})" if meta else ""))
-                            else:
-                                parts.append(f"- {a}")
-                        parts.append("")
-
-                    if conv.get("participants"):
-                        parts += ["참여자: " + ", ".join(conv["participants"]), ""]
-
-                # 혹시 문자열이 오면 그대로 사용
-                if not parts and isinstance(conv, str):
-                    parts = ["■ 대화 흐름 요약", "═"*60, conv.strip()]
-
-                conv_text = "\n".join(parts).strip()
+            with METRICS.stage("analyze.conversation", items=len(chat_msgs)):
+                states = await self.room_summarizer.update(chat_msgs, on_room=on_room)
         except Exception as e:
             logger.warning(f"대화 요약 실패: {e}")
+            return ""
+        self.conversation_summary = {room: st.summary for room, st in states.items()}
+        return format_room_summaries(states)
+
+    async def analyze_messages(self, on_result: Optional[Callable[[Dict, int, int], None]] = None,
+                               on_partial: Optional[Callable[[str], None]] = None):
+        """
+        전체 분석. 결과는 전체 랭킹 순서로 반환하며,
+        on_result(result, done, total)로 결과가 나올 때마다 알림을 받을 수 있다.
+        on_partial(분석 탭 텍스트)로 우선순위 섹션/개요/대화 요약이 채워지는 동안의 중간 텍스트를 받을 수 있다.
+        대화방 요약은 메시지 분석과 동시에 진행하고, 우선순위 섹션은 상위 메시지 요약이 도착할 때마다 갱신한다.
+        """
+        if not self.collected_messages:
+            logger.warning("분석할 메시지가 없습니다.")
+            return []
+
+        logger.info("🔍 메시지 분석 시작...")
+
+        # 의미 검색 색인은 분석과 동시에 진행 (LLM 대기 시간 동안 CPU 임베딩)
+        index_task = asyncio.create_task(self.index_messages(self.collected_messages))
+
+        # 근접 중복은 대표 1개만 분석 (대화 요약/의미 검색 색인은 원본 전체 사용)
+        messages = self.deduplicate(self.collected_messages)
+
+        # 분석 결과 탭 텍스트 (개요 + 우선순위 섹션 + 메신저 대화 요약)
+        # 개요(순위만 필요)와 대화방 요약(원본 메신저 메시지)은 메시지별 요약이 끝나기를 기다리지 않고 첫 결과가 나오면
+        # 시작하고, 우선순위 섹션은 상위 메시지 요약이 도착할 때마다 갱신한다. on_partial로 채워지는 대로 중간 텍스트를 알린다.
+        report = {"overview": "", "sections": "", "conversation": ""}
 
+        def publish():
+            if on_partial:
+                text = compose_overall_text(report["overview"], report["sections"])
+                if report["conversation"]:
+                    text += "\n\n" + report["conversation"]
+                on_partial(text)
 
-        # 6) 분석 결과 탭 텍스트 생성 (우선순위 섹션 포함)
-        sections_text = await build_overall_analysis_text(self, results)
-        self.analysis_report_text = sections_text + ("\n\n" + conv_text if conv_text else "")
+        def on_overview(text):
+            report["overview"] = text
+            publish()
 
+        def on_conversation(text):
+            report["conversation"] = text
+            publish()
+
+        async def overview_task(ranked):
+            with METRICS.stage("analyze.report"):
+                return await build_overview(self, [m for m, _ in ranked],
+                                            on_overview=on_overview if on_partial else None)
+
+        side_tasks = []
+        order: Dict[int, int] = {}
+
+        def start_side_tasks():
+            # 첫 LLM 슬롯은 메시지 요약이 받고(첫 결과 = LLM 1회 왕복), 두 작업은 이후 남는 슬롯으로 진행
+            ranked = self.ranked_messages
+            order.update((id(m), i) for i, (m, _) in enumerate(ranked))
+            side_tasks.append(asyncio.ensure_future(with_priority(_REPORT_PRIORITY, overview_task(ranked))))
+            side_tasks.append(asyncio.ensure_future(with_priority(
+                _REPORT_PRIORITY, self.summarize_conversation_text(on_update=on_conversation if on_partial else None))))
+
+        def by_rank(items):
+            return sorted(items, key=lambda r: order.get(id(r["message"]), len(order)))
+
+        results = []
+        total = len(messages)
+        try:
+            async for result in self.analyze_messages_stream(messages):
+                if not side_tasks:
+                    start_side_tasks()
+                results.append(result)
+                if on_result:
+                    on_result(result, len(results), total)
+                if on_partial and result["summary"] is not None:
+                    report["sections"] = format_priority_sections(by_rank(results))
+                    publish()
+        except BaseException:
+            for task in side_tasks:
+                task.cancel()
+            raise
+
+        if not side_tasks:
+            start_side_tasks()
+
+        # 전체 랭킹 순서 보존
+        results = by_rank(results)
+        report["sections"] = format_priority_sections(results)
+        publish()
+
+        overview, conv_text = await asyncio.gather(*side_tasks)
+        self.analysis_report_text = compose_overall_text(overview, report["sections"]) + (
+            "\n\n" + conv_text if conv_text else "")
+        await index_task
 
         logger.info(f"🔍 {len(results)}개 메시지 분석 완료")
         return results
@@ -451,7 +984,9 @@ class SmartAssistant:
                         "id": result["message"]["msg_id"],
                         "sender": result["message"]["sender"],
                         "subject": result["message"]["subject"],
-                        "platform": result["message"]["platform"]
+                        "platform": result["message"]["platform"],
+                        # 같은 내용의 교차 게시/전달/반복 알림 (이 TODO 하나로 대신함)
+                        "duplicate_ids": [d["msg_id"] for d in result["message"].get("duplicates", [])]
                     },
                     "created_at": action["created_at"]
                 }
@@ -481,8 +1016,23 @@ class SmartAssistant:
             }
         }
         
+        if self.db is not None:
+            with METRICS.stage("todo.save", items=len(todo_items)):
+                self.db.save_cycle(todo_list, todo_items, self.analysis_report_text,
+                                   message_count=len(analysis_results), started_at=self.cycle_started_at)
+
         logger.info(f"📋 TODO 리스트 생성 완료: {len(todo_items)}개 아이템")
         return todo_list
+
+    def load_last_result(self) -> Optional[Dict]:
+        """assistant.db에 저장된 마지막 실행 결과 (재시작 직후 화면 복원용)"""
+        if self.db is None:
+            return None
+        try:
+            return self.db.latest_cycle()
+        except Exception as e:
+            logger.error(f"마지막 실행 결과 로드 오류: {e}")
+            return None
     
     async def cleanup(self):
         """리소스 정리"""
@@ -490,8 +1040,18 @@ class SmartAssistant:
         
         if self.email_collector:
             await self.email_collector.disconnect()
+
+        if self.db is not None:
+            await asyncio.to_thread(self.db.flush)
         
         logger.info("✅ 정리 완료")
+
+    def close(self):
+        """프로세스 종료 시 호출: 저장되지 않은 의미 검색 인덱스 저장, assistant.db 닫기"""
+        if self.semantic_index is not None:
+            self.semantic_index.close()
+        if self.db is not None:
+            self.db.close()
     
     async def run_full_cycle(self, email_config: Dict = None, messenger_config: Dict = None) -> Dict:
         """전체 사이클 실행"""
@@ -515,7 +1075,10 @@ class SmartAssistant:
                 "success": True,
                 "todo_list": todo_list,
                 "analysis_results": analysis_results,
-                "collected_messages": len(messages)
+                "collected_messages": len(messages),
+                "routing": self.routing_report.to_dict() if self.routing_report is not None else None,
+                "gate": self.gate_report.to_dict() if self.gate_report is not None else None,
+                "coalesced": self.coalesce_report.to_dict() if self.coalesce_report is not None else None,
             }
             
         except Exception as e:
@@ -6,5 +6,17 @@ NLP 패키지 - 자연어 처리 모듈들 (요약, 우선순위 분류, 액션
 from .summarize import MessageSummarizer
 from .priority_ranker import PriorityRanker
 from .action_extractor import ActionExtractor
+from .llm_cache import LLMResponseCache
+from .llm_limiter import AdaptiveLimiter
+from .single_flight import SingleFlight
+from .token_budget import TokenCounter
+from .room_summary import RollingRoomSummarizer
+from .extractive import ExtractiveSummarizer
+from .dedup import NearDuplicateDetector
+from .topic_cluster import TopicClusterer
+from .model_router import ModelRouter
+from .confidence_gate import ConfidenceGate
 
-__all__ = ['MessageSummarizer', 'PriorityRanker', 'ActionExtractor']
+__all__ = ['MessageSummarizer', 'PriorityRanker', 'ActionExtractor', 'LLMResponseCache', 'AdaptiveLimiter', 'SingleFlight', 'TokenCounter',
+           'RollingRoomSummarizer', 'ExtractiveSummarizer', 'NearDuplicateDetector',
+           'TopicClusterer', 'ModelRouter', 'ConfidenceGate']
@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from pipeline.metrics import METRICS
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,6 +52,26 @@ class ActionItem:
             "status": self.status
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ActionItem":
+        """to_dict() 결과로부터 복원"""
+        deadline = data.get("deadline")
+        created_at = data.get("created_at")
+        return cls(
+            action_id=data.get("action_id", ""),
+            action_type=data.get("action_type", ""),
+            title=data.get("title", ""),
+            description=data.get("description", ""),
+            deadline=datetime.fromisoformat(deadline) if deadline else None,
+            priority=data.get("priority", "medium"),
+            assignee=data.get("assignee", "나"),
+            requester=data.get("requester", ""),
+            source_message_id=data.get("source_message_id", ""),
+            context=data.get("context", {}),
+            created_at=datetime.fromisoformat(created_at) if created_at else None,
+            status=data.get("status", "pending"),
+        )
+
 
 class ActionExtractor:
     """액션 추출기"""
@@ -389,13 +411,14 @@ class ActionExtractor:
         """여러 메시지에서 액션 일괄 추출"""
         all_actions = []
         
-        for message in messages:
-            try:
-                actions = self.extract_actions(message)
-                all_actions.extend(actions)
-            except Exception as e:
-                logger.error(f"메시지 액션 추출 오류: {e}")
-                continue
+        with METRICS.stage("nlp.batch_extract", items=len(messages)):
+            for message in messages:
+                try:
+                    actions = self.extract_actions(message)
+                    all_actions.extend(actions)
+                except Exception as e:
+                    logger.error(f"메시지 액션 추출 오류: {e}")
+                    continue
         
         # 우선순위별로 정렬
         priority_order = {"high": 3, "medium": 2, "low": 1}
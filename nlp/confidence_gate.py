@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+규칙 기반 확신 게이트 - PriorityRanker 점수만으로 결론이 분명한 메시지는 LLM을 부르지 않고 로컬에서 요약
+
+- 조건: 긴급/마감 점수가 (거의) 0이고 요청·마감·액션 키워드가 없으며(확인 응답 문구는 제외), 아래 중 하나
+    system_notice : 시스템/봇 발신자 또는 [자동]/[알림] 같은 머리말
+    chit_chat     : 잡담/확인 응답 패턴("ㅋㅋ", "넵", "감사합니다" ...)이 있는 짧은 메시지
+    one_liner     : 물음표 없는 짧은 한 줄 메시지
+- 게이트를 통과한 메시지는 로컬 추출 요약(MessageSummarizer.summarize_offline)으로 만든다. (source=GATE_SOURCE)
+  (긴급도 low, action_required false는 규칙으로 이미 결정됨)
+- 섀도 측정: 통과한 메시지 중 shadow_rate 비율(msg_id 해시로 결정적 표본)을 LLM으로도 요약해
+  긴급도/액션 필요 여부/감정 일치율을 잰다. 섀도 요청은 결과에 쓰지 않고 분석과 동시에 진행하며,
+  분석이 끝나도 기다리지 않는다. 남은 요청은 백그라운드로 끝나 요청한 실행의 GateReport에 반영된다. (drain(report)로 대기)
+
+LLM을 쓸 수 없으면 게이트는 아무것도 하지 않는다. (어차피 전부 로컬 요약)
+"""
+import asyncio
+import logging
+import zlib
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import CONFIDENCE_GATE_CONFIG, PRIORITY_RULES
+from pipeline.metrics import METRICS
+from nlp.llm_limiter import with_priority
+from nlp.summarize import GATE_SOURCE, MessageSummarizer, MessageSummary, _ACTION_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# 하나라도 있으면 게이트를 닫는 표현 (요청/마감/일정)
+_DECISIVE_BLOCKERS = ("까지", "마감", "deadline", "제출", "요청", "부탁", "해주세요", "주세요", "please", "review")
+
+_FIELDS = ("urgency_level", "action_required", "sentiment")
+
+# 섀도 요청은 측정용이라 실제 요약 호출이 모두 슬롯을 받은 뒤에만 나감
+_SHADOW_PRIORITY = -1.0
+
+
+def _text_of(message: Dict) -> Tuple[str, str]:
+    content = (message.get("content") or message.get("body") or "").strip()
+    subject = (message.get("subject") or "").strip()
+    return content, subject
+
+
+def _score(priority, name: str) -> float:
+    if priority is None:
+        return 1.0
+    if isinstance(priority, dict):
+        return float(priority.get(name, 1.0))
+    return float(getattr(priority, name, 1.0))
+
+
+@dataclass
+class GateReport:
+    """실행 1회의 게이트 통과율과 섀도 일치율"""
+    seen: int = 0
+    gated: int = 0
+    reasons: Dict[str, int] = field(default_factory=dict)
+    shadow: int = 0
+    shadow_pending: int = 0  # 아직 끝나지 않은 섀도 요청 (백그라운드 진행 중)
+    agree: Dict[str, int] = field(default_factory=lambda: {f: 0 for f in _FIELDS})
+    agree_all: int = 0  # 긴급도와 액션 필요 여부가 모두 일치
+
+    @property
+    def hit_rate(self) -> float:
+        return self.gated / self.seen if self.seen else 0.0
+
+    def agreement(self, name: str = None) -> Optional[float]:
+        if not self.shadow:
+            return None
+        return (self.agree_all if name is None else self.agree[name]) / self.shadow
+
+    def to_dict(self) -> Dict:
+        return {
+            "seen": self.seen,
+            "gated": self.gated,
+            "hit_rate": round(self.hit_rate, 4),
+            "reasons": dict(self.reasons),
+            "shadow": self.shadow,
+            "shadow_pending": self.shadow_pending,
+            "agreement": self.agreement(),
+            "agreement_by_field": {f: self.agreement(f) for f in _FIELDS},
+        }
+
+    def format(self) -> str:
+        reasons = ", ".join(f"{k} {v}" for k, v in sorted(self.reasons.items()))
+        line = f"🚦 확신 게이트: {self.seen}건 중 {self.gated}건 LLM 생략 ({self.hit_rate:.0%})" + (
+            f" [{reasons}]" if reasons else "")
+        if self.shadow:
+            by_field = ", ".join(f"{f} {self.agreement(f):.0%}" for f in _FIELDS)
+            line += f"\n   - 섀도 {self.shadow}건 LLM 일치율 {self.agreement():.0%} ({by_field})"
+        if self.shadow_pending:
+            line += f"\n   - 섀도 {self.shadow_pending}건 측정 중 (끝나면 일치율 보고)"
+        return line
+
+
+class ConfidenceGate:
+    """규칙 점수가 결정적인 메시지를 골라 로컬 요약 (+ 섀도 표본으로 LLM과 일치율 측정)"""
+
+    def __init__(self, summarizer: MessageSummarizer, config: Optional[Dict] = None):
+        cfg = {**CONFIDENCE_GATE_CONFIG, **(config or {})}
+        self.summarizer = summarizer
+        self.max_urgency = cfg.get("max_urgency_score", 0.2)
+        self.one_liner_chars = cfg.get("one_liner_chars", 40)
+        self.chit_chat_chars = cfg.get("chit_chat_chars", 80)
+        self.shadow_rate = cfg.get("shadow_rate", 0.1)
+        self.chit_chat = [p.lower() for p in cfg.get("chit_chat_patterns", [])]
+        self.system_senders = [s.lower() for s in cfg.get("system_senders", [])]
+        self.system_prefixes = [p.lower() for p in cfg.get("system_prefixes", [])]
+        self.ack_phrases = [p.lower() for p in cfg.get("ack_phrases", [])]
+        self.blockers = list(dict.fromkeys(
+            [k.lower() for k in PRIORITY_RULES.get("high_priority_keywords", [])
+             + PRIORITY_RULES.get("medium_priority_keywords", [])]
+            + _ACTION_KEYWORDS + list(_DECISIVE_BLOCKERS)))
+        self._shadow_tasks: Dict[asyncio.Future, GateReport] = {}  # 진행 중 섀도 요청 → 요청한 실행의 보고
+        self.reset()
+
+    # ─────────────────────────────────────────────
+    # 판정
+    # ─────────────────────────────────────────────
+    def decide(self, message: Dict, priority=None) -> Optional[str]:
+        """LLM을 생략해도 되는 이유 (system_notice | chit_chat | one_liner) 또는 None"""
+        if _score(priority, "deadline_score") > 0 or _score(priority, "urgency_score") > self.max_urgency:
+            return None
+        content, subject = _text_of(message)
+        text = f"{subject} {content}".lower()
+        # "확인했습니다" 같은 확인 응답은 "확인" 키워드로 치지 않음 (키워드 점수 대신 남은 텍스트로 판정)
+        rest = text
+        for phrase in self.ack_phrases:
+            rest = rest.replace(phrase, " ")
+        if any(k in rest for k in self.blockers):
+            return None
+
+        sender = (message.get("sender") or "").lower()
+        head = (subject or content)[:40].lower()
+        if any(s in sender for s in self.system_senders) or any(head.startswith(p) for p in self.system_prefixes):
+            return "system_notice"
+        if len(content) <= self.chit_chat_chars and any(p in text for p in self.chit_chat):
+            return "chit_chat"
+        if len(content) <= self.one_liner_chars and "\n" not in content and "?" not in content:
+            return "one_liner"
+        return None
+
+    def split(self, messages: Sequence[Dict], priorities: Sequence) -> Tuple[List[int], List[int]]:
+        """(게이트 통과 위치, LLM으로 보낼 위치)"""
+        if not (self.summarizer.is_available and self.summarizer.client):
+            return [], list(range(len(messages)))
+        gated, rest = [], []
+        for i, (m, pr) in enumerate(zip(messages, priorities)):
+            reason = self.decide(m, pr)
+            if reason is None:
+                rest.append(i)
+            else:
+                gated.append(i)
+                self._report.reasons[reason] = self._report.reasons.get(reason, 0) + 1
+                METRICS.inc("gate_decisions_total", 1, result="local", reason=reason)
+        self._report.seen += len(messages)
+        self._report.gated += len(gated)
+        if rest:
+            METRICS.inc("gate_decisions_total", len(rest), result="llm", reason="")
+        return gated, rest
+
+    def summarize(self, messages: List[Dict]) -> List[MessageSummary]:
+        """게이트 통과 메시지 로컬 요약 (표본은 섀도 LLM 요청을 띄움)"""
+        if not messages:
+            return []
+        results = [replace(s, source=GATE_SOURCE) for s in self.summarizer.summarize_offline(messages)]
+        report = self._report
+        for m, local in zip(messages, results):
+            if self._sampled(m):
+                report.shadow_pending += 1
+                task = asyncio.ensure_future(with_priority(_SHADOW_PRIORITY, self._shadow(m, local, report)))
+                self._shadow_tasks[task] = report
+                task.add_done_callback(self._shadow_done)
+        return results
+
+    # ─────────────────────────────────────────────
+    # 섀도 측정
+    # ─────────────────────────────────────────────
+    def _sampled(self, message: Dict) -> bool:
+        if self.shadow_rate <= 0:
+            return False
+        key = message.get("msg_id") or _text_of(message)[0]
+        return zlib.crc32(key.encode("utf-8")) % 10000 < self.shadow_rate * 10000
+
+    def _shadow_done(self, task: asyncio.Future):
+        report = self._shadow_tasks.pop(task, None)
+        if report is not None:
+            report.shadow_pending -= 1
+
+    async def _shadow(self, message: Dict, local: MessageSummary, report: GateReport):
+        content, subject = _text_of(message)
+        sender = (message.get("sender") or "").strip()
+        try:
+            # summarize_item은 실패하면 로컬 요약으로 대체하므로 호출 실패가 드러나도록 직접 요청
+            resp = await self.summarizer._chat(self.summarizer._message_request(content, sender, subject),
+                                               operation="gate_shadow", **self.summarizer._json_extra())
+            llm = self.summarizer._parse_llm_response(resp.choices[0].message.content, sender)
+        except Exception as e:
+            logger.warning(f"섀도 요약 실패 ({message.get('msg_id')}): {e}")
+            return
+        report.shadow += 1
+        same = {f: getattr(local, f) == getattr(llm, f) for f in _FIELDS}
+        for f, ok in same.items():
+            report.agree[f] += ok
+            METRICS.inc("gate_shadow_total", 1, field=f, result="agree" if ok else "disagree")
+        report.agree_all += same["urgency_level"] and same["action_required"]
+
+    async def drain(self, report: Optional[GateReport] = None):
+        """남은 섀도 요청 대기 (report를 주면 그 실행의 요청만, 없으면 전부)"""
+        tasks = [t for t, r in self._shadow_tasks.items() if report is None or r is report]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def reset(self):
+        """실행(주기) 시작 시 누적값 초기화 (이전 실행의 섀도 요청은 계속 이전 보고에 반영)"""
+        self._report = GateReport()
+
+    def report(self, report: Optional[GateReport] = None) -> GateReport:
+        report = report or self._report
+        METRICS.set_gauge("gate_hit_rate", report.hit_rate)
+        if report.shadow:
+            METRICS.set_gauge("gate_shadow_agreement", report.agreement())
+        return report
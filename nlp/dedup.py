@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+근접 중복 메시지 묶기 - 여러 방에 교차 게시된 공지, 전달(FW) 메일, 반복되는 봇 알림을
+요약/액션 추출 전에 하나로 묶어 LLM 호출과 중복 TODO를 줄인다.
+
+- 정규화: 소문자, URL 제거, 전달/회신 머리말과 인용 헤더 제거
+- MinHash: 글자 n-gram(shingle) 집합의 서명 → LSH 밴딩으로 후보 쌍만 비교 (O(n))
+- 추정 Jaccard가 jaccard_threshold 이상이면 중복, 애매한 후보(embedding_candidate_jaccard 이상)는
+  임베딩 모델이 있으면 코사인 유사도로 한 번 더 판정
+- 숫자는 날짜/마감일을 구분해야 하므로 그대로 비교하고, 날짜/시각 표현이 없는 메시지만 같은 발신자끼리
+  숫자를 지운 텍스트로 한 번 더 비교 (빌드 번호/건수만 다른 반복 봇 알림)
+- 날짜/시각 표현("6월 10일", "오후 5시", "14:30" ...)이 서로 다른 두 메시지는 본문이 비슷해도 묶지 않음
+  (마감이 바뀐 재공지가 예전 공지에 묻히지 않도록)
+- union-find로 묶은 뒤 묶음마다 대표 1개(가장 최근 시각 → 가장 긴 본문)를 남기고
+  나머지는 대표 메시지의 "duplicates"에 참조로 붙인다.
+
+NumPy가 없으면 같은 서명을 순수 파이썬으로 계산한다. (느리지만 결과 동일)
+"""
+import logging
+import re
+import zlib
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from config.settings import DEDUP_CONFIG
+from pipeline.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_DIGITS = re.compile(r"\d+")
+_PREFIX = re.compile(r"^\s*(?:(?:re|fw|fwd|회신|답장|전달)\s*:\s*)+", re.I)
+_QUOTE_HEADER = re.compile(
+    r"^\s*(?:-{3,}.*|(?:from|to|cc|sent|date|subject|보낸 ?사람|받는 ?사람|참조|보낸 ?날짜|날짜|제목)\s*:.*)$",
+    re.I | re.M)
+_QUOTE = re.compile(r"^\s*>+\s?", re.M)
+_NON_WORD = re.compile(r"[^\w가-힣]+")
+# 날짜/시각 표현 (숫자를 지워 비교하면 안 되는 숫자)
+_DATE_TIME = re.compile(
+    r"\d{4}\s*[-./]\s*\d{1,2}\s*[-./]\s*\d{1,2}"
+    r"|\d{1,2}\s*월\s*\d{1,2}\s*일|\d{1,2}\s*월|\d{1,2}\s*일"
+    r"|(?<!\d)\d{1,2}/\d{1,2}(?!\d)"
+    r"|\d{1,2}\s*:\s*\d{2}|\d{1,2}\s*시(?:\s*\d{1,2}\s*분)?|\d{1,2}\s*(?:am|pm)\b", re.I)
+
+
+def normalize(text: str, mask_digits: bool = False) -> str:
+    """중복 판정용 정규화 텍스트 (mask_digits: 숫자 → 0)"""
+    text = _PREFIX.sub("", text or "")
+    text = _QUOTE_HEADER.sub(" ", text)
+    text = _QUOTE.sub("", text)
+    text = _URL.sub(" ", text.lower())
+    if mask_digits:
+        text = _DIGITS.sub("0", text)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def date_tokens(text: str) -> frozenset:
+    """본문의 날짜/시각 표현 집합 (전달/인용 헤더의 날짜는 제외, 공백 제거)"""
+    text = _QUOTE_HEADER.sub(" ", _PREFIX.sub("", text or ""))
+    return frozenset(re.sub(r"\s+", "", t.lower()) for t in _DATE_TIME.findall(text))
+
+
+def _timestamp(message: Dict) -> float:
+    """대표 선택용 시각 (읽을 수 없으면 가장 이른 값)"""
+    value = message.get("date")
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        try:
+            ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except (TypeError, ValueError):
+            try:
+                ts = parsedate_to_datetime(str(value))
+            except (TypeError, ValueError, IndexError):
+                return float("-inf")
+    try:
+        return ts.timestamp()
+    except (OverflowError, OSError, ValueError):
+        return float("-inf")
+
+
+def message_text(message: Dict) -> str:
+    subject = _PREFIX.sub("", message.get("subject") or "").strip()
+    body = (message.get("content") or message.get("body") or "").strip()
+    return f"{subject}\n{body}" if subject else body
+
+
+def shingles(text: str, size: int = 4) -> List[int]:
+    """정규화 텍스트(공백 제거)의 글자 n-gram 해시 (중복 제거)"""
+    compact = text.replace(" ", "")
+    if len(compact) <= size:
+        return [zlib.crc32(compact.encode("utf-8"))] if compact else []
+    return list({zlib.crc32(compact[i:i + size].encode("utf-8")) for i in range(len(compact) - size + 1)})
+
+
+@dataclass
+class DedupResult:
+    """중복 제거 결과"""
+    messages: List[Dict]                                       # 대표 메시지 (입력 순서, duplicates 참조 포함)
+    clusters: List[List[int]] = field(default_factory=list)    # 2개 이상 묶인 입력 인덱스 목록 (대표가 첫 번째)
+
+    @property
+    def removed(self) -> int:
+        return sum(len(c) - 1 for c in self.clusters)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class NearDuplicateDetector:
+    """MinHash LSH (+ 선택적 임베딩 코사인) 기반 근접 중복 묶기"""
+
+    def __init__(self, embedder=None, config: Optional[Dict] = None):
+        cfg = {**DEDUP_CONFIG, **(config or {})}
+        self.shingle_size = cfg.get("shingle_size", 4)
+        self.num_perm = cfg.get("num_perm", 64)
+        self.bands = cfg.get("bands", 16)
+        self.rows = self.num_perm // self.bands
+        self.jaccard_threshold = cfg.get("jaccard_threshold", 0.8)
+        self.embedding_candidate_jaccard = cfg.get("embedding_candidate_jaccard", 0.5)
+        self.cosine_threshold = cfg.get("cosine_threshold", 0.95)
+        self.min_chars = cfg.get("min_chars", 20)
+        self.embedder = embedder if cfg.get("use_embeddings", True) else None
+
+        # 해시 함수: multiply-shift ((a·x + b) mod 2^64) >> 32, a는 홀수 - 고정 시드라 실행마다 같은 서명
+        state = 0x5EED
+        self._a, self._b = [], []
+        for _ in range(self.num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) & _MASK64
+            self._a.append(state | 1)
+            state = (state * 6364136223846793005 + 1442695040888963407) & _MASK64
+            self._b.append(state)
+
+    # ─────────────────────────────────────────────
+    # MinHash 서명
+    # ─────────────────────────────────────────────
+    def signatures(self, shingle_sets: Sequence[List[int]]):
+        """MinHash 서명 (NumPy가 있으면 (문서 수 × num_perm) 배열, 없으면 튜플 목록)"""
+        if np is not None:
+            return self._signatures_numpy(shingle_sets)
+        return [tuple(min(((a * h + b) & _MASK64) >> 32 for h in hs) for a, b in zip(self._a, self._b))
+                for hs in shingle_sets]
+
+    def _signatures_numpy(self, shingle_sets: Sequence[List[int]]) -> "np.ndarray":
+        a = np.asarray(self._a, dtype=np.uint64)[:, None]
+        b = np.asarray(self._b, dtype=np.uint64)[:, None]
+        out = np.empty((len(shingle_sets), self.num_perm), dtype=np.uint64)
+        # 문서 여러 개의 shingle을 이어 붙여 (해시 함수 × shingle) 행렬을 한 번에 계산, 문서 구간별 최솟값
+        start, budget = 0, 1 << 16
+        while start < len(shingle_sets):
+            end, used = start, 0
+            while end < len(shingle_sets) and (used < budget or end == start):
+                used += len(shingle_sets[end])
+                end += 1
+            sizes = [len(hs) for hs in shingle_sets[start:end]]
+            h = np.fromiter((x for hs in shingle_sets[start:end] for x in hs), dtype=np.uint64, count=used)
+            with np.errstate(over="ignore"):
+                values = (a * h[None, :] + b) >> np.uint64(32)
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            out[start:end] = np.minimum.reduceat(values, offsets, axis=1).T
+            start = end
+        return out
+
+    def _candidates(self, sigs, groups: Sequence) -> Dict[Tuple[int, int], float]:
+        """
+        LSH 밴딩: 밴드 하나라도 같으면 후보 (groups 값이 같은 것끼리만).
+        같은 버킷은 첫 항목(기준)과만 비교해 쌍 수를 O(n)으로 제한. 반환: (기준, 항목) 위치 → 추정 Jaccard
+        """
+        if np is not None:
+            return self._candidates_numpy(sigs, groups)
+        candidates: Dict[Tuple[int, int], float] = {}
+        for band in range(self.bands):
+            lo = band * self.rows
+            buckets: Dict[Tuple, int] = {}
+            for i, sig in enumerate(sigs):
+                anchor = buckets.setdefault((groups[i],) + sig[lo:lo + self.rows], i)
+                if anchor != i and (anchor, i) not in candidates:
+                    candidates[(anchor, i)] = sum(x == y for x, y in zip(sigs[anchor], sig)) / self.num_perm
+        return candidates
+
+    def _candidates_numpy(self, sigs: "np.ndarray", groups: Sequence) -> Dict[Tuple[int, int], float]:
+        _, group_ids = np.unique(np.asarray([str(g) for g in groups]), return_inverse=True)
+        n = len(sigs)
+        anchors, items = [], []
+        with np.errstate(over="ignore"):
+            for band in range(self.bands):
+                # (그룹, 밴드 행들)을 64비트 키 하나로 (곱셈 해시, 오버플로는 의도된 wrap-around)
+                key = group_ids.astype(np.uint64).ravel() + np.uint64(1)
+                for col in sigs[:, band * self.rows:(band + 1) * self.rows].T:
+                    key = key * np.uint64(0x9E3779B97F4A7C15) + col
+                _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+                anchor = first[inverse.ravel()]
+                mask = anchor != np.arange(n)
+                anchors.append(anchor[mask])
+                items.append(np.nonzero(mask)[0])
+        pair_keys = np.unique(np.concatenate(anchors).astype(np.int64) * n + np.concatenate(items))
+        if not len(pair_keys):
+            return {}
+        left, right = pair_keys // n, pair_keys % n
+        sims = (sigs[left] == sigs[right]).mean(axis=1)
+        return {(int(i), int(j)): float(sim) for i, j, sim in zip(left, right, sims)}
+
+    # ─────────────────────────────────────────────
+    # 묶기
+    # ─────────────────────────────────────────────
+    def find_clusters(self, messages: Sequence[Dict]) -> List[List[int]]:
+        """근접 중복 묶음 (입력 인덱스 목록, 2개 이상인 묶음만)"""
+        raw = [message_text(m) for m in messages]
+        texts = [normalize(t) for t in raw]
+        eligible = [i for i, t in enumerate(texts) if len(t.replace(" ", "")) >= self.min_chars]
+        if len(eligible) < 2:
+            return []
+
+        sigs = self.signatures([shingles(texts[i], self.shingle_size) for i in eligible])
+        candidates = {(eligible[i], eligible[j]): sim
+                      for (i, j), sim in self._candidates(sigs, [""] * len(eligible)).items()}
+
+        # 날짜/시각 표현이 다른 쌍은 묶지 않음 (마감이 바뀐 재공지)
+        stamps = {i: date_tokens(raw[i]) for i in eligible}
+
+        # 날짜/시각 없이 숫자만 있는 메시지는 같은 발신자끼리 숫자를 지운 텍스트로도 비교 (번호만 다른 반복 알림)
+        numbered = [i for i in eligible if _DIGITS.search(texts[i]) and not stamps[i]]
+        if len(numbered) > 1:
+            masked = self.signatures([shingles(normalize(raw[i], mask_digits=True), self.shingle_size)
+                                      for i in numbered])
+            senders = [(messages[i].get("sender") or "").strip().lower() for i in numbered]
+            for (i, j), sim in self._candidates(masked, senders).items():
+                pair = (numbered[i], numbered[j])
+                candidates[pair] = max(sim, candidates.get(pair, 0.0))
+
+        uf = _UnionFind(len(messages))
+        gray = []
+        for (i, j), sim in candidates.items():
+            if stamps[i] != stamps[j]:
+                continue
+            if sim >= self.jaccard_threshold:
+                uf.union(i, j)
+            elif sim >= self.embedding_candidate_jaccard:
+                gray.append((i, j))
+
+        if gray and self.embedder is not None:
+            for i, j in self._confirm_by_embedding(messages, gray):
+                uf.union(i, j)
+
+        groups: Dict[int, List[int]] = {}
+        for i in eligible:
+            groups.setdefault(uf.find(i), []).append(i)
+        return [g for g in groups.values() if len(g) > 1]
+
+    def _confirm_by_embedding(self, messages: Sequence[Dict], pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """애매한 후보 쌍을 임베딩 코사인 유사도로 판정 (관련 메시지만 한 번에 임베딩)"""
+        idx = sorted({k for pair in pairs for k in pair})
+        try:
+            vectors = self.embedder.encode([message_text(messages[k]) for k in idx])
+        except Exception as e:
+            logger.warning(f"중복 판정용 임베딩 실패: {e}")
+            return []
+        row = {k: n for n, k in enumerate(idx)}
+        return [(i, j) for i, j in pairs
+                if float(vectors[row[i]] @ vectors[row[j]]) >= self.cosine_threshold]
+
+    @staticmethod
+    def _representative(messages: Sequence[Dict], group: List[int]) -> int:
+        """가장 최근 메시지, 같으면 본문이 가장 긴 것 → msg_id 순 (실행마다 같은 대표)"""
+        def key(i):
+            m = messages[i]
+            return (-_timestamp(m), -len(message_text(m)), str(m.get("msg_id") or ""))
+        return min(group, key=key)
+
+    def deduplicate(self, messages: Sequence[Dict]) -> DedupResult:
+        """묶음마다 대표만 남기고 나머지는 대표의 duplicates에 참조로 붙임 (입력 dict는 수정하지 않음)"""
+        with METRICS.stage("analyze.dedup", items=len(messages)):
+            clusters = self.find_clusters(messages)
+            drop, reps = set(), {}
+            ordered = []
+            for group in clusters:
+                rep = self._representative(messages, group)
+                others = [i for i in group if i != rep]
+                reps[rep] = others
+                drop.update(others)
+                ordered.append([rep] + others)
+
+            out = []
+            for i, m in enumerate(messages):
+                if i in drop:
+                    continue
+                if i in reps:
+                    m = {**m, "duplicates": [{
+                        "msg_id": messages[k].get("msg_id"),
+                        "platform": messages[k].get("platform"),
+                        "room": messages[k].get("room"),
+                        "sender": messages[k].get("sender"),
+                        "date": messages[k].get("date"),
+                    } for k in reps[i]]}
+                out.append(m)
+
+        result = DedupResult(messages=out, clusters=ordered)
+        if result.removed:
+            METRICS.inc("dedup_removed_total", result.removed)
+            logger.info(f"🧹 근접 중복 {len(clusters)}묶음: {len(messages)}개 → {len(out)}개")
+        return result
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 추출 요약 - API 키가 없거나 LLM 호출이 실패했을 때 쓰는 오프라인 요약 엔진
+
+- 문장 분리: 마침표/물음표/느낌표, 줄바꿈, 마침표 없는 한국어 종결어미(~니다, ~요, ~죠 ...) 기준
+- 토큰: 한글은 어절 내 글자 bigram(형태소 분석기 없이 조사/어미 변화에 강함), 영문/숫자는 단어
+- 점수: 메시지 목록 전체에서 구한 IDF로 TF-IDF 문장 벡터를 만들고, 메시지 안 문장 유사도 그래프에서 TextRank
+- 여러 메시지를 한 번에 처리: 모든 문장의 희소 행렬(행, 열, 값)을 NumPy 배열로 두고
+  메시지별 가중 중심 벡터를 이용해 TextRank 반복을 O(비영 항목 수)로 계산 (메시지별 루프 없음)
+
+NumPy가 없으면 같은 점수(1회 반복, 차수 중심성)를 순수 파이썬으로 계산한다.
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 문장 경계: 구두점 뒤 공백/끝, 줄바꿈, 마침표 없이 끝난 한국어 종결어미 뒤 공백
+_ENDINGS = ("니다", "세요", "해요", "어요", "아요", "예요", "에요", "네요", "군요", "래요", "지요", "까요", "죠")
+_SENTENCE_END = re.compile(
+    r"(?<=[.!?。！？])\s+"
+    r"|\n+"
+    r"|(?:" + "|".join(f"(?<={e})" for e in _ENDINGS) + r")\s+(?=\S)"
+)
+_BULLET = re.compile(r"^\s*(?:[-*•·▶►]|\d+[.)])\s*")
+_TOKEN = re.compile(r"[가-힣]+|[a-z][a-z0-9_]+|\d+[a-z가-힣]*")
+_STOPWORDS = {
+    "the", "and", "for", "you", "are", "with", "this", "that", "have", "from", "will", "please", "thanks",
+    "안녕하세요", "감사합니다", "수고하세요", "수고하셨습니다",
+}
+_LEAD_BONUS = 0.15      # 첫 문장 가산점 (업무 메시지는 핵심을 앞에 두는 경우가 많음)
+_KEYWORD_BONUS = 0.2    # 업무 키워드(요청/마감 등) 포함 문장 가산점
+_DAMPING = 0.85
+_ITERATIONS = 20
+
+
+def split_sentences(text: str, min_chars: int = 4) -> List[str]:
+    """한국어/영어 혼합 문장 분리 (너무 짧은 조각은 앞 문장에 붙임)"""
+    out: List[str] = []
+    for raw in _SENTENCE_END.split(text or ""):
+        s = _BULLET.sub("", raw).strip()
+        if not s:
+            continue
+        if out and len(s) < min_chars:
+            out[-1] = f"{out[-1]} {s}"
+        else:
+            out.append(s)
+    return out
+
+
+def tokenize(sentence: str) -> List[str]:
+    """TF-IDF용 토큰: 한글 어절은 글자 bigram(1글자 어절은 그대로), 영문/숫자는 단어"""
+    tokens = []
+    for word in _TOKEN.findall(sentence.lower()):
+        if word in _STOPWORDS:
+            continue
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1:
+            tokens.append(word)
+    return tokens
+
+
+@dataclass
+class ExtractiveSummary:
+    summary: str
+    key_points: List[str] = field(default_factory=list)
+
+
+class ExtractiveSummarizer:
+    """TF-IDF + TextRank 추출 요약기 (메시지 목록 단위 일괄 처리)"""
+
+    def __init__(self, max_sentences: int = 2, max_chars: int = 200, key_points: int = 3,
+                 keywords: Optional[Sequence[str]] = None):
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+        self.key_points = key_points
+        self.keywords = [k.lower() for k in (keywords or [])]
+
+    def summarize(self, text: str) -> ExtractiveSummary:
+        return self.summarize_batch([text])[0]
+
+    def summarize_batch(self, texts: Sequence[str]) -> List[ExtractiveSummary]:
+        docs = [split_sentences(t) for t in texts]
+        flat = [s for sents in docs for s in sents]
+        if not flat:
+            return [ExtractiveSummary(summary=(t or "").strip()[:self.max_chars]) for t in texts]
+
+        doc_of = [d for d, sents in enumerate(docs) for _ in sents]
+        tokens = [tokenize(s) for s in flat]
+        if np is not None:
+            scores = self._scores_numpy(tokens, doc_of, len(docs))
+        else:
+            scores = self._scores_python(tokens, doc_of, len(docs))
+
+        # 위치/키워드 가산점
+        pos = 0
+        for sents in docs:
+            if sents:
+                scores[pos] += _LEAD_BONUS
+            for k in range(len(sents)):
+                low = flat[pos + k].lower()
+                if self.keywords and any(kw in low for kw in self.keywords):
+                    scores[pos + k] += _KEYWORD_BONUS
+            pos += len(sents)
+
+        results, pos = [], 0
+        for text, sents in zip(texts, docs):
+            n = len(sents)
+            if n == 0:
+                results.append(ExtractiveSummary(summary=(text or "").strip()[:self.max_chars]))
+                continue
+            ranked = sorted(range(n), key=lambda k: (-scores[pos + k], k))
+            results.append(ExtractiveSummary(
+                summary=self._compose([sents[k] for k in sorted(ranked[:self.max_sentences])]),
+                key_points=[sents[k] for k in sorted(ranked[:self.key_points])],
+            ))
+            pos += n
+        return results
+
+    def _compose(self, sentences: List[str]) -> str:
+        text = " ".join(sentences)
+        if len(text) <= self.max_chars:
+            return text
+        return text[:self.max_chars].rstrip() + "..."
+
+    # ─────────────────────────────────────────────
+    # 점수 계산
+    # ─────────────────────────────────────────────
+    def _scores_numpy(self, tokens: List[List[str]], doc_of: List[int], n_docs: int) -> List[float]:
+        vocab: Dict[str, int] = {}
+        rows, cols = [], []
+        for i, toks in enumerate(tokens):
+            for t in toks:
+                rows.append(i)
+                cols.append(vocab.setdefault(t, len(vocab)))
+        n_sent = len(tokens)
+        if not rows:
+            return [0.0] * n_sent
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        sent_doc = np.asarray(doc_of, dtype=np.int64)
+        n_vocab = len(vocab)
+
+        # (문장, 단어) 중복 합산 → TF
+        key = rows * n_vocab + cols
+        uniq, tf = np.unique(key, return_counts=True)
+        rows, cols = uniq // n_vocab, uniq % n_vocab
+
+        # IDF: 메시지 단위 문서 빈도
+        doc_term = np.unique(sent_doc[rows] * n_vocab + cols)
+        df = np.bincount(doc_term % n_vocab, minlength=n_vocab)
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        w = (1.0 + np.log(tf)) * idf[cols]
+
+        # 문장 벡터 L2 정규화 → 내적 = 코사인 유사도
+        norms = np.sqrt(np.bincount(rows, weights=w * w, minlength=n_sent))
+        w = w / np.where(norms > 0, norms, 1.0)[rows]
+
+        # 같은 메시지 안 (메시지, 단어) 묶음 인덱스
+        group_key = sent_doc[rows] * n_vocab + cols
+        _, group = np.unique(group_key, return_inverse=True)
+        n_groups = int(group.max()) + 1
+        self_sim = np.bincount(rows, weights=w * w, minlength=n_sent)
+
+        def neighbor_sum(values: "np.ndarray") -> "np.ndarray":
+            # Σ_(j≠i, 같은 메시지) sim(i, j) · values[j] = s_i · (Σ_j s_j·values[j]) - |s_i|²·values[i]
+            centroid = np.bincount(group, weights=w * values[rows], minlength=n_groups)
+            return np.bincount(rows, weights=w * centroid[group], minlength=n_sent) - self_sim * values
+
+        degree = neighbor_sum(np.ones(n_sent))
+        inv_degree = np.where(degree > 1e-12, 1.0 / np.maximum(degree, 1e-12), 0.0)
+        rank = np.ones(n_sent)
+        for _ in range(_ITERATIONS):
+            updated = (1.0 - _DAMPING) + _DAMPING * neighbor_sum(rank * inv_degree)
+            if np.abs(updated - rank).max() < 1e-4:
+                rank = updated
+                break
+            rank = updated
+
+        # 메시지 안에서 상대 점수로 (문장 수가 다른 메시지끼리 가산점 비중을 맞춤)
+        doc_max = np.zeros(n_docs)
+        np.maximum.at(doc_max, sent_doc, rank)
+        return (rank / np.where(doc_max[sent_doc] > 0, doc_max[sent_doc], 1.0)).tolist()
+
+    def _scores_python(self, tokens: List[List[str]], doc_of: List[int], n_docs: int) -> List[float]:
+        df: Dict[str, int] = {}
+        seen = set()
+        for toks, d in zip(tokens, doc_of):
+            for t in set(toks):
+                if (d, t) not in seen:
+                    seen.add((d, t))
+                    df[t] = df.get(t, 0) + 1
+
+        vectors = []
+        for toks in tokens:
+            tf: Dict[str, int] = {}
+            for t in toks:
+                tf[t] = tf.get(t, 0) + 1
+            vec = {t: (1.0 + math.log(c)) * (math.log((1.0 + n_docs) / (1.0 + df[t])) + 1.0) for t, c in tf.items()}
+            norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+            vectors.append({t: v / norm for t, v in vec.items()})
+
+        # 차수 중심성: 같은 메시지의 다른 문장과의 유사도 합 (= 중심 벡터와의 내적 - 자기 자신)
+        centroids: Dict[int, Dict[str, float]] = {}
+        for vec, d in zip(vectors, doc_of):
+            c = centroids.setdefault(d, {})
+            for t, v in vec.items():
+                c[t] = c.get(t, 0.0) + v
+        scores = []
+        for vec, d in zip(vectors, doc_of):
+            c = centroids[d]
+            scores.append(sum(v * c[t] for t, v in vec.items()) - sum(v * v for v in vec.values()))
+        doc_max: Dict[int, float] = {}
+        for s, d in zip(scores, doc_of):
+            doc_max[d] = max(doc_max.get(d, 0.0), s)
+        return [s / doc_max[d] if doc_max[d] > 0 else 0.0 for s, d in zip(scores, doc_of)]
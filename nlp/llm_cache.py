@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 응답 캐시 - 같은 프롬프트를 다시 보내지 않도록 Chat Completions 응답을 SQLite에 저장
+
+- 키: sha256(model, temperature, max_tokens, 요청 옵션, system/user 메시지)
+- 용량 상한(항목 수, 바이트) 초과 시 마지막 사용 시각이 오래된 것부터 삭제 (LRU)
+- TTL이 지난 항목은 조회 시 무효 처리, 열 때 일괄 정리
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+  key         TEXT PRIMARY KEY,
+  model       TEXT,
+  value       TEXT NOT NULL,
+  size        INTEGER NOT NULL,
+  created_at  REAL NOT NULL,
+  last_access REAL NOT NULL,
+  hits        INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access);
+"""
+
+
+class LLMResponseCache:
+    """디스크 기반 LLM 응답 캐시 (스레드 안전, 단일 연결 + 락)"""
+
+    def __init__(self, db_path: str = "data/llm_cache.db", max_entries: int = 5000,
+                 max_bytes: int = 50 * 1024 * 1024, ttl_seconds: float = 7 * 86400):
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA_SQL)
+        self.purge_expired()
+        self._count, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], temperature: float = None, max_tokens: int = None,
+                 **options) -> str:
+        raw = json.dumps({
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "options": options,
+            "messages": [(m.get("role"), m.get("content")) for m in messages],
+        }, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._delete_keys([key])
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(value)
+
+    def put(self, key: str, value: Dict, model: str = ""):
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, model, data, size, now, now))
+            if old is None:
+                self._count += 1
+                self._bytes += size
+            else:
+                self._bytes += size - old[0]
+            self._evict()
+
+    def _evict(self):
+        """용량 상한을 넘으면 오래 사용하지 않은 항목부터 삭제 (상한의 90%까지)"""
+        if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        target_count = int(self.max_entries * 0.9)
+        target_bytes = int(self.max_bytes * 0.9)
+        victims = []
+        count, size_total = self._count, self._bytes
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            if count <= target_count and size_total <= target_bytes:
+                break
+            victims.append(key)
+            count -= 1
+            size_total -= size
+        self._delete_keys(victims)
+
+    def _delete_keys(self, keys: List[str]):
+        if not keys:
+            return
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            removed = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache WHERE key IN ({marks})", chunk).fetchone()
+            self._conn.execute(f"DELETE FROM llm_cache WHERE key IN ({marks})", chunk)
+            self._count -= removed[0]
+            self._bytes -= removed[1]
+
+    def purge_expired(self) -> int:
+        if not self.ttl_seconds:
+            return 0
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            removed = cur.rowcount
+            if removed and hasattr(self, "_count"):
+                self._count, self._bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if removed:
+            logger.info(f"🗑️ 만료된 LLM 캐시 {removed}개 삭제")
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._count, self._bytes = 0, 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {"entries": self._count, "bytes": self._bytes, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
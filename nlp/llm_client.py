@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+프로세스 공용 LLM 클라이언트 - 모든 요약기(MessageSummarizer와 with_model() 복사본)가 같은 HTTP 연결 풀을 공유
+
+- AsyncOpenAI에 직접 만든 httpx.AsyncClient를 넘겨 연결 풀 크기/keep-alive 유지 시간을 LLM_CONFIG로 조절, TCP_NODELAY
+  (h2 패키지가 있으면 HTTP/2 - 요청 여러 개가 TLS 연결 하나를 같이 씀)
+- httpx 연결은 만든 이벤트 루프에 묶이므로 클라이언트는 (접속 설정, 이벤트 루프)마다 1개만 만들어 재사용
+- 장수 이벤트 루프: 데몬 스레드에서 프로세스가 끝날 때까지 도는 루프(get_llm_loop)
+  GUI 작업 스레드처럼 실행마다 새 루프를 만들던 곳은 run_in_llm_loop()로 이 루프에서 실행해
+  주기가 바뀌어도 keep-alive 연결과 TLS 세션을 그대로 재사용한다.
+  (스케줄러는 asyncio.run() 루프 하나로 계속 돌므로 그 루프의 클라이언트를 공유)
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+try:
+    # ✅ v1 클라이언트 (pip install openai>=1.0)
+    from openai import AsyncOpenAI
+except ImportError:
+    AsyncOpenAI = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from config.settings import LLM_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_OPENROUTER_HEADERS = (
+    # 아래 두 헤더는 권장(트래픽 출처 표시)
+    ("HTTP-Referer", "https://github.com/dragon-zzuni/smart_assistant"),
+    ("X-Title", "smart_assistant"),
+)
+
+
+@dataclass(frozen=True)
+class ClientSpec:
+    """접속 설정 (같은 설정이면 같은 클라이언트 공유)"""
+    provider: str
+    api_key: str
+    base_url: Optional[str]
+    headers: Tuple[Tuple[str, str], ...] = ()
+    timeout: float = 30.0
+
+
+def client_spec(provider: str = None, api_key: str = None) -> Optional[ClientSpec]:
+    """공급자별 접속 설정. API 키가 없으면 None (mock은 키 불필요)"""
+    provider = provider or LLM_CONFIG.get("provider", "openrouter")
+    timeout = LLM_CONFIG.get("request_timeout", 30.0)
+    if provider == "openrouter":
+        key = api_key or LLM_CONFIG.get("openrouter_api_key") or os.getenv("OPENROUTER_API_KEY")
+        if not key:
+            return None
+        return ClientSpec(provider, key, LLM_CONFIG.get("openrouter_base_url", "https://openrouter.ai/api/v1"),
+                          _OPENROUTER_HEADERS, timeout)
+    if provider == "mock":
+        # 로컬 가짜 서버 (services/mock_llm.py) - API 키 불필요
+        return ClientSpec(provider, "mock", LLM_CONFIG.get("mock_base_url", "http://127.0.0.1:8799/v1"),
+                          timeout=timeout)
+    # OpenAI 직접 사용시 (openai_base_url로 OpenAI 호환 서버 지정 가능)
+    key = api_key or LLM_CONFIG.get("openai_api_key") or os.getenv("OPENAI_API_KEY")
+    if not key:
+        return None
+    return ClientSpec(provider, key, LLM_CONFIG.get("openai_base_url") or None, timeout=timeout)
+
+
+def http2_enabled() -> bool:
+    if not LLM_CONFIG.get("http2", True):
+        return False
+    try:
+        import h2  # noqa: F401  (httpx의 HTTP/2 지원에 필요)
+        return True
+    except ImportError:
+        return False
+
+
+def build_client(spec: ClientSpec):
+    """연결 풀 설정을 적용한 새 AsyncOpenAI (재시도는 적응형 제한기(call_with_retry)가 담당)"""
+    kwargs = dict(api_key=spec.api_key, base_url=spec.base_url, timeout=spec.timeout, max_retries=0)
+    if spec.headers:
+        kwargs["default_headers"] = dict(spec.headers)
+    if httpx is not None:
+        limits = httpx.Limits(
+            max_connections=LLM_CONFIG.get("pool_max_connections", 64),
+            max_keepalive_connections=LLM_CONFIG.get("pool_max_keepalive", 32),
+            keepalive_expiry=LLM_CONFIG.get("pool_keepalive_expiry", 360.0),
+        )
+        try:
+            # TCP_NODELAY: 재사용 연결에서 헤더/본문 분할 전송이 Nagle + 지연 ACK로 ~40ms씩 멈추는 것 방지
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2_enabled(),
+                                                 socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)])
+        except TypeError:  # httpx < 0.24 (socket_options 미지원)
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2_enabled())
+        kwargs["http_client"] = httpx.AsyncClient(transport=transport, timeout=spec.timeout)
+    return AsyncOpenAI(**kwargs)
+
+
+# ─────────────────────────────────────────────
+# 장수 이벤트 루프
+# ─────────────────────────────────────────────
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def get_llm_loop() -> asyncio.AbstractEventLoop:
+    """프로세스 공용 장수 이벤트 루프 (처음 부를 때 데몬 스레드에서 시작)"""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None or _LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            threading.Thread(target=run, name="llm-loop", daemon=True).start()
+            ready.wait()
+            _LOOP = loop
+        return _LOOP
+
+
+def run_in_llm_loop(coro, timeout: float = None):
+    """다른 스레드에서 코루틴을 장수 루프로 실행하고 결과를 기다림 (GUI 작업 스레드용)"""
+    return asyncio.run_coroutine_threadsafe(coro, get_llm_loop()).result(timeout)
+
+
+# ─────────────────────────────────────────────
+# 클라이언트 레지스트리
+# ─────────────────────────────────────────────
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientSpec, object]]" = weakref.WeakKeyDictionary()
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(spec: ClientSpec):
+    """현재 이벤트 루프(없으면 장수 루프)에 묶인 공용 클라이언트"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = get_llm_loop()
+    with _CLIENTS_LOCK:
+        clients = _CLIENTS.get(loop)
+        if clients is None:
+            clients = _CLIENTS[loop] = {}
+        client = clients.get(spec)
+        if client is None:
+            client = clients[spec] = build_client(spec)
+            logger.info(f"🔌 LLM 클라이언트 생성: {spec.provider} ({spec.base_url or 'api.openai.com'}, "
+                        f"HTTP/{'2' if http2_enabled() else '1.1'})")
+        return client
+
+
+async def close_clients():
+    """현재 이벤트 루프에 묶인 클라이언트 연결 정리 (asyncio.run()으로 잠깐 돈 루프를 닫기 전에 호출)"""
+    with _CLIENTS_LOCK:
+        clients = _CLIENTS.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"LLM 클라이언트 종료 오류: {e}")
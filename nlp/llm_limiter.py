@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+적응형 LLM 동시 호출 제한기 (AIMD) + 재시도
+
+- 성공할 때마다 동시 호출 한도를 조금씩 늘리고(가산 증가, 한도만큼 성공하면 +1),
+  429/타임아웃이면 절반으로 줄인다(승산 감소, 동시에 몰린 실패는 1회로 취급).
+- Retry-After를 받으면 그 시각까지 새 호출을 내보내지 않는다.
+- 재시도 가능한 오류(429, 타임아웃, 5xx, 연결 오류)는 지터가 섞인 지수 백오프로 재시도한다.
+- 슬롯을 기다리는 호출은 우선순위 큐(높은 우선순위 먼저, 같으면 먼저 온 순)로 깨운다.
+  우선순위는 호출하는 쪽이 llm_priority()로 지정한다. (asyncio 태스크는 만들 때의 값을 물려받음)
+  나중에 온 긴급 호출은 대기 중인 낮은 우선순위 호출을 앞지르고, 이미 나간 호출은 건드리지 않는다.
+
+제한기는 이벤트 루프와 무관하게 공유된다. (GUI 작업 스레드마다 asyncio.run()을 새로 호출해도 같은 한도 사용)
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pipeline.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 500, 502, 503, 504}
+
+# 현재 LLM 호출의 디스패치 우선순위 (클수록 먼저, 기본 0)
+_PRIORITY: ContextVar[float] = ContextVar("llm_priority", default=0.0)
+
+
+@contextmanager
+def llm_priority(priority: float):
+    """이 블록(과 여기서 만든 태스크)의 LLM 호출 우선순위 지정"""
+    token = _PRIORITY.set(float(priority))
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority() -> float:
+    return _PRIORITY.get()
+
+
+def priority_band(priority: float) -> str:
+    """메트릭 라벨용 구간 (PriorityRanker의 high/medium/low 경계와 같음)"""
+    return "high" if priority >= 0.7 else "medium" if priority >= 0.4 else "low"
+
+
+async def with_priority(priority: float, aw):
+    """코루틴을 지정한 우선순위로 실행 (gather로 여러 개를 띄울 때 태스크마다 다른 우선순위)"""
+    with llm_priority(priority):
+        return await aw
+
+
+class AdaptiveLimiter:
+    """AIMD 동시성 제한기 (스레드/이벤트 루프 간 공유 가능)"""
+
+    def __init__(self, name: str = "llm", initial: int = 5, min_limit: int = 1, max_limit: int = 32,
+                 decrease: float = 0.5, cooldown: float = 1.0):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.throttle_events = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._waiters: list = []  # 힙: (-우선순위, 도착 순번, loop, future)
+        self._seq = itertools.count()
+        self.preempted = 0  # 나중에 온 높은 우선순위 호출에 밀린 대기 호출 수
+        self._publish()
+
+    @property
+    def effective_limit(self) -> int:
+        return int(self.limit)
+
+    # ─────────────────────────────────────────────
+    # 슬롯 획득/반납
+    # ─────────────────────────────────────────────
+    async def acquire(self):
+        wait = self.blocked_until - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        with self._lock:
+            if not self._waiters and self.in_flight < self.effective_limit:
+                self.in_flight += 1
+                self._publish()
+                return
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            priority = current_priority()
+            waiter = (-priority, next(self._seq), loop, fut)
+            # 이 호출이 앞지르는 대기 호출 수 (대기 중인 것만 - 이미 나간 호출은 그대로)
+            overtaken = sum(1 for w in self._waiters if -w[0] < priority)
+            heapq.heappush(self._waiters, waiter)
+            self.preempted += overtaken
+        if overtaken:
+            METRICS.inc("llm_dispatch_preempted_total", overtaken, limiter=self.name)
+        queued = time.monotonic()
+
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    raise
+            # 슬롯을 이미 배정받은 뒤 취소됨 → 반납 (_grant가 취소를 보면 그쪽에서 반납)
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+        METRICS.observe("llm_queue_wait_seconds", time.monotonic() - queued, limiter=self.name,
+                        band=priority_band(priority))
+
+        wait = self.blocked_until - time.monotonic()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+            self._publish()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _wake(self):
+        """(락 보유 상태) 한도 안에서 대기자에게 슬롯 배정"""
+        while self._waiters and self.in_flight < self.effective_limit:
+            _, _, loop, fut = heapq.heappop(self._waiters)
+            self.in_flight += 1
+            try:
+                loop.call_soon_threadsafe(self._grant, fut)
+            except RuntimeError:
+                # 대기자의 이벤트 루프가 이미 닫힘
+                self.in_flight -= 1
+
+    def _grant(self, fut: asyncio.Future):
+        if fut.done():
+            self.release()
+        else:
+            fut.set_result(True)
+
+    # ─────────────────────────────────────────────
+    # 한도 조절
+    # ─────────────────────────────────────────────
+    def on_success(self):
+        with self._lock:
+            if self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self._wake()
+                self._publish()
+
+    def on_throttle(self, reason: str, retry_after: Optional[float] = None):
+        now = time.monotonic()
+        with self._lock:
+            self.throttle_events += 1
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                self._last_decrease = now
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            self._publish()
+        METRICS.inc("llm_throttle_events_total", 1, limiter=self.name, reason=reason)
+        logger.warning(f"🚦 LLM 호출 제한 감지({reason}) → 동시 호출 한도 {self.effective_limit}"
+                       + (f", {retry_after:.1f}초 대기" if retry_after else ""))
+
+    def _publish(self):
+        METRICS.set_gauge("llm_concurrency_limit", self.effective_limit, limiter=self.name)
+        METRICS.set_gauge("llm_in_flight", self.in_flight, limiter=self.name)
+
+    def stats(self) -> Dict:
+        return {"limit": self.effective_limit, "in_flight": self.in_flight, "waiting": len(self._waiters),
+                "throttle_events": self.throttle_events, "preempted": self.preempted}
+
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    if not headers:
+        return None
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms:
+            return float(ms) / 1000.0
+        value = headers.get("retry-after")
+        if value:
+            return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def classify_error(exc: BaseException) -> Tuple[Optional[str], Optional[float]]:
+    """
+    재시도 분류 → (종류, Retry-After초)
+    종류: rate_limit | timeout | server | connection | None(재시도 불가)
+    """
+    if isinstance(exc, asyncio.TimeoutError) or "Timeout" in type(exc).__name__:
+        return "timeout", None
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    if status == 429:
+        return "rate_limit", _retry_after_seconds(getattr(response, "headers", None))
+    if status in RETRYABLE_STATUS or (isinstance(status, int) and status >= 500):
+        return "server", _retry_after_seconds(getattr(response, "headers", None))
+    if status is None and "Connection" in type(exc).__name__:
+        return "connection", None
+    return None, None
+
+
+async def call_with_retry(limiter: AdaptiveLimiter, fn: Callable[[], Awaitable[Any]], max_retries: int = 4,
+                          base_delay: float = 0.5, max_delay: float = 20.0) -> Any:
+    """제한기 슬롯 안에서 fn() 실행, 재시도 가능한 오류는 지터 지수 백오프로 재시도"""
+    attempt = 0
+    while True:
+        kind, retry_after = None, None
+        async with limiter.slot():
+            try:
+                result = await fn()
+            except Exception as e:
+                kind, retry_after = classify_error(e)
+                if kind in ("rate_limit", "timeout"):
+                    limiter.on_throttle(kind, retry_after)
+                if kind is None or attempt >= max_retries:
+                    raise
+            else:
+                limiter.on_success()
+                return result
+
+        attempt += 1
+        delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, retry_after)
+        METRICS.inc("llm_retries_total", 1, limiter=limiter.name, reason=kind)
+        logger.info(f"🔁 LLM 재시도 {attempt}/{max_retries} ({kind}, {delay:.2f}초 후)")
+        await asyncio.sleep(delay)
+
+
+_LIMITERS: Dict[str, AdaptiveLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(name: str, **kwargs) -> AdaptiveLimiter:
+    """이름(공급자/엔드포인트)별 프로세스 전역 제한기"""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(name)
+        if limiter is None:
+            limiter = _LIMITERS[name] = AdaptiveLimiter(name, **kwargs)
+        return limiter
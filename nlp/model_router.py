@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+모델 등급 라우팅 - 메시지마다 우선순위 점수와 길이로 요약 모델을 고름
+
+- 등급(MODEL_ROUTING_CONFIG["tiers"])은 위에서부터 조건이 맞는 첫 등급을 사용
+  (기본: 점수 0.6 이상 → 기본 모델, 0.3 이상이고 20자 이상 → 저렴한 모델, 나머지 → 로컬 추출 요약)
+- 등급별 요약기는 MessageSummarizer.with_model()로 만들어 클라이언트/응답 캐시/동시성 제한을 공유
+- 실행(주기)마다 등급별 처리 건수, 호출 시간, 추정 토큰/비용을 모아 RoutingReport로 보고
+  절감액은 같은 메시지를 모두 기본 모델로 보냈을 때의 추정 비용/시간과 비교한 값
+
+토큰 수는 프롬프트/응답 텍스트를 TokenCounter로 센 추정치다. (응답 캐시 적중도 호출한 것으로 계산)
+LLM을 쓸 수 없으면 모든 메시지가 로컬 등급으로 간다.
+LLM 호출은 메시지별 디스패치 우선순위(dispatch_priority: 점수 + 마감 임박도)로 제한기 대기열에 선다.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from config.settings import MODEL_ROUTING_CONFIG
+from pipeline.metrics import METRICS
+from nlp.llm_limiter import with_priority
+from nlp.priority_ranker import dispatch_priority
+from nlp.summarize import MessageSummarizer, MessageSummary, SUMMARY_SYSTEM_PROMPT
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MODEL = "local"
+
+
+def _score_of(priority) -> float:
+    if priority is None:
+        return 0.0
+    if isinstance(priority, dict):
+        return float(priority.get("overall_score", 0.0))
+    return float(getattr(priority, "overall_score", 0.0))
+
+
+def _content_of(message: Dict) -> str:
+    return (message.get("content") or message.get("body") or "").strip()
+
+
+@dataclass
+class Route:
+    """메시지 1건의 라우팅 결과"""
+    tier: str
+    model: str
+    max_tokens: int
+
+    @property
+    def is_local(self) -> bool:
+        return self.model == LOCAL_MODEL
+
+
+@dataclass
+class TierStats:
+    """등급별 누적 (실행 1회 단위)"""
+    tier: str
+    model: str
+    items: int = 0
+    calls: int = 0
+    seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    baseline_cost_usd: float = 0.0  # 같은 토큰을 기본 모델로 보냈을 때의 추정 비용
+
+    def to_dict(self) -> Dict:
+        return {
+            "tier": self.tier,
+            "model": self.model,
+            "items": self.items,
+            "calls": self.calls,
+            "seconds": round(self.seconds, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "baseline_cost_usd": round(self.baseline_cost_usd, 6),
+        }
+
+
+@dataclass
+class RoutingReport:
+    """실행 1회의 라우팅 결과 보고"""
+    baseline_model: str
+    tiers: List[TierStats] = field(default_factory=list)
+
+    @property
+    def items(self) -> int:
+        return sum(t.items for t in self.tiers)
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(t.cost_usd for t in self.tiers)
+
+    @property
+    def baseline_cost_usd(self) -> float:
+        return sum(t.baseline_cost_usd for t in self.tiers)
+
+    @property
+    def saved_cost_usd(self) -> float:
+        return self.baseline_cost_usd - self.cost_usd
+
+    @property
+    def saved_seconds(self) -> Optional[float]:
+        """기본 모델의 이번 실행 건당 시간으로 추정한 절감 시간 (기본 모델 호출이 없었으면 None)"""
+        base = next((t for t in self.tiers if t.model == self.baseline_model and t.items), None)
+        if base is None:
+            return None
+        per_item = base.seconds / base.items
+        return sum(t.items * per_item - t.seconds for t in self.tiers if t is not base)
+
+    def to_dict(self) -> Dict:
+        saved_seconds = self.saved_seconds
+        return {
+            "baseline_model": self.baseline_model,
+            "items": self.items,
+            "cost_usd": round(self.cost_usd, 6),
+            "baseline_cost_usd": round(self.baseline_cost_usd, 6),
+            "saved_cost_usd": round(self.saved_cost_usd, 6),
+            "saved_seconds": round(saved_seconds, 3) if saved_seconds is not None else None,
+            "tiers": [t.to_dict() for t in self.tiers],
+        }
+
+    def format(self) -> str:
+        lines = [f"🧭 모델 라우팅: {self.items}건, 추정 비용 ${self.cost_usd:.4f} "
+                 f"(전부 {self.baseline_model} 사용 시 ${self.baseline_cost_usd:.4f}, 절감 ${self.saved_cost_usd:.4f})"]
+        for t in self.tiers:
+            if t.items:
+                lines.append(f"   - {t.tier:<8} {t.model}: {t.items}건, 호출 {t.calls}회, {t.seconds:.2f}초, "
+                             f"토큰 {t.prompt_tokens}+{t.completion_tokens}, ${t.cost_usd:.4f}")
+        saved = self.saved_seconds
+        if saved is not None:
+            lines.append(f"   - 추정 절감 시간: {saved:.2f}초")
+        return "\n".join(lines)
+
+
+class ModelRouter:
+    """MessageSummarizer 앞단의 등급 라우터 (summarize_item / batch_summarize와 같은 형태)"""
+
+    def __init__(self, summarizer: MessageSummarizer, config: Optional[Dict] = None):
+        cfg = {**MODEL_ROUTING_CONFIG, **(config or {})}
+        self.summarizer = summarizer
+        self.prices = cfg.get("prices", {})
+        self.default_price = cfg.get("default_price", [3.0, 15.0])
+        self.tiers: List[Dict] = [{**tier, "model": tier.get("model") or summarizer.model,
+                                   "max_tokens": tier.get("max_tokens") or summarizer.max_tokens}
+                                  for tier in cfg.get("tiers", [])]
+        self._overhead = summarizer.tokens.count(SUMMARY_SYSTEM_PROMPT) + summarizer.tokens.count(
+            summarizer._summarization_template("", "", ""))
+        self.reset()
+
+    # ─────────────────────────────────────────────
+    # 라우팅
+    # ─────────────────────────────────────────────
+    def route(self, message: Dict, priority=None) -> Route:
+        if not (self.summarizer.is_available and self.summarizer.client):
+            return Route("local", LOCAL_MODEL, 0)
+        score = _score_of(priority)
+        chars = len(_content_of(message))
+        for tier in self.tiers:
+            if score >= tier.get("min_score", 0.0) and chars >= tier.get("min_chars", 0):
+                return Route(tier["name"], tier["model"], tier["max_tokens"])
+        return Route("local", LOCAL_MODEL, 0)
+
+    def summarizer_for(self, route: Route) -> MessageSummarizer:
+        """등급별 요약기 (호출 시점의 클라이언트/캐시를 그대로 공유하도록 매번 얕은 복사)"""
+        if route.model == self.summarizer.model and route.max_tokens == self.summarizer.max_tokens:
+            return self.summarizer
+        return self.summarizer.with_model(route.model, route.max_tokens)
+
+    async def summarize_item(self, message: Dict, priority=None) -> MessageSummary:
+        return (await self.batch_summarize([message], [priority]))[0]
+
+    async def batch_summarize(self, messages: List[Dict], priorities: Sequence) -> List[MessageSummary]:
+        """등급별로 나눠 요약 (등급끼리는 동시 실행). 입력 순서를 보존한다."""
+        results: List[Optional[MessageSummary]] = [None] * len(messages)
+        groups: Dict[str, List[int]] = {}
+        routes: Dict[str, Route] = {}
+        dispatch = [dispatch_priority(pr, m) for m, pr in zip(messages, priorities)]
+        for i, (m, pr) in enumerate(zip(messages, priorities)):
+            route = self.route(m, pr)
+            groups.setdefault(route.tier, []).append(i)
+            routes[route.tier] = route
+
+        async def run(tier: str, idx: List[int]):
+            route = routes[tier]
+            batch = [messages[i] for i in idx]
+            started = time.perf_counter()
+            if route.is_local:
+                found = self.summarizer.summarize_offline(batch)
+                calls = 0
+            elif len(batch) == 1:
+                found = [await with_priority(dispatch[idx[0]], self.summarizer_for(route).summarize_item(batch[0]))]
+                calls = 1
+            else:
+                summarizer = self.summarizer_for(route)
+                found = await summarizer.batch_summarize(batch, [dispatch[i] for i in idx])
+                calls = -(-len(batch) // summarizer.pack_max_items) if summarizer.batch_mode == "packed" else len(batch)
+            self._record(route, batch, found, calls, time.perf_counter() - started)
+            for i, s in zip(idx, found):
+                results[i] = s
+
+        # 급한 메시지가 있는 등급부터 띄움
+        order = sorted(groups.items(), key=lambda kv: -max(dispatch[i] for i in kv[1]))
+        await asyncio.gather(*(run(tier, idx) for tier, idx in order))
+        return results
+
+    # ─────────────────────────────────────────────
+    # 보고
+    # ─────────────────────────────────────────────
+    def _price(self, model: str) -> List[float]:
+        return self.prices.get(model, self.default_price)
+
+    def _record(self, route: Route, batch: List[Dict], found: List[MessageSummary], calls: int, seconds: float):
+        tokens = self.summarizer.tokens
+        prompt = sum(tokens.count(_content_of(m)) + self._overhead for m in batch)
+        completion = sum(tokens.count(json.dumps(s.to_dict(), ensure_ascii=False)) for s in found if s is not None)
+        price_in, price_out = self._price(route.model)
+        base_in, base_out = self._price(self.summarizer.model)
+
+        stats = self._stats.get(route.tier)
+        if stats is None:
+            stats = self._stats[route.tier] = TierStats(tier=route.tier, model=route.model)
+        stats.items += len(batch)
+        stats.calls += calls
+        stats.seconds += seconds
+        stats.prompt_tokens += prompt
+        stats.completion_tokens += completion
+        stats.cost_usd += (prompt * price_in + completion * price_out) / 1e6
+        stats.baseline_cost_usd += (prompt * base_in + completion * base_out) / 1e6
+        METRICS.inc("llm_routed_items_total", len(batch), tier=route.tier, model=route.model)
+
+    def reset(self):
+        """실행(주기) 시작 시 누적값 초기화"""
+        self._stats: Dict[str, TierStats] = {}
+
+    def report(self) -> RoutingReport:
+        order = {t["name"]: i for i, t in enumerate(self.tiers)}
+        tiers = sorted(self._stats.values(), key=lambda t: order.get(t.tier, len(order)))
+        report = RoutingReport(baseline_model=self.summarizer.model, tiers=tiers)
+        METRICS.set_gauge("llm_routing_saved_cost_usd", report.saved_cost_usd)
+        return report
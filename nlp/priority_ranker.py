@@ -10,7 +10,8 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 import re
 
-from config.settings import PRIORITY_RULES
+from config.settings import DISPATCH_CONFIG, PRIORITY_RULES
+from pipeline.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,11 @@ class PriorityScore:
             "estimated_time": self.estimated_time
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PriorityScore":
+        """to_dict() 결과로부터 복원"""
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
 
 class PriorityRanker:
     """우선순위 분류기"""
@@ -284,13 +290,14 @@ class PriorityRanker:
         """여러 메시지 우선순위 분류"""
         ranked_messages = []
         
-        for message in messages:
-            try:
-                priority_score = self.calculate_priority(message)
-                ranked_messages.append((message, priority_score))
-            except Exception as e:
-                logger.error(f"메시지 우선순위 계산 오류: {e}")
-                continue
+        with METRICS.stage("nlp.rank", items=len(messages)):
+            for message in messages:
+                try:
+                    priority_score = self.calculate_priority(message)
+                    ranked_messages.append((message, priority_score))
+                except Exception as e:
+                    logger.error(f"메시지 우선순위 계산 오류: {e}")
+                    continue
         
         # 전체 점수 기준으로 정렬 (높은 점수부터)
         ranked_messages.sort(key=lambda x: x[1].overall_score, reverse=True)
@@ -319,6 +326,87 @@ class PriorityRanker:
         return stats
 
 
+# 마감 표현 → 며칠 뒤 (업무 종료 18시 기준)
+_RELATIVE_DAYS = (("오늘", 0), ("today", 0), ("asap", 0), ("즉시", 0), ("eod", 0),
+                  ("내일", 1), ("tomorrow", 1), ("모레", 2))
+_WEEKDAYS = ("월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일")
+
+
+def _sent_at(message: Dict) -> Optional[datetime]:
+    """메시지 발신 시각 (로컬 시간, tz 없음). 읽을 수 없으면 None"""
+    raw = message.get("date") or message.get("timestamp") or message.get("datetime")
+    if not raw:
+        return None
+    try:
+        ts = raw if isinstance(raw, datetime) else datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts.astimezone().replace(tzinfo=None) if ts.tzinfo else ts
+
+
+def deadline_hours(text: str, now: Optional[datetime] = None, sent: Optional[datetime] = None) -> Optional[float]:
+    """
+    본문의 마감 표현까지 남은 시간(시간). 읽을 수 있는 표현이 없으면 None, 이미 지났으면 음수
+    상대 표현(내일/금요일/다음 주)과 연도 없는 날짜는 메시지 발신 시각(sent, 없으면 now) 기준으로 해석한다.
+    """
+    now = now or datetime.now()
+    anchor = sent or now
+    lowered = text.lower()
+    due = None
+    for word, days in _RELATIVE_DAYS:
+        if word in lowered:
+            due = anchor + timedelta(days=days)
+            break
+    if due is None:
+        if "이번 주" in text or "this week" in lowered:
+            due = anchor + timedelta(days=max(0, 4 - anchor.weekday()))
+        elif "다음 주" in text or "next week" in lowered:
+            due = anchor + timedelta(days=11 - anchor.weekday())
+        else:
+            for i, name in enumerate(_WEEKDAYS):
+                if name in text:
+                    due = anchor + timedelta(days=(i - anchor.weekday()) % 7)
+                    break
+    if due is None:
+        m = re.search(r"(\d{4})-(\d{2})-(\d{2})", text)
+        ymd = (int(m.group(1)), int(m.group(2)), int(m.group(3))) if m else None
+        if ymd is None:
+            m = re.search(r"(\d{1,2})월\s*(\d{1,2})일", text) or re.search(r"(?<!\d)(\d{1,2})/(\d{1,2})(?!\d)", text)
+            ymd = (anchor.year, int(m.group(1)), int(m.group(2))) if m else None
+        if ymd is None:
+            return None
+        try:
+            due = datetime(*ymd)
+        except ValueError:
+            return None
+    due = due.replace(hour=18, minute=0, second=0, microsecond=0)
+    return (due - now).total_seconds() / 3600
+
+
+def dispatch_priority(priority, message: Optional[Dict] = None, now: Optional[datetime] = None) -> float:
+    """
+    LLM 디스패치 우선순위 (클수록 먼저) = overall_score + 마감 임박도 가중치
+    priority는 PriorityScore 또는 to_dict() 결과. 비활성화(DISPATCH_CONFIG)면 0 (도착 순서)
+    이미 지난 마감은 가산하지 않는다.
+    """
+    if priority is None or not DISPATCH_CONFIG.get("enabled", True):
+        return 0.0
+    get = priority.get if isinstance(priority, dict) else lambda name, default: getattr(priority, name, default)
+    score = float(get("overall_score", 0.0))
+    if float(get("deadline_score", 0.0)) <= 0 or message is None:
+        return score
+    text = f"{message.get('subject') or ''} {message.get('content') or message.get('body') or ''}"
+    hours = deadline_hours(text, now, sent=_sent_at(message))
+    horizon = DISPATCH_CONFIG.get("deadline_horizon_hours", 72)
+    if hours is None:
+        proximity = DISPATCH_CONFIG.get("undated_deadline_proximity", 0.3)
+    elif hours < 0:
+        proximity = 0.0
+    else:
+        proximity = max(0.0, 1.0 - hours / horizon)
+    return score + DISPATCH_CONFIG.get("deadline_weight", 0.5) * proximity
+
+
 # 테스트 함수
 async def test_priority_ranker():
     """우선순위 분류기 테스트"""
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+대화방별 누적(rolling) 요약
+
+- 방마다 요약 상태와 워터마크(마지막으로 반영한 메시지 시각 + 그 시각의 msg_id)를 보관
+- 실행마다 워터마크 이후의 새 메시지만 이전 요약과 함께 보내 요약을 갱신 → 비용이 새 메시지 양에 비례
+- 새 메시지가 없는 방은 LLM을 부르지 않음, 여러 방은 병렬 처리 (동시 호출 수는 공유 제한기가 결정)
+- 모델/프롬프트 버전이 바뀌면 해당 방은 처음부터 다시 요약
+- store(AssistantStore)가 주어지면 상태를 room_summaries 테이블에 저장해 재시작 후에도 이어서 갱신
+
+워터마크보다 이전 시각으로 늦게 도착한 메시지는 반영하지 않는다.
+"""
+import asyncio
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from pipeline.metrics import METRICS
+from nlp.summarize import OFFLINE_SOURCE, PROMPT_VERSION, _parse_ts
+
+logger = logging.getLogger(__name__)
+
+
+def room_of(message: Dict) -> str:
+    return message.get("room") or message.get("platform") or "messenger"
+
+
+def _order_key(message: Dict) -> str:
+    raw = message.get("date") or message.get("timestamp") or message.get("datetime") or ""
+    ts = _parse_ts(raw) if raw else None
+    return ts.isoformat() if ts else str(raw)
+
+
+@dataclass
+class RoomSummaryState:
+    """대화방 1개의 누적 요약 상태"""
+    room: str
+    summary: Dict = field(default_factory=dict)
+    watermark: str = ""                                     # 마지막으로 반영한 메시지 시각
+    watermark_ids: List[str] = field(default_factory=list)  # 워터마크 시각에 이미 반영한 msg_id
+    message_count: int = 0
+    model: str = ""
+    prompt_version: str = ""
+    updated_at: str = ""
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RoomSummaryState":
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+    def new_messages(self, messages: List[Dict]) -> List[Dict]:
+        """워터마크 이후 메시지만 (시각순)"""
+        seen = set(self.watermark_ids)
+        out = []
+        for m in messages:
+            key = _order_key(m)
+            if key > self.watermark or (key == self.watermark and m.get("msg_id") not in seen):
+                out.append(m)
+        return sorted(out, key=_order_key)
+
+    def advance(self, messages: List[Dict]):
+        """반영한 메시지로 워터마크 전진"""
+        if not messages:
+            return
+        last = max(_order_key(m) for m in messages)
+        ids = [m.get("msg_id") for m in messages if _order_key(m) == last and m.get("msg_id")]
+        if last == self.watermark:
+            ids = list(dict.fromkeys(self.watermark_ids + ids))
+        self.watermark = last
+        self.watermark_ids = ids
+        self.message_count += len(messages)
+
+
+class RollingRoomSummarizer:
+    """방별 누적 요약 관리자"""
+
+    def __init__(self, summarizer, store=None):
+        self.summarizer = summarizer
+        self.store = store
+        self.states: Dict[str, RoomSummaryState] = {}
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.store is None:
+            return
+        try:
+            for room, data in self.store.load_room_summaries().items():
+                self.states[room] = RoomSummaryState.from_dict(data)
+        except Exception as e:
+            logger.error(f"대화방 요약 상태 로드 오류: {e}")
+
+    def _producer(self) -> str:
+        """이번 갱신을 만들 주체 (LLM이 없으면 로컬 추출 요약)"""
+        if self.summarizer.is_available and self.summarizer.client:
+            return self.summarizer.model
+        return OFFLINE_SOURCE
+
+    def _state_for(self, room: str, producer: str) -> RoomSummaryState:
+        """
+        방 상태 (모델/프롬프트가 바뀌었거나 로컬 요약으로 쌓인 상태를 LLM으로 갱신할 때는 새로 시작)
+        로컬 요약은 기존 LLM 요약을 버리지 않고 그 위에 이어서 갱신한다.
+        """
+        state = self.states.get(room)
+        stale = state is None or state.prompt_version != PROMPT_VERSION or (
+            producer != OFFLINE_SOURCE and state.model != producer)
+        if stale:
+            state = RoomSummaryState(room=room, model=producer, prompt_version=PROMPT_VERSION)
+            self.states[room] = state
+        return state
+
+    async def _update_room(self, room: str, messages: List[Dict]) -> RoomSummaryState:
+        producer = self._producer()
+        state = self._state_for(room, producer)
+        new = state.new_messages(messages)
+        METRICS.cache("room_summary", not new)
+        if not new:
+            return state
+
+        if producer == OFFLINE_SOURCE:
+            # LLM이 없으면 방마다 호출/경고 없이 추출 요약기로 바로 갱신 (메시지별 요약 경로와 같은 방식)
+            state.summary = self.summarizer.update_conversation_summary_offline(state.summary or None, new)
+            state.model = producer
+            return self._commit(room, state, new)
+
+        # 요약이 실패하면(긴 대화의 구간 하나만 실패해도 ConversationMapError) 예외가 그대로 올라가
+        # 워터마크를 옮기지 않는다 → 다음 실행에서 같은 메시지를 다시 반영 (성공한 구간은 LLM 캐시 적중)
+        with METRICS.stage("analyze.room_summary", items=len(new)):
+            summary = await self.summarizer.update_conversation_summary(state.summary or None, new)
+        state.summary = summary
+        return self._commit(room, state, new)
+
+    def _commit(self, room: str, state: RoomSummaryState, new: List[Dict]) -> RoomSummaryState:
+        """반영한 메시지까지 워터마크 전진 후 저장"""
+        state.advance(new)
+        state.updated_at = datetime.now().isoformat()
+        if self.store is not None:
+            self.store.save_room_summary(room, state.to_dict())
+        logger.info(f"💬 [{room}] 새 메시지 {len(new)}개 반영 (누적 {state.message_count}개)")
+        return state
+
+    async def update(self, messages: List[Dict],
+                     on_room: Optional[Callable[[RoomSummaryState], None]] = None) -> Dict[str, RoomSummaryState]:
+        """
+        메시지를 방별로 나눠 새 메시지가 있는 방만 요약 갱신 (방끼리 병렬)
+        on_room(state)는 방 하나가 끝날 때마다 호출된다.
+        반환: 이번 메시지에 등장한 방 → 상태
+        """
+        self._load()
+        by_room: Dict[str, List[Dict]] = {}
+        for m in messages:
+            by_room.setdefault(room_of(m), []).append(m)
+
+        async def one(room, msgs):
+            try:
+                state = await self._update_room(room, msgs)
+            except Exception as e:
+                logger.warning(f"[{room}] 대화방 요약 실패: {e}")
+                state = self.states.get(room) or RoomSummaryState(room=room)
+            if on_room:
+                on_room(state)
+            return room, state
+
+        return dict(await asyncio.gather(*(one(r, msgs) for r, msgs in by_room.items())))
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 요청 합치기 (single-flight) - 같은 프롬프트 요청이 동시에 여러 번 나가지 않도록 진행 중인 호출 하나를 같이 기다림
+
+- 키: 공급자 + 응답 캐시 키(모델, 메시지, temperature, max_tokens, 옵션)
+- 먼저 온 요청(리더)만 API를 호출하고, 끝나기 전에 들어온 같은 키의 요청(팔로워)은 그 결과/오류를 그대로 받는다.
+  끝난 뒤에 오는 요청은 응답 캐시가 처리한다.
+- 진행 중 호출은 concurrent.futures.Future라서 이벤트 루프/스레드가 달라도 합쳐진다.
+  (GUI 작업 스레드의 장수 루프와 스케줄러 루프가 겹쳐 실행되는 경우)
+- 리더가 취소되면(호출한 쪽이 중단/스트림을 닫음) 팔로워는 FlightAborted를 받고 직접 다시 호출한다.
+- 합친 요청 수는 누적 카운터(FlightStats)와 llm_coalesced_total 메트릭으로 보고한다.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pipeline.metrics import METRICS
+
+
+class FlightAborted(Exception):
+    """합쳐 기다리던 리더 호출이 결과 없이 중단됨 (팔로워가 직접 호출해야 함)"""
+
+
+@dataclass
+class FlightStats:
+    """누적 합치기 통계 (since()로 실행 1회분 차이를 구함)"""
+    flights: int = 0     # 실제로 나간 호출 (리더)
+    coalesced: int = 0   # 진행 중 호출에 합쳐진 요청 (팔로워)
+    by_operation: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def saved_rate(self) -> float:
+        total = self.flights + self.coalesced
+        return self.coalesced / total if total else 0.0
+
+    def since(self, earlier: "FlightStats") -> "FlightStats":
+        ops = {op: n - earlier.by_operation.get(op, 0) for op, n in self.by_operation.items()}
+        return FlightStats(flights=self.flights - earlier.flights, coalesced=self.coalesced - earlier.coalesced,
+                           by_operation={op: n for op, n in ops.items() if n})
+
+    def to_dict(self) -> Dict:
+        return {
+            "flights": self.flights,
+            "coalesced": self.coalesced,
+            "saved_rate": round(self.saved_rate, 4),
+            "by_operation": dict(self.by_operation),
+        }
+
+    def format(self) -> str:
+        ops = ", ".join(f"{k} {v}" for k, v in sorted(self.by_operation.items()))
+        return (f"🔗 LLM 요청 합치기: 동일 프롬프트 {self.coalesced}건을 진행 중 호출에 합침 "
+                f"(실제 호출 {self.flights}회, {self.saved_rate:.0%} 절감)" + (f" [{ops}]" if ops else ""))
+
+
+class SingleFlight:
+    """키별 진행 중 호출 레지스트리 (스레드/이벤트 루프 간 공유)"""
+
+    def __init__(self):
+        self._flights: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = FlightStats()
+
+    def join(self, key: str, operation: str = "chat") -> Tuple[concurrent.futures.Future, bool]:
+        """(진행 중 호출, 리더 여부). 리더는 끝날 때 반드시 finish()를 호출해야 한다."""
+        with self._lock:
+            fut = self._flights.get(key)
+            if fut is not None:
+                self._stats.coalesced += 1
+                self._stats.by_operation[operation] = self._stats.by_operation.get(operation, 0) + 1
+                METRICS.inc("llm_coalesced_total", 1, operation=operation)
+                return fut, False
+            fut = self._flights[key] = concurrent.futures.Future()
+            self._stats.flights += 1
+            return fut, True
+
+    def finish(self, key: str, fut: concurrent.futures.Future, result=None, error: BaseException = None):
+        """리더 호출 결과를 팔로워에게 전달하고 등록 해제"""
+        with self._lock:
+            if self._flights.get(key) is fut:
+                del self._flights[key]
+        if fut.done():
+            return
+        if error is None:
+            fut.set_result(result)
+        elif isinstance(error, Exception):
+            fut.set_exception(error)
+        else:  # 취소(CancelledError)/GeneratorExit 등 → 팔로워는 직접 다시 호출
+            fut.set_exception(FlightAborted(f"리더 호출 중단: {type(error).__name__}"))
+
+    @staticmethod
+    async def wait(fut: concurrent.futures.Future):
+        """팔로워 대기 (팔로워가 취소돼도 리더 호출은 취소하지 않음)"""
+        return await asyncio.shield(asyncio.wrap_future(fut))
+
+    async def run(self, key: str, call: Callable[[], Awaitable], operation: str = "chat"):
+        """같은 키의 진행 중 호출이 있으면 그 결과를, 없으면 call()을 실행해 결과를 공유"""
+        while True:
+            fut, leader = self.join(key, operation)
+            if leader:
+                break
+            try:
+                return await self.wait(fut)
+            except FlightAborted:
+                continue
+        try:
+            result = await call()
+        except BaseException as e:
+            self.finish(key, fut, error=e)
+            raise
+        self.finish(key, fut, result=result)
+        return result
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> FlightStats:
+        with self._lock:
+            s = self._stats
+            return FlightStats(s.flights, s.coalesced, dict(s.by_operation))
+
+
+_SINGLE_FLIGHT: Optional[SingleFlight] = None
+_SINGLE_FLIGHT_LOCK = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """프로세스 전역 레지스트리 (모든 요약기/with_model() 복사본이 공유)"""
+    global _SINGLE_FLIGHT
+    with _SINGLE_FLIGHT_LOCK:
+        if _SINGLE_FLIGHT is None:
+            _SINGLE_FLIGHT = SingleFlight()
+        return _SINGLE_FLIGHT
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+스트리밍 JSON 파서 - LLM이 JSON을 한 글자씩 보내는 동안 지금까지 도착한 필드를 읽어낸다.
+
+    parser = IncrementalJSONParser()
+    for delta in deltas:
+        changed = parser.feed(delta)   # {"summary": "지금까지 온 요약...", ...} (바뀐 최상위 필드만)
+
+- 문자열 값은 닫히기 전이라도 지금까지 온 부분을 돌려준다. (요약이 타자 치듯 채워짐)
+- 아직 값이 시작되지 않은 키, 끝나지 않은 숫자/true/false는 제외한다.
+- JSON 앞의 설명문이나 ``` 코드 펜스는 첫 '{'까지 건너뛴다.
+- 상태 기계는 새로 들어온 글자만 훑는다. (끝나지 않은 리터럴만 다음 청크에서 다시 읽음)
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalJSONParser:
+    """최상위가 객체인 JSON 스트림용 부분 파서"""
+
+    def __init__(self):
+        self.buffer = ""
+        self._started = False
+        self._pos = 0
+        # 스택 원소: [종류('{' 또는 '['), 상태]
+        #   객체 상태: key(키 대기) | colon(':' 대기) | value(값 대기) | comma(',' 또는 닫기 대기)
+        #   배열 상태: value | comma
+        self._stack: List[List[str]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._safe = 0          # 여기까지 잘라 괄호만 닫으면 유효한 JSON이 되는 위치
+        self._key_start = 0     # 진행 중인 객체 항목(키부터)의 시작 위치
+        self._done = False
+        self.fields: Dict[str, Any] = {}
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """청크를 추가하고 값이 바뀐 최상위 필드를 반환"""
+        if not chunk or self._done:
+            return {}
+        if not self._started:
+            start = chunk.find("{")
+            if start < 0:
+                return {}
+            chunk = chunk[start:]
+            self._started = True
+        self.buffer += chunk
+        self._scan(self._pos)
+
+        snapshot = self._snapshot()
+        if not isinstance(snapshot, dict):
+            return {}
+        changed = {k: v for k, v in snapshot.items() if k not in self.fields or self.fields[k] != v}
+        self.fields.update(changed)
+        return changed
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """완결된 JSON이면 전체 객체, 아니면 지금까지의 부분 결과"""
+        if self._done:
+            try:
+                return json.loads(self.buffer[:self._pos])
+            except ValueError:
+                pass
+        return dict(self.fields) if self.fields else None
+
+    # ─────────────────────────────────────────────
+    # 상태 기계
+    # ─────────────────────────────────────────────
+    def _value_done(self, end: int):
+        """값 하나가 끝남 → 부모 상태 갱신"""
+        if not self._stack:
+            self._done = True
+            self._pos = end
+            return
+        self._stack[-1][1] = "comma"
+        self._safe = end
+
+    def _scan(self, start: int):
+        buf = self.buffer
+        i = start
+        n = len(buf)
+        while i < n and not self._done:
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._stack[-1][1] = "colon"
+                    else:
+                        self._value_done(i + 1)
+                i += 1
+                continue
+
+            top = self._stack[-1] if self._stack else None
+            if ch in " \t\r\n":
+                pass
+            elif ch == '"':
+                self._in_string = True
+                self._string_is_key = bool(top and top[0] == "{" and top[1] == "key")
+                if self._string_is_key:
+                    self._key_start = i
+            elif ch in "{[":
+                if top and top[0] == "{" and top[1] == "key":
+                    break  # 잘못된 JSON
+                self._stack.append([ch, "key" if ch == "{" else "value"])
+                self._safe = i + 1
+            elif ch in "}]":
+                if not self._stack:
+                    break
+                self._stack.pop()
+                self._value_done(i + 1)
+            elif ch == ":":
+                if top and top[1] == "colon":
+                    top[1] = "value"
+            elif ch == ",":
+                if top and top[1] == "comma":
+                    top[1] = "key" if top[0] == "{" else "value"
+            else:
+                # 숫자/true/false/null: 구분자가 나올 때까지 읽음
+                j = i
+                while j < n and buf[j] not in ",}] \t\r\n":
+                    j += 1
+                if j == n:
+                    break  # 아직 끝나지 않은 리터럴 → 다음 청크에서 처음부터 다시 읽음
+                self._value_done(j)
+                i = j
+                continue
+            i += 1
+        if not self._done:
+            self._pos = i
+
+    def _snapshot(self) -> Any:
+        """지금까지의 버퍼를 닫아 파싱"""
+        if self._done:
+            try:
+                return json.loads(self.buffer[:self._pos])
+            except ValueError:
+                return None
+
+        if self._in_string and not self._string_is_key:
+            # 진행 중인 문자열 값은 지금까지 온 부분으로 닫음 (끝의 불완전한 이스케이프 제거)
+            text = self.buffer
+            if self._escape:
+                text = text[:-1]
+            cut = text.rfind("\\u", max(0, len(text) - 5))
+            if cut >= 0 and len(text) - cut < 6:
+                text = text[:cut]
+            text += '"'
+            stack = self._stack
+        else:
+            text = self.buffer[:self._safe]
+            stack = self._stack
+            top = stack[-1] if stack else None
+            if top and top[0] == "{" and top[1] in ("colon", "value") and self._key_start >= self._safe:
+                text = self.buffer[:self._key_start]
+        text = text.rstrip().rstrip(",")
+        closers = "".join("}" if kind == "{" else "]" for kind, _ in reversed(stack))
+        try:
+            return json.loads(text + closers)
+        except ValueError:
+            return None
@@ -3,26 +3,197 @@
 메시지 요약 모듈 - LLM을 사용하여 이메일/메신저 메시지 요약
 """
 import asyncio
+import copy
 import logging
 import json
-import os
-from typing import Dict, List, Optional
+import time
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+from types import SimpleNamespace
 
-try:
-    # ✅ v1 클라이언트 (pip install openai>=1.0)
-    from openai import AsyncOpenAI
-except ImportError:
-    AsyncOpenAI = None
-
-from config.settings import LLM_CONFIG, PRIORITY_RULES
+from config.settings import LLM_CONFIG, LLM_CACHE_CONFIG, PRIORITY_RULES
+from pipeline.metrics import METRICS
+from nlp.llm_cache import LLMResponseCache
+from nlp.llm_limiter import call_with_retry, get_limiter, with_priority
+from nlp.llm_client import AsyncOpenAI, client_spec, get_client
+from nlp.single_flight import FlightAborted, get_single_flight
+from nlp.token_budget import get_counter, prompt_budget
+from nlp.stream_json import IncrementalJSONParser
+from nlp.extractive import ExtractiveSummarizer, ExtractiveSummary
 
 logger = logging.getLogger(__name__)
 
+# 요약 프롬프트 버전 - 프롬프트/스키마를 바꾸면 올려서 기존 분석 결과를 무효화
+PROMPT_VERSION = "v1"
+
+# MessageSummary.source - LLM 결과는 만든 모델 ID, 그 외에는 아래 값
+OFFLINE_SOURCE = "offline"  # 로컬 추출 요약 (LLM 없음/로컬 등급/LLM 실패 대체)
+GATE_SOURCE = "gate"        # 확신 게이트가 LLM을 생략하고 로컬 요약
+
+SUMMARY_SYSTEM_PROMPT = "당신은 업무용 메시지 분석 전문가입니다. 이메일과 메신저 메시지를 분석하여 요약, 핵심 포인트, 감정, 긴급도, 필요한 액션을 파악합니다."
+
+CONVERSATION_SYSTEM_PROMPT = "당신은 회의/대화 요약 전문가입니다. 액션아이템을 명확히 뽑습니다."
 
+_EMPTY_CONVERSATION = {"summary": "", "key_points": [], "decisions": [], "unresolved": [], "risks": [],
+                       "action_items": []}
 
+_LIST_FIELDS = ("key_points", "decisions", "unresolved", "risks", "action_items")
 
+_REDUCE_PROMPT = """
+    아래는 긴 대화를 시간 순서로 나눈 구간별 요약입니다. 전체 대화를 하나로 통합해 **순수 JSON만** 출력하세요.
+    중복 항목은 합치고, 뒤 구간에서 해결된 이슈는 unresolved에서 빼고 decisions에 반영하세요.
+
+    <구간 요약>
+    {partials}
+
+    JSON 스키마:
+    {
+    "summary": "대화 전체 핵심 요약 (3~6문장)",
+    "key_points": ["핵심 포인트 1", "핵심 포인트 2"],
+    "decisions": ["확정된 결정 사항"],
+    "unresolved": ["미해결/후속 필요 이슈"],
+    "risks": ["리스크/주의사항"],
+    "action_items": [
+        {"title":"해야 할 일", "priority":"High|Medium|Low", "owner":"선택", "due":"선택"}
+    ]
+    }
+    """
+
+_UPDATE_PROMPT = """
+    아래는 한 대화방의 지금까지 요약과, 그 이후 새로 올라온 메시지입니다.
+    새 메시지를 반영해 요약을 갱신하고 **순수 JSON만** 출력하세요.
+    이전 요약에서 여전히 유효한 내용은 유지하고, 새 메시지로 해결된 이슈는 unresolved에서 빼고 decisions에 반영하세요.
+
+    <이전 요약>
+    {previous}
+
+    <새 메시지>
+    {transcript}
+
+    JSON 스키마:
+    {
+    "summary": "대화 전체 핵심 요약 (3~6문장)",
+    "key_points": ["핵심 포인트 1", "핵심 포인트 2"],
+    "decisions": ["확정된 결정 사항"],
+    "unresolved": ["미해결/후속 필요 이슈"],
+    "risks": ["리스크/주의사항"],
+    "action_items": [
+        {"title":"해야 할 일", "priority":"High|Medium|Low", "owner":"선택", "due":"선택"}
+    ]
+    }
+    """
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _fmt_ts(ts: Optional[datetime]) -> str:
+    return ts.strftime("%Y-%m-%d %H:%M") if ts else ""
+
+
+def _item_key(item) -> str:
+    if isinstance(item, dict):
+        item = item.get("title") or item.get("task") or json.dumps(item, ensure_ascii=False, sort_keys=True)
+    return " ".join(str(item).lower().split())
+
+
+def merge_conversation_summaries(partials: List[Dict]) -> Dict:
+    """구간 요약의 목록 필드를 순서대로 합치고 중복 제거 (summary는 구간 요약을 이어 붙임)"""
+    merged = {"summary": " ".join(p.get("summary", "").strip() for p in partials if p.get("summary"))}
+    for field in _LIST_FIELDS:
+        seen, items = set(), []
+        for p in partials:
+            for item in p.get(field) or []:
+                key = _item_key(item)
+                if key and key not in seen:
+                    seen.add(key)
+                    items.append(item)
+        merged[field] = items
+    return merged
+
+
+def _render_partial(p: Dict) -> str:
+    start, end = p.get("_range") or ("", "")
+    label = p.get("_label") or (f"구간 {start} ~ {end}" if start else "구간")
+    lines = [f"[{label}]", f"요약: {p.get('summary', '')}"]
+    for field, label in (("key_points", "핵심"), ("decisions", "결정"), ("unresolved", "미해결"), ("risks", "리스크")):
+        if p.get(field):
+            lines.append(f"{label}: " + " / ".join(str(x) for x in p[field]))
+    for a in p.get("action_items") or []:
+        if isinstance(a, dict):
+            meta = ", ".join(f"{k}:{a[k]}" for k in ("priority", "owner", "due") if a.get(k))
+            lines.append(f"액션: {a.get('title') or a.get('task') or ''}" + (f" ({meta})" if meta else ""))
+        else:
+            lines.append(f"액션: {a}")
+    return "\n".join(lines)
+
+
+def _finish_reduce(result: Dict, partials: List[Dict]) -> Dict:
+    """통합 결과에서 빠진 필드는 구간 요약을 합친 값으로 채움"""
+    merged = merge_conversation_summaries(partials)
+    out = {k: v for k, v in result.items() if not k.startswith("_")}
+    if not out.get("summary"):
+        out["summary"] = merged["summary"]
+    for field in _LIST_FIELDS:
+        if not out.get(field):
+            out[field] = merged[field]
+    return out
+
+
+class StreamInterrupted(Exception):
+    """스트리밍 응답이 일부 전달된 뒤 끊김 (이미 화면에 나간 내용이 있어 재시도하지 않음)"""
+
+
+class ConversationMapError(Exception):
+    """긴 대화의 구간 요약(map) 중 일부가 실패 (빈 구간으로 합치면 그 구간 내용이 요약에서 빠짐)"""
+
+    def __init__(self, failed: int, total: int):
+        super().__init__(f"대화 구간 {total}개 중 {failed}개 요약 실패")
+        self.failed = failed
+        self.total = total
+
+
+def _response(content: str, finish_reason: Optional[str] = None, **flags) -> SimpleNamespace:
+    """Chat Completions 응답 모양 (캐시 적중/스트리밍 결과를 _chat 호출자와 같은 형태로 전달)"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+        usage=None,
+        **flags,
+    )
+
+
+PACKED_INSTRUCTIONS = """아래 여러 메시지를 각각 분석하여 JSON으로만 답변해주세요.
+각 메시지는 [id: ...] 로 구분됩니다. 모든 id에 대해 하나씩, 같은 id로 결과를 돌려주세요.
+
+형식:
+{"items": [
+  {"id": "m1",
+   "summary": "핵심 내용 2-3문장 요약",
+   "key_points": ["핵심 포인트 1", "핵심 포인트 2"],
+   "sentiment": "positive/negative/neutral 중 하나",
+   "urgency_level": "high/medium/low 중 하나",
+   "action_required": true/false,
+   "suggested_response": "권장 응답 (선택)"}
+]}
+
+분석 기준:
+- urgency_level: 긴급 키워드(긴급, urgent, asap, 즉시, 오늘까지, deadline)가 있으면 high
+- action_required: 구체적인 요청, 미팅, 보고서 제출 등이 있으면 true
+- sentiment: 긍정적/부정적/중립적 톤 분석
+"""
+
+_SENTIMENTS = {"positive", "negative", "neutral"}
+_ACTION_KEYWORDS = ["요청", "부탁", "미팅", "회의", "보고서", "제출", "검토", "확인"]
+_POSITIVE_WORDS = ["감사", "좋", "잘", "성공", "완료", "수고"]
+_NEGATIVE_WORDS = ["문제", "오류", "실패", "늦", "미완료", "불만"]
+_URGENCY = {"high", "medium", "low"}
 
 
 @dataclass
@@ -36,6 +207,7 @@ class MessageSummary:
     action_required: bool
     suggested_response: Optional[str] = None
     created_at: datetime = None
+    source: str = ""  # 요약을 만든 모델 ID 또는 OFFLINE_SOURCE/GATE_SOURCE (저장된 결과 재사용 판단용)
     
     def __post_init__(self):
         if self.created_at is None:
@@ -51,15 +223,44 @@ class MessageSummary:
             "urgency_level": self.urgency_level,
             "action_required": self.action_required,
             "suggested_response": self.suggested_response,
-            "created_at": self.created_at.isoformat()
+            "created_at": self.created_at.isoformat(),
+            "source": self.source,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MessageSummary":
+        """to_dict() 결과로부터 복원"""
+        created_at = data.get("created_at")
+        return cls(
+            original_id=data.get("original_id", ""),
+            summary=data.get("summary", ""),
+            key_points=data.get("key_points", []),
+            sentiment=data.get("sentiment", "neutral"),
+            urgency_level=data.get("urgency_level", "low"),
+            action_required=data.get("action_required", False),
+            suggested_response=data.get("suggested_response"),
+            created_at=datetime.fromisoformat(created_at) if created_at else None,
+            source=data.get("source", ""),
+        )
+
 class MessageSummarizer:
     """메시지 요약기"""
     
-    def _build_transcript(self, messages: List[Dict], max_chars: int = 12000) -> str:
-        """여러 메시지를 시간순으로 묶어 한 번에 요약할 수 있는 전개문 생성"""
-        rows, total = [], 0
+    def _line_score(self, text: str) -> float:
+        """대화 줄 중요도 (예산 초과 시 낮은 줄부터 생략)"""
+        low = text.lower()
+        score = 0.0
+        if any(k in low for k in PRIORITY_RULES.get("high_priority_keywords", [])):
+            score += 2.0
+        if any(k in low for k in PRIORITY_RULES.get("medium_priority_keywords", [])):
+            score += 1.0
+        if "?" in text:
+            score += 0.5
+        return score
+
+    def _transcript_rows(self, messages: List[Dict]) -> List[Tuple[Optional[datetime], str]]:
+        """대화 메시지 → 시간순 (시각, "발신자: 내용") 목록 (시스템 메시지 제외, 한 줄은 400토큰까지)"""
+        rows = []
 
         def _ts(m):
             return (m.get("date") or m.get("timestamp") or m.get("datetime") or "")
@@ -71,15 +272,58 @@ class MessageSummarizer:
                 continue
             if (m.get("type") == "system") or (sender.lower() == "system"):
                 continue
-
             line = f"{sender}: {text}"
-            if total + len(line) > max_chars:
-                break
-            rows.append(line)
-            total += len(line) + 1
+            if self.tokens.raw_count(line) > 400:
+                line = self.tokens.truncate(line, 400)
+            rows.append((_parse_ts(_ts(m)), line))
+        return rows
 
+    def _build_transcript(self, messages: List[Dict], max_tokens: int = None) -> str:
+        """
+        여러 메시지를 시간순으로 묶어 한 번에 요약할 수 있는 전개문 생성
+        토큰 예산을 넘으면 중요 키워드가 없는 오래된 줄부터 생략한다. (긴 대화는 map-reduce 경로 사용)
+        """
+        rows = [line for _, line in self._transcript_rows(messages)]
+        if max_tokens is None:
+            max_tokens = self._conversation_line_budget()
+        rows = self.tokens.fit_lines(rows, max_tokens, scores=[self._line_score(r) for r in rows])
         return "\n".join(rows)
 
+    def _conversation_line_budget(self) -> int:
+        return self.budget_for("conversation") - self.tokens.raw_count(self._conversation_prompt(""))
+
+    def _chunk_transcript(self, rows: List[Tuple[Optional[datetime], str]]) -> List[List[Tuple[Optional[datetime], str]]]:
+        """
+        시간순 대화를 구간으로 나눔 (토큰 상한, 또는 절반 이상 찬 상태에서 긴 공백이 생기면 분할)
+        앞에서부터 채우므로 새 메시지가 뒤에 붙어도 앞 구간은 그대로다. (구간 요약 캐시 재사용)
+        경계가 토큰 추정 보정값에 따라 흔들리지 않도록 보정 전 토큰 수를 쓴다.
+        """
+        costs = [self.tokens.raw_count(line) + 1 for _, line in rows]
+        chunk_tokens = max(200, self.conversation_chunk_tokens)
+        if self.conversation_max_chunks:
+            # 구간 수 상한 → 전체 요약 시간이 대화 길이에 비례해 늘지 않도록
+            chunk_tokens = max(chunk_tokens, -(-sum(costs) // self.conversation_max_chunks))
+        while True:
+            chunks = self._split_rows(rows, costs, chunk_tokens)
+            if not self.conversation_max_chunks or len(chunks) <= self.conversation_max_chunks:
+                return chunks
+            chunk_tokens = int(chunk_tokens * 1.1) + 1
+
+    def _split_rows(self, rows, costs: List[int], chunk_tokens: int) -> List[List[Tuple[Optional[datetime], str]]]:
+        gap = timedelta(minutes=self.conversation_chunk_gap_minutes)
+        chunks, current, used, last_ts = [], [], 0, None
+        for (ts, line), cost in zip(rows, costs):
+            long_gap = ts is not None and last_ts is not None and ts - last_ts > gap
+            if current and (used + cost > chunk_tokens or (long_gap and used >= chunk_tokens // 2)):
+                chunks.append(current)
+                current, used = [], 0
+            current.append((ts, line))
+            used += cost
+            last_ts = ts or last_ts
+        if current:
+            chunks.append(current)
+        return chunks
+
     def _conversation_prompt(self, transcript: str) -> str:
         return f"""
     아래는 여러 사람이 주고받은 대화 전체입니다. 대화 흐름을 분석해 **순수 JSON만** 출력하세요.
@@ -139,93 +383,466 @@ class MessageSummarizer:
                                 + (f" (기한:{a.get('due')})" if a.get('due') else ""))
             return "\n".join(parts)
 
-    async def summarize_conversation(self, messages: List[Dict]) -> Dict:
-        """대화 전체를 1회 호출로 요약하여 dict(JSON)으로 반환"""
-        import json
-        transcript = self._build_transcript(messages, max_chars=12000)
-        if not transcript:
-            return {"summary":"", "key_points":[], "decisions":[], "unresolved":[], "risks":[], "action_items":[]}
-
-        prompt = self._conversation_prompt(transcript)
-
-        extra = {}
+    def _json_extra(self) -> Dict:
         # OpenAI 계열에서 JSON 강제 포맷 필요할 때만
         if str(self.model).startswith("openai/"):
-            extra["response_format"] = {"type": "json_object"}
+            return {"response_format": {"type": "json_object"}}
+        return {}
 
-        resp = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "당신은 회의/대화 요약 전문가입니다. 액션아이템을 명확히 뽑습니다."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=self.max_tokens,
-            temperature=self.temperature,
-            # ❌ usage 같은 요청 인자 넣지 마세요
-            **extra,
-        )
+    def _conversation_request(self, transcript: str) -> List[Dict]:
+        return [
+            {"role": "system", "content": CONVERSATION_SYSTEM_PROMPT},
+            {"role": "user", "content": self._conversation_prompt(transcript)},
+        ]
+
+    def _conversation_plan(self, messages: List[Dict], reserve: int = 0) -> List[List[Tuple[Optional[datetime], str]]]:
+        """한 번에 요약 가능하면 구간 1개, 예산(reserve 토큰 제외)을 넘으면 map-reduce용 여러 구간"""
+        rows = self._transcript_rows(messages)
+        if not rows:
+            return []
+        if sum(self.tokens.raw_count(line) + 1 for _, line in rows) <= self._conversation_line_budget() - reserve:
+            return [rows]
+        return self._chunk_transcript(rows)
+
+    async def _map_conversation(self, chunks: List[List[Tuple[Optional[datetime], str]]]) -> List[Dict]:
+        """
+        구간별 요약 (공유 동시성 한도 안에서 병렬, 응답은 LLM 캐시에 구간 단위로 저장)
+        한 구간이라도 실패하면 나머지 구간이 끝난 뒤 ConversationMapError (성공한 구간은 캐시에 남아 재시도가 싸다)
+        """
+        async def one(chunk):
+            start, end = chunk[0][0], chunk[-1][0]
+            header = f"(긴 대화의 일부 구간: {_fmt_ts(start)} ~ {_fmt_ts(end)})\n" if start else ""
+            try:
+                resp = await self._chat(self._conversation_request(header + "\n".join(line for _, line in chunk)),
+                                        operation="conversation.map", **self._json_extra())
+            except Exception as e:
+                logger.warning(f"대화 구간 요약 실패 ({_fmt_ts(start)} ~ {_fmt_ts(end)}): {e}")
+                return None
+            part = self._parse_conversation_text(resp.choices[0].message.content)
+            part["_range"] = (_fmt_ts(start), _fmt_ts(end))
+            return part
+
+        METRICS.inc("conversation_map_chunks_total", len(chunks))
+        partials = list(await asyncio.gather(*(one(c) for c in chunks)))
+        failed = sum(p is None for p in partials)
+        if failed:
+            METRICS.inc("conversation_map_failures_total", failed)
+            raise ConversationMapError(failed, len(chunks))
+        return partials
+
+    def _reduce_groups(self, partials: List[Dict]) -> List[List[Dict]]:
+        """reduce 입력을 예산에 맞게 묶음 (1묶음이면 바로 최종 reduce)"""
+        budget = self.budget_for("conversation") - self.tokens.raw_count(_REDUCE_PROMPT)
+        groups, current, used = [], [], 0
+        for p in partials:
+            cost = self.tokens.raw_count(_render_partial(p)) + 2
+            if current and used + cost > budget:
+                groups.append(current)
+                current, used = [], 0
+            current.append(p)
+            used += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    def _reduce_request(self, partials: List[Dict]) -> List[Dict]:
+        body = "\n\n".join(_render_partial(p) for p in partials)
+        return [
+            {"role": "system", "content": CONVERSATION_SYSTEM_PROMPT},
+            {"role": "user", "content": _REDUCE_PROMPT.replace("{partials}", body)},
+        ]
+
+    async def _reduce_once(self, partials: List[Dict]) -> Dict:
+        resp = await self._chat(self._reduce_request(partials), operation="conversation.reduce",
+                                **self._json_extra())
+        return _finish_reduce(self._parse_conversation_text(resp.choices[0].message.content), partials)
+
+    async def _reduce_until_one_group(self, partials: List[Dict]) -> List[Dict]:
+        """구간 요약이 한 번에 들어가지 않으면 묶음별로 먼저 합침 (트리 reduce, 단계마다 병렬)"""
+        groups = self._reduce_groups(partials)
+        while len(groups) > 1:
+            partials = list(await asyncio.gather(*(self._reduce_once(g) for g in groups)))
+            for p, g in zip(partials, groups):
+                p["_range"] = (g[0].get("_range", ("", ""))[0], g[-1].get("_range", ("", ""))[1])
+            groups = self._reduce_groups(partials)
+        return partials
 
-        text = (resp.choices[0].message.content or "").strip().strip("`")
+    @staticmethod
+    def _parse_conversation_text(text: str) -> Dict:
+        text = (text or "").strip().strip("`")
         # JSON 부분만 추출
         s, e = text.find("{"), text.rfind("}") + 1
         try:
             return json.loads(text[s:e])
         except Exception:
-            return {"summary": text, "key_points": [], "decisions": [], "unresolved": [], "risks": [], "action_items": []}
+            return {**_EMPTY_CONVERSATION, "summary": text}
+
+    async def summarize_conversation(self, messages: List[Dict]) -> Dict:
+        """
+        대화 전체를 요약하여 dict(JSON)으로 반환
+        예산 안이면 1회 호출, 넘으면 구간별 요약(map, 병렬) 후 통합(reduce)
+        """
+        chunks = self._conversation_plan(messages)
+        if not chunks:
+            return dict(_EMPTY_CONVERSATION)
+        if len(chunks) == 1:
+            # ❌ usage 같은 요청 인자 넣지 마세요
+            resp = await self._chat(self._conversation_request("\n".join(line for _, line in chunks[0])),
+                                    operation="conversation", **self._json_extra())
+            return self._parse_conversation_text(resp.choices[0].message.content)
+
+        partials = await self._reduce_until_one_group(await self._map_conversation(chunks))
+        return await self._reduce_once(partials)
+
+    async def update_conversation_summary(self, previous: Optional[Dict], messages: List[Dict]) -> Dict:
+        """
+        이전 요약 + 새 메시지만으로 갱신된 대화 요약 (비용이 전체 이력이 아니라 새 메시지 양에 비례)
+        새 메시지가 예산을 넘으면 새 구간들을 map한 뒤 이전 요약과 함께 reduce한다.
+        """
+        if not previous or not (previous.get("summary") or any(previous.get(f) for f in _LIST_FIELDS)):
+            return await self.summarize_conversation(messages)
+
+        prev = {**{k: v for k, v in previous.items() if not k.startswith("_")}, "_label": "이전 요약"}
+        rendered = _render_partial(prev)
+        chunks = self._conversation_plan(messages, reserve=self.tokens.raw_count(rendered))
+        if not chunks:
+            return dict(previous)
+        if len(chunks) == 1:
+            prompt = (_UPDATE_PROMPT.replace("{previous}", rendered)
+                      .replace("{transcript}", "\n".join(line for _, line in chunks[0])))
+            resp = await self._chat(
+                [{"role": "system", "content": CONVERSATION_SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+                operation="conversation.update", **self._json_extra())
+            return _finish_reduce(self._parse_conversation_text(resp.choices[0].message.content), [prev])
+
+        partials = await self._reduce_until_one_group([prev] + await self._map_conversation(chunks))
+        return await self._reduce_once(partials)
+
+    def update_conversation_summary_offline(self, previous: Optional[Dict], messages: List[Dict]) -> Dict:
+        """
+        LLM 없이 이전 요약 + 새 메시지로 대화 요약 갱신 (추출 요약, 호출/경고 없음)
+        요약문과 핵심 포인트는 이전 요약문과 새 대화에서 다시 뽑고, 나머지 목록 필드는 이전 값을 유지한다.
+        """
+        lines = [line for _, line in self._transcript_rows(messages)]
+        base = {**_EMPTY_CONVERSATION, **{k: v for k, v in (previous or {}).items() if not k.startswith("_")}}
+        if not lines:
+            return base
+        head = [base["summary"]] if base.get("summary") else []
+        with METRICS.stage("nlp.extractive_summarize", items=len(messages)):
+            extracted = self.extractive.summarize("\n".join(head + lines))
+        return {**base, "summary": extracted.summary, "key_points": extracted.key_points}
 
     def __init__(self, api_key: str = None):
         self.provider = LLM_CONFIG.get("provider", "openrouter")
         self.model = LLM_CONFIG.get("model", "openrouter/auto")
         self.max_tokens = LLM_CONFIG.get("max_tokens", 1000)
         self.temperature = LLM_CONFIG.get("temperature", 0.3)
+        self.batch_mode = LLM_CONFIG.get("batch_mode", "packed")
+        self.stream = LLM_CONFIG.get("stream", True)
+        self.conversation_chunk_tokens = LLM_CONFIG.get("conversation_chunk_tokens", 2500)
+        self.conversation_chunk_gap_minutes = LLM_CONFIG.get("conversation_chunk_gap_minutes", 120)
+        self.conversation_max_chunks = LLM_CONFIG.get("conversation_max_chunks", 32)
+        self.pack_max_items = LLM_CONFIG.get("pack_max_items", 12)
+        self.pack_item_max_tokens = LLM_CONFIG.get("pack_item_max_tokens", 220)
+        self.pack_item_prompt_tokens = LLM_CONFIG.get("pack_item_prompt_tokens", 600)
+        self.prompt_budgets = LLM_CONFIG.get("prompt_budgets", {})
+        self.tokens = get_counter(self.model)
+        # LLM을 못 쓸 때(또는 호출 실패 시) 쓰는 로컬 추출 요약기
+        self.extractive = ExtractiveSummarizer(
+            keywords=PRIORITY_RULES.get("high_priority_keywords", [])
+            + PRIORITY_RULES.get("medium_priority_keywords", []) + _ACTION_KEYWORDS,
+        )
 
-        self.client = None
+        # 직접 지정한 클라이언트 (가짜 LLM 등). 없으면 llm_client 레지스트리의 공용 클라이언트 사용
+        self._client = None
         self.is_available = False
+        self.cache: Optional[LLMResponseCache] = None
+        # 같은 공급자를 쓰는 모든 요약기/호출이 하나의 동시성 한도를 공유
+        self.limiter = get_limiter(
+            self.provider,
+            initial=LLM_CONFIG.get("concurrency_initial", 5),
+            min_limit=LLM_CONFIG.get("concurrency_min", 1),
+            max_limit=LLM_CONFIG.get("concurrency_max", 32),
+        )
 
+        # 같은 프롬프트가 동시에 나가면 진행 중 호출 하나에 합침 (프로세스 전역, 요약기 간 공유)
+        self.flights = get_single_flight() if LLM_CONFIG.get("single_flight", True) else None
+
+        # 접속 설정만 정해 두고, 연결 풀을 가진 클라이언트는 프로세스 전체가 공유 (nlp/llm_client.py)
+        self._client_spec = client_spec(self.provider, api_key)
         if AsyncOpenAI is None:
             logger.warning("openai 패키지가 설치되어 있지 않습니다. 기본 요약 모드로 동작합니다.")
             return
-
-        if self.provider == "openrouter":
-            key = api_key or LLM_CONFIG.get("openrouter_api_key") or os.getenv("OPENROUTER_API_KEY")
-            base_url = LLM_CONFIG.get("openrouter_base_url", "https://openrouter.ai/api/v1")
-            if key:
-                # ✅ OpenRouter: base_url + API Key + (선택) 기본 헤더
-                self.client = AsyncOpenAI(
-                    api_key=key,
-                    base_url=base_url,
-                    default_headers={
-                        # 아래 두 헤더는 권장(트래픽 출처 표시)
-                        "HTTP-Referer": "https://github.com/dragon-zzuni/smart_assistant",
-                        "X-Title": "smart_assistant",
-                    },
-                    timeout=30.0,
-                )
-                self.is_available = True
-        else:
-            # OpenAI 직접 사용시
-            key = api_key or LLM_CONFIG.get("openai_api_key") or os.getenv("OPENAI_API_KEY")
-            if key:
-                self.client = AsyncOpenAI(api_key=key)
-                self.is_available = True
+        self.is_available = self._client_spec is not None
 
         if not self.is_available:
             logger.warning("LLM API 키가 설정되지 않았습니다. 기본 요약 모드로 동작합니다.")
+        elif LLM_CACHE_CONFIG.get("enabled", True):
+            try:
+                self.cache = LLMResponseCache(
+                    LLM_CACHE_CONFIG.get("path", "data/llm_cache.db"),
+                    max_entries=LLM_CACHE_CONFIG.get("max_entries", 5000),
+                    max_bytes=LLM_CACHE_CONFIG.get("max_bytes", 50 * 1024 * 1024),
+                    ttl_seconds=LLM_CACHE_CONFIG.get("ttl_seconds", 7 * 86400),
+                )
+            except Exception as e:
+                logger.error(f"LLM 응답 캐시 초기화 오류: {e}")
+
+    @property
+    def client(self):
+        """현재 이벤트 루프의 공용 클라이언트 (직접 지정한 클라이언트가 있으면 그것)"""
+        if self._client is not None:
+            return self._client
+        if not self.is_available or self._client_spec is None:
+            return None
+        return get_client(self._client_spec)
+
+    @client.setter
+    def client(self, value):
+        self._client = value
 
-    async def summarize_message(self, content: str, sender: str = "", subject: str = "") -> MessageSummary:
+    def with_model(self, model: str, max_tokens: int = None) -> "MessageSummarizer":
+        """클라이언트/응답 캐시/동시성 제한을 공유하고 모델과 응답 토큰 상한만 다른 요약기 (모델 라우팅용)"""
+        clone = copy.copy(self)
+        clone.model = model
+        clone.max_tokens = max_tokens or self.max_tokens
+        clone.pack_item_max_tokens = min(self.pack_item_max_tokens, clone.max_tokens)
+        clone.tokens = get_counter(model)
+        return clone
+
+    async def _chat(self, messages: List[Dict], operation: str = "chat", max_tokens: int = None, **extra):
+        """Chat Completions 호출 공용 경로 (응답 캐시, 요청 합치기, 지연 시간/토큰 사용량 계측)"""
+        max_tokens = max_tokens or self.max_tokens
+        key = LLMResponseCache.make_key(self.model, messages, self.temperature, max_tokens, **extra)
+        if self.cache is not None:
+            hit = self.cache.get(key)
+            METRICS.cache("llm_response", hit is not None)
+            if hit is not None:
+                return _response(hit["content"], hit.get("finish_reason"), cached=True)
+        if self.flights is None:
+            return await self._chat_call(messages, operation, max_tokens, key, extra)
+        return await self.flights.run(f"{self.provider}:{key}",
+                                      lambda: self._chat_call(messages, operation, max_tokens, key, extra),
+                                      operation=operation)
+
+    async def _chat_call(self, messages: List[Dict], operation: str, max_tokens: int, key: str, extra: Dict):
+        """실제 API 호출 (+ 성공한 응답 캐시 저장)"""
+        predicted = self.tokens.count_messages(messages)
+        started = time.perf_counter()
+        ok = False
+        resp = None
+        try:
+            resp = await call_with_retry(
+                self.limiter,
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=self.temperature,
+                    **extra,
+                ),
+                max_retries=LLM_CONFIG.get("max_retries", 4),
+                base_delay=LLM_CONFIG.get("retry_base_delay", 0.5),
+                max_delay=LLM_CONFIG.get("retry_max_delay", 20.0),
+            )
+            ok = True
+        finally:
+            METRICS.record_llm(self.model, time.perf_counter() - started,
+                               usage=getattr(resp, "usage", None), ok=ok, operation=operation)
+
+        usage = getattr(resp, "usage", None)
+        if usage is not None:
+            self.tokens.observe(predicted, getattr(usage, "prompt_tokens", None))
+
+        if self.cache is not None:
+            choice = resp.choices[0]
+            content = choice.message.content
+            # 잘린 응답(length)이나 빈 응답은 저장하지 않음
+            if content and getattr(choice, "finish_reason", None) != "length":
+                self.cache.put(key, {"content": content, "finish_reason": getattr(choice, "finish_reason", None)},
+                               model=self.model)
+        return resp
+
+    async def _chat_stream(self, messages: List[Dict], operation: str = "chat", max_tokens: int = None,
+                           **extra) -> AsyncIterator[str]:
+        """
+        stream=True Chat Completions - 응답 조각(delta)을 도착하는 대로 내보냄
+        캐시 적중이면 저장된 응답 전체를 한 번에 내보낸다. 첫 조각이 나가기 전까지만 재시도한다.
+        같은 프롬프트 요청이 진행 중이면 그 응답이 끝날 때까지 기다렸다가 전체를 한 번에 내보낸다.
+        """
+        max_tokens = max_tokens or self.max_tokens
+        key = LLMResponseCache.make_key(self.model, messages, self.temperature, max_tokens, **extra)
+        if self.cache is not None:
+            hit = self.cache.get(key)
+            METRICS.cache("llm_response", hit is not None)
+            if hit is not None:
+                yield hit["content"]
+                return
+
+        flight = None
+        if self.flights is not None:
+            flight_key = f"{self.provider}:{key}"
+            while True:
+                fut, leader = self.flights.join(flight_key, operation)
+                if leader:
+                    flight = (flight_key, fut)
+                    break
+                try:
+                    resp = await self.flights.wait(fut)
+                except FlightAborted:
+                    continue  # 앞선 요청이 중단됨 → 직접 호출
+                content = resp.choices[0].message.content
+                if content:
+                    yield content
+                return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        end = object()
+
+        async def consume():
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+                stream=True,
+                **extra,
+            )
+            parts, finish, usage = [], None, None
+            try:
+                async for chunk in stream:
+                    usage = getattr(chunk, "usage", None) or usage
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    finish = getattr(choice, "finish_reason", None) or finish
+                    delta = getattr(choice.delta, "content", None)
+                    if delta:
+                        parts.append(delta)
+                        queue.put_nowait(delta)
+            except Exception as e:
+                if parts:
+                    raise StreamInterrupted(f"스트리밍 중단 ({len(parts)}개 조각 수신 후): {e}") from e
+                raise
+            return SimpleNamespace(content="".join(parts), finish_reason=finish, usage=usage)
+
+        async def run():
+            try:
+                return await call_with_retry(
+                    self.limiter, consume,
+                    max_retries=LLM_CONFIG.get("max_retries", 4),
+                    base_delay=LLM_CONFIG.get("retry_base_delay", 0.5),
+                    max_delay=LLM_CONFIG.get("retry_max_delay", 20.0),
+                )
+            finally:
+                queue.put_nowait(end)
+
+        predicted = self.tokens.count_messages(messages)
+        started = time.perf_counter()
+        first = True
+        task = asyncio.ensure_future(run())
+        result = None
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                delta = await queue.get()
+                if delta is end:
+                    break
+                if first:
+                    first = False
+                    METRICS.observe("llm_time_to_first_token_seconds", time.perf_counter() - started,
+                                    model=self.model, operation=operation)
+                yield delta
+            result = await task
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if not task.done():
+                task.cancel()
+            METRICS.record_llm(self.model, time.perf_counter() - started,
+                               usage=getattr(result, "usage", None), ok=result is not None, operation=operation)
+            if flight is not None:
+                self.flights.finish(*flight, error=error,
+                                    result=_response(result.content, result.finish_reason) if result else None)
+
+        if result.usage is not None:
+            self.tokens.observe(predicted, getattr(result.usage, "prompt_tokens", None))
+        if self.cache is not None and result.content and result.finish_reason != "length":
+            self.cache.put(key, {"content": result.content, "finish_reason": result.finish_reason},
+                           model=self.model)
+
+    async def _stream_fields(self, messages: List[Dict], operation: str, fallback, **extra) -> AsyncIterator[Dict]:
+        """
+        스트리밍 응답을 부분 JSON으로 읽어 필드가 바뀔 때마다 지금까지의 dict를 내보냄
+        마지막 값은 완결된 JSON (JSON이 아니면 fallback(전체 텍스트) 결과)
+        """
+        parser = IncrementalJSONParser()
+        async for delta in self._chat_stream(messages, operation=operation, **extra):
+            if parser.feed(delta):
+                yield dict(parser.fields)
+        final = parser.result() if parser.done else None
+        yield final if isinstance(final, dict) else fallback(parser.buffer or "")
+
+    def budget_for(self, kind: str, completion_tokens: int = None) -> int:
+        """용도별 프롬프트 토큰 예산 (모델 컨텍스트 크기 고려)"""
+        return prompt_budget(self.model, kind, self.prompt_budgets,
+                             completion_tokens=self.max_tokens if completion_tokens is None else completion_tokens)
+
+    async def summarize_message(self, content: str, sender: str = "", subject: str = "",
+                                budget: str = "message") -> MessageSummary:
         if self.is_available and self.client:
-            return await self._llm_summarize(content, sender, subject)
+            return await self._llm_summarize(content, sender, subject, budget=budget)
         else:
             return self._basic_summarize(content, sender, subject)
     
-    def _create_summarization_prompt(self, content: str, sender: str, subject: str) -> str:
-        """요약 프롬프트 생성"""
+    async def summarize_message_stream(self, content: str, sender: str = "", subject: str = "",
+                                       budget: str = "message") -> AsyncIterator[Dict]:
+        """
+        summarize_message의 스트리밍 버전 - summary/key_points 등이 도착하는 대로 dict로 내보냄
+        마지막 값이 최종 결과(MessageSummary.to_dict() 필드)다. LLM을 쓸 수 없으면 기본 요약 1건.
+        """
+        if not (self.is_available and self.client):
+            yield self._basic_summarize(content, sender, subject).to_dict()
+            return
+        request = self._message_request(content, sender, subject, budget)
+        try:
+            async for partial in self._stream_fields(
+                    request, "message",
+                    lambda text: self._parse_llm_response(text, sender).to_dict(),
+                    **self._json_extra()):
+                yield partial
+        except Exception as e:
+            logger.error(f"LLM 스트리밍 요약 오류: {e}")
+            yield self._basic_summarize(content, sender, subject).to_dict()
+
+    def _message_request(self, content: str, sender: str, subject: str, budget: str = "message") -> List[Dict]:
+        prompt = self._create_summarization_prompt(content, sender, subject,
+                                                   max_prompt_tokens=self.budget_for(budget))
+        return [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _create_summarization_prompt(self, content: str, sender: str, subject: str,
+                                     max_prompt_tokens: int = None) -> str:
+        """요약 프롬프트 생성 (본문은 토큰 예산에 맞춰 앞부분만 남김)"""
+        if max_prompt_tokens is None:
+            max_prompt_tokens = self.budget_for("message")
+        if content:
+            fixed = self.tokens.raw_count(SUMMARY_SYSTEM_PROMPT) + self.tokens.raw_count(
+                self._summarization_template("", sender, subject))
+            content = self.tokens.truncate(content, max_prompt_tokens - fixed)
+        return self._summarization_template(content, sender, subject)
+
+    @staticmethod
+    def _summarization_template(content: str, sender: str, subject: str) -> str:
         prompt = f"""
 다음 메시지를 분석하여 JSON 형식으로 답변해주세요:
 
 발신자: {sender}
 제목: {subject}
-내용: {content[:2000]}  # 내용이 길면 앞부분만
+내용: {content}
 
 다음 형식으로 분석해주세요:
 {{
@@ -244,26 +861,13 @@ class MessageSummarizer:
 """
         return prompt
 
-    async def _llm_summarize(self, content: str, sender: str = "", subject: str = "") -> MessageSummary:
+    async def _llm_summarize(self, content: str, sender: str = "", subject: str = "",
+                             budget: str = "message") -> MessageSummary:
         """OpenRouter/OpenAI 공용 Chat Completions"""
-        extra = {}
-        if self.model.startswith("openai/"):
-            extra["response_format"] = {"type": "json_object"}
-
         try:
-            prompt = self._create_summarization_prompt(content, sender, subject)
-
             # ✅ v1 스타일
-            resp = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "당신은 업무용 메시지 분석 전문가입니다. 이메일과 메신저 메시지를 분석하여 요약, 핵심 포인트, 감정, 긴급도, 필요한 액션을 파악합니다."},
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                **extra,
-            )
+            resp = await self._chat(self._message_request(content, sender, subject, budget),
+                                    operation="message", **self._json_extra())
 
             result_text = resp.choices[0].message.content
             return self._parse_llm_response(result_text, sender)
@@ -291,7 +895,8 @@ class MessageSummarizer:
                     sentiment=data.get("sentiment", "neutral"),
                     urgency_level=data.get("urgency_level", "low"),
                     action_required=data.get("action_required", False),
-                    suggested_response=data.get("suggested_response")
+                    suggested_response=data.get("suggested_response"),
+                    source=self.model,
                 )
         except Exception as e:
             logger.error(f"LLM 응답 파싱 오류: {e}")
@@ -300,91 +905,283 @@ class MessageSummarizer:
         return self._basic_summarize(response_text, sender)
     
     def _basic_summarize(self, content: str, sender: str = "", subject: str = "") -> MessageSummary:
-        """기본 요약 (LLM 없이)"""
+        """기본 요약 (LLM 없이): 추출 요약 + 키워드 기반 분석"""
+        extracted = self.extractive.summarize(content)
+        return self._offline_summary(content, extracted,
+                                     f"basic_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    def _offline_summary(self, content: str, extracted: ExtractiveSummary, original_id: str) -> MessageSummary:
+        """추출 요약 결과에 키워드 기반 긴급도/감정/액션 분석을 붙여 MessageSummary 생성"""
         # 간단한 키워드 기반 분석
         urgency_keywords = PRIORITY_RULES.get("high_priority_keywords", [])
-        action_keywords = ["요청", "부탁", "미팅", "회의", "보고서", "제출", "검토", "확인"]
-        
         content_lower = content.lower()
-        
+
         # 긴급도 분석
         urgency_level = "low"
         for keyword in urgency_keywords:
             if keyword in content_lower:
                 urgency_level = "high"
                 break
-        
+
         # 액션 필요성 분석
-        action_required = any(keyword in content_lower for keyword in action_keywords)
-        
+        action_required = any(keyword in content_lower for keyword in _ACTION_KEYWORDS)
+
         # 감정 분석 (간단한 키워드 기반)
-        positive_words = ["감사", "좋", "잘", "성공", "완료", "수고"]
-        negative_words = ["문제", "오류", "실패", "늦", "미완료", "불만"]
-        
         sentiment = "neutral"
-        if any(word in content_lower for word in positive_words):
+        if any(word in content_lower for word in _POSITIVE_WORDS):
             sentiment = "positive"
-        elif any(word in content_lower for word in negative_words):
+        elif any(word in content_lower for word in _NEGATIVE_WORDS):
             sentiment = "negative"
-        
-        # 기본 요약 생성
-        summary = content[:200] + "..." if len(content) > 200 else content
-        
-        # 핵심 포인트 추출 (간단한 문장 분할)
-        sentences = content.split('.')[:3]
-        key_points = [s.strip() for s in sentences if s.strip()]
-        
+
         return MessageSummary(
-            original_id=f"basic_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            summary=summary,
-            key_points=key_points,
+            original_id=original_id,
+            summary=extracted.summary,
+            key_points=extracted.key_points,
             sentiment=sentiment,
             urgency_level=urgency_level,
-            action_required=action_required
+            action_required=action_required,
+            source=OFFLINE_SOURCE,
         )
-    
-    async def batch_summarize(self, messages: List[Dict]) -> List[MessageSummary]:
-        """여러 메시지를 동시(제한된 동시성)로 요약. 입력 순서를 보존합니다."""
-        if not messages:
-            return []
-
-        # 동시 실행 상한 (리밋/속도 균형용)
-        CONCURRENCY = 5
-        sem = asyncio.Semaphore(CONCURRENCY)
 
-        results: List[MessageSummary] = [None] * len(messages)  # 입력 순서 유지용
+    def summarize_offline(self, messages: List[Dict]) -> List[MessageSummary]:
+        """LLM 없이 메시지 목록 전체를 한 번에 추출 요약 (입력 순서 보존, 원본 msg_id 연결)"""
+        contents = [(m.get("content") or m.get("body") or "").strip() for m in messages]
+        with METRICS.stage("nlp.extractive_summarize", items=len(messages)):
+            extracted = self.extractive.summarize_batch(contents)
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            return [self._offline_summary(content, ext, m.get("msg_id") or f"basic_summary_{stamp}")
+                    for m, content, ext in zip(messages, contents, extracted)]
 
-        async def one(i: int, m: Dict):
-            content = (m.get("content") or m.get("body") or "").strip()
-            sender  = (m.get("sender")  or "").strip()
-            subject = (m.get("subject") or "").strip()
+    async def summarize_topic(self, messages: List[Dict], label: str = "") -> MessageSummary:
+        """주제로 묶인 메시지 여러 개를 요약 1건으로 (요청 1회, 토큰 예산을 넘으면 덜 중요한 줄부터 생략)"""
+        senders = list(dict.fromkeys((m.get("sender") or "").strip() for m in messages if m.get("sender")))
+        sender = ", ".join(senders[:5]) + (f" 외 {len(senders) - 5}명" if len(senders) > 5 else "")
+        subject = f"주제: {label} ({len(messages)}개 메시지)" if label else f"{len(messages)}개 메시지"
+        fixed = self.tokens.raw_count(SUMMARY_SYSTEM_PROMPT) + self.tokens.raw_count(
+            self._summarization_template("", sender, subject))
+        transcript = self._build_transcript(messages, max_tokens=self.budget_for("topic") - fixed)
 
-            # 내용이 비면 호출하지 않고 기본 요약
-            if not content:
-                s = self._basic_summarize(content, sender, subject)
-                s.original_id = m.get("msg_id") or s.original_id   # ✅ 여기
-                results[i] = s
-                return
+        with METRICS.stage("nlp.summarize_topic", items=len(messages)):
+            if not (self.is_available and self.client):
+                return self._basic_summarize(transcript, sender, subject)
+            request = [
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": self._summarization_template(transcript, sender, subject)},
+            ]
+            try:
+                resp = await self._chat(request, operation="topic", **self._json_extra())
+                return self._parse_llm_response(resp.choices[0].message.content, sender)
+            except Exception as e:
+                logger.error(f"주제 요약 오류 ({label}): {e}")
+                return self._basic_summarize(transcript, sender, subject)
 
+    async def summarize_item(self, m: Dict) -> MessageSummary:
+        """메시지 dict 1건 요약. 실패 시 기본 요약으로 대체하고 원본 msg_id를 연결합니다."""
+        content = (m.get("content") or m.get("body") or "").strip()
+        sender  = (m.get("sender")  or "").strip()
+        subject = (m.get("subject") or "").strip()
 
+        # 내용이 비면 호출하지 않고 기본 요약
+        if not content:
+            s = self._basic_summarize(content, sender, subject)
+        else:
             try:
-                async with sem:
-                    s = await self.summarize_message(content, sender, subject)
-                    # ✅ 요약 객체에 원본 메시지 ID 연결 (핵심)
-                    s.original_id = m.get("msg_id") or s.original_id
-                    results[i] = s
+                s = await self.summarize_message(content, sender, subject)
             except Exception as e:
-                logger.error(f"메시지 요약 오류 (index={i}): {e}")
+                logger.error(f"메시지 요약 오류 ({m.get('msg_id')}): {e}")
                 s = self._basic_summarize(content, sender, subject)
-                s.original_id = m.get("msg_id") or s.original_id   # ✅ 여기
-                results[i] = s
-                
-        await asyncio.gather(*[asyncio.create_task(one(i, m)) for i, m in enumerate(messages)])
+
+        # ✅ 요약 객체에 원본 메시지 ID 연결 (핵심)
+        s.original_id = m.get("msg_id") or s.original_id
+        return s
+
+    @staticmethod
+    def _at_priority(priorities: Optional[Sequence[float]], idx: Sequence[int], aw):
+        """idx 항목 중 가장 높은 디스패치 우선순위로 실행 (priorities가 없으면 그대로)"""
+        if priorities is None:
+            return aw
+        return with_priority(max(priorities[i] for i in idx), aw)
+
+    async def batch_summarize(self, messages: List[Dict],
+                              priorities: Optional[Sequence[float]] = None) -> List[MessageSummary]:
+        """
+        여러 메시지를 동시(제한된 동시성)로 요약. 입력 순서를 보존합니다.
+        priorities(메시지별 디스패치 우선순위, priority_ranker.dispatch_priority)를 주면 높은 것부터 호출을 내보내고
+        제한기 대기열에서도 그 순서로 슬롯을 받는다.
+        """
+        if not messages:
+            return []
+
+        if not (self.is_available and self.client):
+            results = self.summarize_offline(messages)
+            logger.info(f"📝 {len(results)}개 메시지 오프라인 추출 요약 완료")
+            return results
+
+        if self.batch_mode == "packed":
+            with METRICS.stage("nlp.batch_summarize", items=len(messages)):
+                results = await self.summarize_packed(messages, priorities)
+            logger.info(f"📝 {len(results)}개 메시지 묶음 요약 완료")
+            return results
+
+        # 동시 실행 상한은 공급자별 적응형 제한기(self.limiter)가 결정
+        order = list(range(len(messages)))
+        if priorities is not None:
+            order.sort(key=lambda i: -priorities[i])
+        results: List[Optional[MessageSummary]] = [None] * len(messages)
+        with METRICS.stage("nlp.batch_summarize", items=len(messages)):
+            done = await asyncio.gather(*[self._at_priority(priorities, [i], self.summarize_item(messages[i]))
+                                          for i in order])
+        for i, r in zip(order, done):
+            results[i] = r
 
         logger.info(f"📝 {sum(1 for r in results if r is not None)}개 메시지 요약 완료")
+        return list(results)
+
+    # ─────────────────────────────────────────────
+    # 묶음(packed) 요약
+    # ─────────────────────────────────────────────
+    def _pack_entry(self, pack_id: str, m: Dict) -> str:
+        content = self.tokens.truncate((m.get("content") or m.get("body") or "").strip(),
+                                       self.pack_item_prompt_tokens)
+        lines = [f"[id: {pack_id}]", f"발신자: {(m.get('sender') or '').strip()}"]
+        subject = (m.get("subject") or "").strip()
+        if subject:
+            lines.append(f"제목: {subject}")
+        lines.append(f"내용: {content}")
+        return "\n".join(lines)
+
+    def _plan_packs(self, entries: List[str]) -> List[List[int]]:
+        """프롬프트 토큰 예산과 최대 항목 수에 맞춰 순서대로 묶음 구성"""
+        overhead = self.tokens.raw_count(SUMMARY_SYSTEM_PROMPT) + self.tokens.raw_count(PACKED_INSTRUCTIONS)
+        budget = self.budget_for("packed", completion_tokens=self.pack_item_max_tokens * self.pack_max_items)
+        packs, current, used = [], [], overhead
+        for i, text in enumerate(entries):
+            cost = self.tokens.raw_count(text) + 2
+            if current and (used + cost > budget or len(current) >= self.pack_max_items):
+                packs.append(current)
+                current, used = [], overhead
+            current.append(i)
+            used += cost
+        if current:
+            packs.append(current)
+        return packs
+
+    def _validate_packed_item(self, data: Dict, msg_id: str) -> Optional[MessageSummary]:
+        """묶음 응답 항목 1개 검증. 필수 필드가 없거나 형식이 틀리면 None"""
+        if not isinstance(data, dict):
+            return None
+        summary = data.get("summary")
+        if not isinstance(summary, str) or not summary.strip():
+            return None
+        key_points = data.get("key_points") or []
+        if not isinstance(key_points, list):
+            return None
+        sentiment = str(data.get("sentiment", "neutral")).lower()
+        urgency = str(data.get("urgency_level", "low")).lower()
+        if sentiment not in _SENTIMENTS or urgency not in _URGENCY:
+            return None
+        action_required = data.get("action_required", False)
+        if isinstance(action_required, str):
+            action_required = action_required.strip().lower() in ("true", "yes", "1")
+        return MessageSummary(
+            original_id=msg_id,
+            summary=summary.strip(),
+            key_points=[str(p) for p in key_points],
+            sentiment=sentiment,
+            urgency_level=urgency,
+            action_required=bool(action_required),
+            suggested_response=data.get("suggested_response") or None,
+            source=self.model,
+        )
+
+    @staticmethod
+    def _parse_packed_response(text: str) -> List[Dict]:
+        """{"items": [...]} 또는 [...] 형태의 응답에서 항목 리스트 추출"""
+        text = (text or "").strip().strip("`")
+        starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+        if not starts:
+            return []
+        start = min(starts)
+        end = max(text.rfind("}"), text.rfind("]")) + 1
+        data = json.loads(text[start:end])
+        if isinstance(data, dict):
+            data = data.get("items") or data.get("summaries") or []
+        return data if isinstance(data, list) else []
+
+    async def _llm_summarize_pack(self, messages: List[Dict]) -> Dict[int, MessageSummary]:
+        """메시지 묶음 1건 요청. 검증을 통과한 항목만 {입력 위치: 요약} 으로 반환"""
+        ids = [f"m{i + 1}" for i in range(len(messages))]
+        prompt = PACKED_INSTRUCTIONS + "\n\n" + "\n\n".join(
+            self._pack_entry(pid, m) for pid, m in zip(ids, messages))
+        extra = {}
+        if self.model.startswith("openai/"):
+            extra["response_format"] = {"type": "json_object"}
+
+        try:
+            resp = await self._chat(
+                [
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                operation="packed",
+                max_tokens=self.pack_item_max_tokens * len(messages),
+                **extra,
+            )
+            items = self._parse_packed_response(resp.choices[0].message.content)
+        except Exception as e:
+            logger.error(f"묶음 요약 오류 ({len(messages)}건): {e}")
+            return {}
+
+        position = {pid: i for i, pid in enumerate(ids)}
+        parsed = {}
+        for data in items:
+            i = position.get(str(data.get("id", ""))) if isinstance(data, dict) else None
+            if i is None or i in parsed:
+                continue
+            summary = self._validate_packed_item(data, messages[i].get("msg_id") or "")
+            if summary is not None:
+                parsed[i] = summary
+        return parsed
+
+    async def summarize_packed(self, messages: List[Dict],
+                               priorities: Optional[Sequence[float]] = None) -> List[MessageSummary]:
+        """
+        여러 메시지를 토큰 예산에 맞춰 묶어 요청. 입력 순서를 보존한다.
+        응답에서 빠졌거나 검증에 실패한 메시지만 단건 요청(summarize_item)으로 다시 처리한다.
+        priorities가 있으면 우선순위가 높은 메시지끼리 앞 묶음에 모으고, 묶음은 가장 높은 항목의 우선순위로 보낸다.
+        """
+        results: List[Optional[MessageSummary]] = [None] * len(messages)
+        targets = [i for i, m in enumerate(messages) if (m.get("content") or m.get("body") or "").strip()]
+        if priorities is not None:
+            targets.sort(key=lambda i: -priorities[i])
+        entries = [self._pack_entry(f"m{k + 1}", messages[i]) for k, i in enumerate(targets)]
+        packs = [[targets[k] for k in pack] for pack in self._plan_packs(entries)]
+
+        async def run_pack(pack: List[int]):
+            parsed = await self._llm_summarize_pack([messages[i] for i in pack])
+            for pos, summary in parsed.items():
+                results[pack[pos]] = summary
+
+        multi = [p for p in packs if len(p) > 1]
+        await asyncio.gather(*(self._at_priority(priorities, p, run_pack(p)) for p in multi))
+
+        # 빈 메시지, 혼자 남은 메시지, 묶음 응답에서 누락/검증 실패한 메시지는 단건 처리
+        missing = [i for i, r in enumerate(results) if r is None]
+        packed = sum(len(p) for p in multi)
+        failed = sum(1 for p in multi for i in p if results[i] is None)
+        METRICS.inc("llm_packed_items_total", packed - failed, result="ok")
+        if failed:
+            METRICS.inc("llm_packed_items_total", failed, result="fallback")
+            logger.warning(f"묶음 요약 누락/검증 실패 {failed}건 → 단건 요약으로 재시도")
+
+        async def one(i: int):
+            results[i] = await self.summarize_item(messages[i])
+
+        if priorities is not None:
+            missing.sort(key=lambda i: -priorities[i])
+        await asyncio.gather(*(self._at_priority(priorities, [i], one(i)) for i in missing))
         return results
 
-    
     def _extract_deadlines(self, content: str) -> List[str]:
         """데드라인 추출"""
         import re
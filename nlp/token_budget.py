@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+토큰 예산 - 문자 수 대신 토큰 수로 프롬프트 길이를 맞춘다.
+
+- tiktoken이 설치되어 있으면 모델에 맞는 인코딩으로 정확히 계산
+- 없으면 문자 종류(한글 등 비ASCII/영숫자/공백/기호)별 계수로 추정하고,
+  실제 응답의 usage.prompt_tokens로 모델별 보정 계수를 학습한다.
+  보정 계수는 보고/비용 추정(count)에만 쓰고, 프롬프트에 넣을 내용을 고르는 예산 판단(truncate, fit_lines,
+  묶음/구간 계획)은 보정 전 값(raw_count)을 쓴다. 보정값이 응답마다 바뀌어도 같은 입력이면 같은 프롬프트가
+  만들어져야 응답 캐시/집계 키가 맞는다.
+- 모델별 컨텍스트 크기와 용도별 예산(message/packed/conversation/overview) 중 작은 값을 사용
+- 예산을 넘는 줄 목록은 중요도가 낮고 오래된 줄부터 잘라낸다.
+"""
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from pipeline.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# 모델 이름에 포함된 문자열 → 컨텍스트 크기 (먼저 일치하는 항목 사용)
+MODEL_CONTEXT_WINDOWS = [
+    ("gpt-4o", 128000),
+    ("gpt-4.1", 1000000),
+    ("gpt-4-turbo", 128000),
+    ("gpt-3.5", 16385),
+    ("claude", 200000),
+    ("gemini", 1000000),
+    ("llama-3", 8192),
+    ("mistral", 32768),
+    ("mock", 32768),
+]
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# 추정 계수 (cl100k 계열 토크나이저로 한국어 업무 메시지를 측정한 대략값)
+_ASCII_PUNCT = re.compile(r"[!-/:-@\[-`{-~]")
+WIDE_TOKENS = 1.1      # 한글 등 비ASCII 문자
+ALNUM_TOKENS = 0.25
+SPACE_TOKENS = 0.1
+PUNCT_TOKENS = 0.6
+
+MESSAGE_OVERHEAD = 4  # 채팅 메시지 1개당 역할/구분 토큰
+REPLY_PRIMING = 3
+
+
+def context_window(model: str) -> int:
+    name = (model or "").lower()
+    for key, size in MODEL_CONTEXT_WINDOWS:
+        if key in name:
+            return size
+    return DEFAULT_CONTEXT_WINDOW
+
+
+class TokenCounter:
+    """모델별 토큰 계산기 (tiktoken 또는 보정 추정기)"""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.scale = 1.0
+        self._encoding = None
+        if tiktoken is not None:
+            base = (model or "").split("/")[-1]
+            try:
+                self._encoding = tiktoken.encoding_for_model(base)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base" if "4o" in base else "cl100k_base")
+        self._lock = threading.Lock()
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def _estimate(self, text: str) -> float:
+        # 문자 단위 정규식 대신 UTF-8 길이로 비ASCII 문자 수를 구한다 (한글 3바이트 기준, 빠름)
+        n = len(text)
+        wide = (len(text.encode("utf-8")) - n) // 2
+        space = text.count(" ") + text.count("\n") + text.count("\t")
+        punct = len(_ASCII_PUNCT.findall(text))
+        alnum = max(0, n - wide - space - punct)
+        return wide * WIDE_TOKENS + alnum * ALNUM_TOKENS + space * SPACE_TOKENS + punct * PUNCT_TOKENS
+
+    def count(self, text: str) -> int:
+        """보정 계수를 적용한 토큰 수 (예측 기록/비용 추정용)"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, int(round(self._estimate(text) * self.scale)))
+
+    def raw_count(self, text: str) -> int:
+        """보정 계수를 적용하지 않은 토큰 수 (프롬프트 내용을 고르는 예산 판단용 - 실행마다 결과가 같음)"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, int(round(self._estimate(text))))
+
+    def count_messages(self, messages: Sequence[Dict]) -> int:
+        return sum(self.count(str(m.get("content") or "")) + MESSAGE_OVERHEAD for m in messages) + REPLY_PRIMING
+
+    def truncate(self, text: str, max_tokens: int, marker: str = " …") -> str:
+        """앞부분을 남기고 max_tokens(보정 전 기준) 이내로 자름"""
+        if not text or max_tokens <= 0:
+            return ""
+        if self.raw_count(text) <= max_tokens:
+            return text
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return self._encoding.decode(tokens[:max_tokens]) + marker
+        # 추정기: 비율로 자른 뒤 넘치면 조금씩 줄임
+        cut = int(len(text) * max_tokens / self.raw_count(text))
+        while cut > 0 and self.raw_count(text[:cut]) > max_tokens:
+            cut = int(cut * 0.95)
+        return text[:cut].rstrip() + marker
+
+    def fit_lines(self, lines: List[str], max_tokens: int, scores: Optional[List[float]] = None,
+                  max_line_tokens: Optional[int] = None) -> List[str]:
+        """
+        예산(보정 전 기준) 안에 들어가는 줄만 남김 (원래 순서 유지)
+        점수가 높은 줄, 같은 점수면 뒤쪽(최근) 줄을 우선한다. 생략된 줄이 있으면 표시를 남긴다.
+        """
+        if max_line_tokens:
+            lines = [self.truncate(line, max_line_tokens) for line in lines]
+        costs = [self.raw_count(line) + 1 for line in lines]
+        if sum(costs) <= max_tokens:
+            return lines
+
+        scores = scores or [0.0] * len(lines)
+        order = sorted(range(len(lines)), key=lambda i: (scores[i], i), reverse=True)
+        marker_cost = 8  # "… (N개 생략)" 한 줄
+        kept, used = [], 0
+        for i in order:
+            if used + costs[i] + marker_cost <= max_tokens:
+                kept.append(i)
+                used += costs[i]
+        # 생략 표시 줄까지 포함해 넘치면 우선순위가 낮은 줄부터 더 뺀다
+        while kept:
+            excess = used + marker_cost * self._gaps(set(kept), len(lines)) - max_tokens
+            if excess <= 0:
+                break
+            while kept and excess > 0:
+                excess -= costs[kept[-1]]
+                used -= costs[kept.pop()]
+
+        kept_set = set(kept)
+        out, skipped = [], 0
+        for i, line in enumerate(lines):
+            if i in kept_set:
+                if skipped:
+                    out.append(f"… ({skipped}개 생략)")
+                    skipped = 0
+                out.append(line)
+            else:
+                skipped += 1
+        if skipped:
+            out.append(f"… ({skipped}개 생략)")
+        return out
+
+    @staticmethod
+    def _gaps(kept: set, n: int) -> int:
+        """생략 구간 수"""
+        gaps, prev_kept = 0, True
+        for i in range(n):
+            if i in kept:
+                prev_kept = True
+            elif prev_kept:
+                gaps += 1
+                prev_kept = False
+        return gaps
+
+    def observe(self, predicted: int, actual: Optional[int]):
+        """예측 대비 실제 prompt 토큰 기록, 추정기 사용 시 보정 계수 갱신"""
+        if not predicted or not actual:
+            return
+        ratio = actual / predicted
+        METRICS.observe("llm_prompt_tokens_ratio", ratio, model=self.model)
+        METRICS.inc("llm_prompt_tokens_predicted_total", predicted, model=self.model)
+        METRICS.inc("llm_prompt_tokens_actual_total", actual, model=self.model)
+        if self._encoding is None:
+            with self._lock:
+                target = self.scale * ratio
+                self.scale = min(3.0, max(0.3, 0.8 * self.scale + 0.2 * target))
+        if abs(ratio - 1.0) > 0.25:
+            logger.debug(f"토큰 예측 오차: 예측 {predicted}, 실제 {actual} ({self.model})")
+
+
+_COUNTERS: Dict[str, TokenCounter] = {}
+_COUNTERS_LOCK = threading.Lock()
+
+
+def get_counter(model: str) -> TokenCounter:
+    with _COUNTERS_LOCK:
+        counter = _COUNTERS.get(model)
+        if counter is None:
+            counter = _COUNTERS[model] = TokenCounter(model)
+        return counter
+
+
+def prompt_budget(model: str, kind: str, budgets: Dict[str, int], completion_tokens: int = 0,
+                  default: int = 1000) -> int:
+    """용도별 예산과 (컨텍스트 - 응답 토큰 - 여유분) 중 작은 값"""
+    configured = budgets.get(kind, default)
+    available = context_window(model) - completion_tokens - 64
+    return max(64, min(configured, available))
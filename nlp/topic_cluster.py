@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+주제(토픽) 군집 - 메시지가 많은 대화방은 메시지마다 요약하지 않고 주제 묶음마다 한 번 요약
+
+- 벡터: TF-IDF(extractive.tokenize 토큰을 고정 차원으로 해시) 또는 임베딩 모델(있으면), 행 단위 L2 정규화
+- 군집: 구면(spherical) 미니배치 k-means (k-means++ 초기화, 코사인 유사도로 배정), NumPy 벡터 연산
+- k = clamp(round(sqrt(n / 2)), 1, max_topics) → 주제 수(= LLM 호출 수)는 메시지 수가 아니라 max_topics로 제한
+- min_cluster_size보다 작은 묶음은 주제로 만들지 않음 (해당 메시지는 개별 요약)
+- 같은 입력이면 같은 결과 (고정 시드)
+
+NumPy가 없으면 군집을 만들지 않는다. (모든 메시지 개별 요약)
+"""
+import logging
+import math
+import re
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from config.settings import TOPIC_CONFIG
+from nlp.extractive import _STOPWORDS, tokenize
+from pipeline.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[가-힣]{2,}|[a-z][a-z0-9_]{2,}")
+# 주제 이름으로 쓰기엔 너무 흔한 업무 어휘
+_GENERIC = {"확인", "부탁드립니다", "부탁드려요", "있습니다", "했습니다", "합니다", "주세요", "알려주세요", "바랍니다"}
+
+
+def _text_of(message: Dict) -> str:
+    subject = (message.get("subject") or "").strip()
+    body = (message.get("content") or message.get("body") or "").strip()
+    return f"{subject}\n{body}" if subject else body
+
+
+@dataclass
+class Topic:
+    """주제 묶음 1개"""
+    topic_id: str
+    room: str
+    label: str
+    keywords: List[str] = field(default_factory=list)
+    message_ids: List[str] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.message_ids)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["size"] = self.size
+        return data
+
+
+class TopicClusterer:
+    """메시지 목록 → 주제 묶음"""
+
+    def __init__(self, embedder=None, config: Optional[Dict] = None):
+        cfg = {**TOPIC_CONFIG, **(config or {})}
+        self.max_topics = cfg.get("max_topics", 8)
+        self.min_cluster_size = cfg.get("min_cluster_size", 3)
+        self.dim = cfg.get("hashing_dim", 1024)
+        self.batch_size = cfg.get("kmeans_batch_size", 256)
+        self.iterations = cfg.get("kmeans_iterations", 50)
+        self.seed = cfg.get("seed", 42)
+        self.embedder = embedder if cfg.get("use_embeddings", True) else None
+
+    # ─────────────────────────────────────────────
+    # 벡터화
+    # ─────────────────────────────────────────────
+    def vectorize(self, texts: Sequence[str]) -> "np.ndarray":
+        if self.embedder is not None:
+            try:
+                return np.asarray(self.embedder.encode(list(texts)), dtype=np.float32)
+            except Exception as e:
+                logger.warning(f"주제 군집용 임베딩 실패, TF-IDF로 대체: {e}")
+
+        docs = [tokenize(t) for t in texts]
+        df = Counter(tok for toks in docs for tok in set(toks))
+        n = len(docs)
+        rows, cols, vals = [], [], []
+        for i, toks in enumerate(docs):
+            for tok, c in Counter(toks).items():
+                rows.append(i)
+                cols.append(zlib.crc32(tok.encode("utf-8")) % self.dim)
+                vals.append((1.0 + math.log(c)) * (math.log((1.0 + n) / (1.0 + df[tok])) + 1.0))
+        X = np.zeros((n, self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(X, (np.asarray(rows), np.asarray(cols)), np.asarray(vals, dtype=np.float32))
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        return X / np.where(norms > 0, norms, 1.0)
+
+    # ─────────────────────────────────────────────
+    # k-means (구면, 미니배치)
+    # ─────────────────────────────────────────────
+    def choose_k(self, n: int) -> int:
+        return max(1, min(self.max_topics, int(round(math.sqrt(n / 2.0)))))
+
+    def kmeans(self, X: "np.ndarray", k: int) -> "np.ndarray":
+        """행이 정규화된 X를 k개로 군집, 반환: 각 행의 군집 번호"""
+        n = len(X)
+        if k <= 1 or n <= k:
+            return np.zeros(n, dtype=np.int64) if k <= 1 else np.arange(n, dtype=np.int64)
+        rng = np.random.RandomState(self.seed)
+
+        # k-means++ 초기화 (거리 = 1 - 코사인)
+        centers = [int(rng.randint(n))]
+        dist = 1.0 - X @ X[centers[0]]
+        for _ in range(1, k):
+            weights = np.clip(dist, 0.0, None) ** 2
+            total = weights.sum()
+            nxt = int(rng.choice(n, p=weights / total)) if total > 0 else int(rng.randint(n))
+            centers.append(nxt)
+            dist = np.minimum(dist, 1.0 - X @ X[nxt])
+        C = X[centers].copy()
+
+        counts = np.zeros(k)
+        batch = min(self.batch_size, n)
+        labels = np.argmax(X @ C.T, axis=1)
+        for _ in range(self.iterations):
+            idx = rng.choice(n, batch, replace=False) if batch < n else np.arange(n)
+            assign = np.argmax(X[idx] @ C.T, axis=1)
+            # 미니배치 갱신: 중심별 학습률 1/누적 배정 수
+            sums = np.zeros_like(C)
+            np.add.at(sums, assign, X[idx])
+            hit = np.bincount(assign, minlength=k)
+            counts += hit
+            moved = hit > 0
+            eta = (hit[moved] / counts[moved])[:, None]
+            C[moved] = (1.0 - eta) * C[moved] + eta * (sums[moved] / hit[moved][:, None])
+            C /= np.maximum(np.linalg.norm(C, axis=1, keepdims=True), 1e-12)
+
+            new_labels = np.argmax(X @ C.T, axis=1)
+            if batch >= n and np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+        return labels
+
+    # ─────────────────────────────────────────────
+    # 주제 묶음
+    # ─────────────────────────────────────────────
+    @staticmethod
+    def keywords(texts: Sequence[str], members: Sequence[int], top: int = 3) -> List[str]:
+        """묶음 안에서 자주 나오고 다른 묶음에는 드문 단어 (TF × IDF)"""
+        doc_words = [set(w for w in _WORD.findall(t.lower()) if w not in _STOPWORDS and w not in _GENERIC)
+                     for t in texts]
+        df = Counter(w for words in doc_words for w in words)
+        tf = Counter(w for i in members for w in doc_words[i])
+        n = len(texts)
+        scored = sorted(tf.items(), key=lambda kv: (-kv[1] * math.log((1.0 + n) / df[kv[0]]), kv[0]))
+        return [w for w, c in scored if c > 1][:top]
+
+    def cluster(self, messages: Sequence[Dict], room: str = "") -> List[Topic]:
+        """메시지 목록을 주제로 묶음 (min_cluster_size 이상인 묶음만, 큰 묶음부터)"""
+        if np is None or len(messages) < max(2, self.min_cluster_size):
+            return []
+        texts = [_text_of(m) for m in messages]
+        with METRICS.stage("analyze.topic_cluster", items=len(messages)):
+            X = self.vectorize(texts)
+            labels = self.kmeans(X, self.choose_k(len(messages)))
+
+        groups: Dict[int, List[int]] = {}
+        for i, label in enumerate(labels.tolist()):
+            groups.setdefault(label, []).append(i)
+        members = sorted((g for g in groups.values() if len(g) >= self.min_cluster_size), key=lambda g: (-len(g), g[0]))
+
+        topics = []
+        for n, group in enumerate(members, 1):
+            words = self.keywords(texts, group)
+            topics.append(Topic(
+                topic_id=f"{room}#{n}" if room else f"topic#{n}",
+                room=room,
+                label=", ".join(words) if words else f"주제 {n}",
+                keywords=words,
+                message_ids=[messages[i].get("msg_id") for i in group],
+            ))
+        return topics
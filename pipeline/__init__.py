@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline 패키지 - 비동기 스테이지 파이프라인 엔진
+"""
+
+from .engine import Stage, Pipeline
+from .metrics import MetricsRegistry, METRICS
+
+__all__ = ['Stage', 'Pipeline', 'MetricsRegistry', 'METRICS']
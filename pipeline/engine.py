@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 스테이지 파이프라인 엔진
+각 스테이지는 bounded asyncio.Queue로 연결되어, 뒤 스테이지가 느리면 앞 스테이지가
+자연스럽게 대기(backpressure)한다. 완료된 항목은 즉시 출력으로 흘러간다.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Union
+
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # 스트림 종료 표시
+
+
+@dataclass
+class Stage:
+    """
+    파이프라인 스테이지
+    - fn: async (item) -> item | None  (None을 반환하면 해당 항목은 버림)
+    - workers: 이 스테이지의 동시 처리 개수
+    - batch_size > 1 이면 fn은 항목 리스트를 받아 결과 리스트를 반환한다.
+      첫 항목 도착 후 batch_timeout초까지 모인 만큼(최대 batch_size) 한 번에 처리
+    """
+    name: str
+    fn: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+    batch_size: int = 1
+    batch_timeout: float = 0.05
+
+
+class Pipeline:
+    """bounded queue로 연결된 스테이지들을 실행하고 결과를 완료 순서대로 내보냄"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 32, name: str = "pipeline"):
+        if not stages:
+            raise ValueError("스테이지가 최소 1개 필요합니다.")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.name = name
+        self._queues: List[asyncio.Queue] = []
+
+    async def run(self, source: Union[Iterable, AsyncIterator]) -> AsyncIterator[Any]:
+        queues = [asyncio.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        self._queues = queues
+        tasks: List[asyncio.Task] = []
+
+        async def feed():
+            if hasattr(source, "__aiter__"):
+                async for item in source:
+                    await queues[0].put(item)
+            else:
+                for item in source:
+                    await queues[0].put(item)
+            await queues[0].put(_DONE)
+
+        async def work(stage: Stage, q_in: asyncio.Queue, q_out: asyncio.Queue, alive: List[int]):
+            metric_name = f"{self.name}.{stage.name}"
+            while True:
+                item = await q_in.get()
+                METRICS.set_gauge("pipeline_queue_depth", q_in.qsize(), stage=metric_name)
+                if item is _DONE:
+                    # 같은 스테이지의 다른 워커도 종료하도록 되돌려 놓음
+                    await q_in.put(_DONE)
+                    alive[0] -= 1
+                    if alive[0] == 0:
+                        await q_out.put(_DONE)
+                    return
+                if stage.batch_size > 1:
+                    batch = await self._collect_batch(stage, q_in, item)
+                    with METRICS.stage(metric_name, items=len(batch)):
+                        outs = await stage.fn(batch)
+                    for out in outs or []:
+                        if out is not None:
+                            await q_out.put(out)
+                    continue
+                with METRICS.stage(metric_name, items=1):
+                    out = await stage.fn(item)
+                if out is not None:
+                    await q_out.put(out)
+
+        tasks.append(asyncio.create_task(feed(), name="pipeline:source"))
+        for i, stage in enumerate(self.stages):
+            alive = [max(1, stage.workers)]
+            for w in range(alive[0]):
+                tasks.append(asyncio.create_task(
+                    work(stage, queues[i], queues[i + 1], alive), name=f"pipeline:{stage.name}:{w}"
+                ))
+
+        out_q = queues[-1]
+        try:
+            while True:
+                get = asyncio.ensure_future(out_q.get())
+                await asyncio.wait([get, *tasks], return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    self._raise_failed(tasks)
+                    tasks = [t for t in tasks if not t.done()]
+                    continue
+                item = get.result()
+                if item is _DONE:
+                    break
+                yield item
+            self._raise_failed(tasks)
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _collect_batch(stage: Stage, q_in: asyncio.Queue, first: Any) -> List[Any]:
+        """first 이후 batch_timeout 안에 도착한 항목을 batch_size까지 모음"""
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + stage.batch_timeout
+        while len(batch) < stage.batch_size:
+            try:
+                if not q_in.empty():
+                    item = q_in.get_nowait()
+                else:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    item = await asyncio.wait_for(q_in.get(), remaining)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is _DONE:
+                # 종료 표시는 되돌려 두고 지금까지 모은 묶음만 처리
+                await q_in.put(_DONE)
+                break
+            batch.append(item)
+        return batch
+
+    @staticmethod
+    def _raise_failed(tasks: List[asyncio.Task]):
+        for t in tasks:
+            if t.done() and not t.cancelled() and t.exception() is not None:
+                raise t.exception()
+
+    def queue_depths(self) -> dict:
+        """스테이지별 입력 큐 적재량 (실행 중이 아니면 빈 dict)"""
+        return {stage.name: q.qsize() for stage, q in zip(self.stages, self._queues)}
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+파이프라인 계측 - 스테이지별 소요 시간/CPU 시간/처리 건수, 큐 적재량, LLM 지연 분위수,
+토큰 사용량, 캐시 적중률을 수집하고 Prometheus 텍스트 / JSON 스냅샷으로 내보낸다.
+
+비활성화 상태(기본)에서는 모든 기록 호출이 즉시 반환하며, stage()는 미리 만들어 둔
+no-op 객체를 돌려주므로 계측 코드를 남겨 두어도 비용이 거의 없다.
+
+사용 예:
+    with METRICS.stage("collect.email") as t:
+        emails = ...
+        t.add(len(emails))
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for k, v in items)
+    return "{" + body + "}"
+
+
+class _Summary:
+    """건수/합계 + 최근 관측값 저장소(reservoir)로 분위수 계산"""
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, reservoir: int):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=reservoir)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def quantiles(self) -> Dict[float, float]:
+        if not self.samples:
+            return {q: 0.0 for q in QUANTILES}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {q: ordered[min(last, int(round(q * last)))] for q in QUANTILES}
+
+
+class _NullTimer:
+    """비활성화 상태에서 사용하는 no-op 타이머"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, n: int = 1):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("registry", "name", "items", "_wall", "_cpu")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, items: int):
+        self.registry = registry
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        self.registry._record_stage(self.name, wall, cpu, self.items, failed=exc_type is not None)
+        return False
+
+    def add(self, n: int = 1):
+        self.items += n
+
+
+class MetricsRegistry:
+    """
+    프로세스 단위 계측 저장소 (스레드 안전)
+
+    - 스테이지 CPU 시간은 해당 구간 동안 호출 스레드가 사용한 CPU 시간이다.
+      asyncio 구간에서는 같은 이벤트 루프에서 함께 실행된 다른 코루틴의 CPU 사용량이 섞일 수 있다.
+    """
+
+    def __init__(self, enabled: bool = False, reservoir: int = 1024):
+        self.enabled = enabled
+        self.reservoir = reservoir
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._gauges: Dict[LabelKey, float] = {}
+        self._summaries: Dict[LabelKey, _Summary] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+    # ─────────────────────────────────────────────
+    # 기록
+    # ─────────────────────────────────────────────
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        k = _key(name, labels)
+        with self._lock:
+            self._counters[k] = self._counters.get(k, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        k = _key(name, labels)
+        with self._lock:
+            self._gauges[k] = value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        k = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(k)
+            if summary is None:
+                summary = self._summaries[k] = _Summary(self.reservoir)
+            summary.observe(value)
+
+    def stage(self, name: str, items: int = 0):
+        """스테이지 구간 측정 (with 문). 처리 건수는 items 또는 timer.add()로 기록"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name, items)
+
+    def _record_stage(self, name: str, wall: float, cpu: float, items: int, failed: bool = False):
+        self.observe("stage_seconds", wall, stage=name)
+        self.inc("stage_cpu_seconds_total", cpu, stage=name)
+        if items:
+            self.inc("stage_items_total", items, stage=name)
+        if failed:
+            self.inc("stage_errors_total", 1, stage=name)
+
+    def record_llm(self, model: str, seconds: float, usage=None, ok: bool = True, operation: str = "chat"):
+        """LLM 호출 1회 기록. usage는 OpenAI 응답의 usage 객체 또는 dict"""
+        if not self.enabled:
+            return
+        self.observe("llm_latency_seconds", seconds, model=model, operation=operation)
+        self.inc("llm_requests_total", 1, model=model, operation=operation, result="ok" if ok else "error")
+        if usage is not None:
+            for kind in ("prompt_tokens", "completion_tokens"):
+                n = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+                if n:
+                    self.inc("llm_tokens_total", n, model=model, kind=kind.split("_")[0])
+
+    def cache(self, name: str, hit: bool, n: int = 1):
+        if not self.enabled:
+            return
+        self.inc("cache_requests_total", n, cache=name, result="hit" if hit else "miss")
+
+    # ─────────────────────────────────────────────
+    # 내보내기
+    # ─────────────────────────────────────────────
+    def snapshot(self) -> Dict:
+        """JSON 직렬화 가능한 현재 값"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = {k: (s.count, s.total, s.quantiles()) for k, s in self._summaries.items()}
+
+        def flat(items):
+            return [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(items.items())]
+
+        hit_rates = {}
+        for (name, labels), value in counters.items():
+            if name != "cache_requests_total":
+                continue
+            lab = dict(labels)
+            rate = hit_rates.setdefault(lab["cache"], {"hit": 0, "miss": 0})
+            rate[lab["result"]] += value
+        for rate in hit_rates.values():
+            total = rate["hit"] + rate["miss"]
+            rate["hit_rate"] = round(rate["hit"] / total, 4) if total else 0.0
+
+        return {
+            "timestamp": time.time(),
+            "counters": flat(counters),
+            "gauges": flat(gauges),
+            "summaries": [
+                {"name": name, "labels": dict(labels), "count": count, "sum": total,
+                 "quantiles": {str(q): v for q, v in qs.items()}}
+                for (name, labels), (count, total, qs) in sorted(summaries.items())
+            ],
+            "cache_hit_rates": hit_rates,
+        }
+
+    def to_prometheus(self, prefix: str = "smart_assistant_") -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            summaries = sorted((k, (s.count, s.total, s.quantiles())) for k, s in self._summaries.items())
+
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {prefix}{name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{prefix}{name}{_fmt_labels(labels)} {value:g}")
+        for (name, labels), value in gauges:
+            header(name, "gauge")
+            lines.append(f"{prefix}{name}{_fmt_labels(labels)} {value:g}")
+        for (name, labels), (count, total, qs) in summaries:
+            header(name, "summary")
+            for q, v in qs.items():
+                lines.append(f"{prefix}{name}{_fmt_labels(labels, (('quantile', str(q)),))} {v:.6g}")
+            lines.append(f"{prefix}{name}_sum{_fmt_labels(labels)} {total:.6g}")
+            lines.append(f"{prefix}{name}_count{_fmt_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path) -> None:
+        """JSON 스냅샷을 파일로 저장 (임시 파일 → 교체)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot(), ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """/metrics (Prometheus), /metrics.json 을 제공하는 백그라운드 HTTP 서버 시작"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8")
+                    ctype = "application/json; charset=utf-8"
+                elif self.path.startswith("/metrics"):
+                    body = registry.to_prometheus().encode("utf-8")
+                    ctype = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"📈 메트릭 엔드포인트: http://{host}:{port}/metrics")
+        return self._server
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+# 프로세스 전역 레지스트리 (기본 비활성화, METRICS_CONFIG로 활성화)
+METRICS = MetricsRegistry()
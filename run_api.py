@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Smart Assistant 로컬 HTTP API 실행 스크립트
+data/assistant.db의 TODO/분석 결과를 읽기 전용으로 제공합니다. (기본: http://127.0.0.1:8765)
+"""
+import sys
+import os
+from pathlib import Path
+
+# Windows 한글 출력 설정
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    os.environ['PYTHONUTF8'] = '1'
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from services.api import main
+
+if __name__ == "__main__":
+    main()
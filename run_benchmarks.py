@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Smart Assistant 벤치마크 실행 스크립트
+합성 코퍼스(1k/10k/100k)로 주요 단계의 처리량을 측정하고, 기준선보다 느려지면 실패(exit 1)합니다.
+
+    python run_benchmarks.py                       # 측정 + benchmarks/baseline.json 대비 회귀 검사
+    python run_benchmarks.py --sizes 1000,10000    # 크기 지정
+    python run_benchmarks.py --update-baseline     # 현재 결과를 기준선으로 저장
+"""
+import sys
+import os
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+
+# Windows 한글 출력 설정
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    os.environ['PYTHONUTF8'] = '1'
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.suite import BENCHMARKS, DEFAULT_SIZES, run_suite, compare_to_baseline, load_json
+
+BENCH_DIR = project_root / "benchmarks"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart Assistant 벤치마크")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="메시지 수 (쉼표 구분)")
+    parser.add_argument("--only", default="", help=f"실행할 벤치마크 (쉼표 구분: {', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="크기별 반복 횟수 (최단 시간 사용, 100k는 1회)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="가짜 LLM 응답 지연(초)")
+    parser.add_argument("--baseline", default=str(BENCH_DIR / "baseline.json"))
+    parser.add_argument("--tolerance", type=float, default=0.3, help="허용 처리량 감소 비율 (기본 30%%)")
+    parser.add_argument("--output", default="", help="결과 JSON 경로 (기본 benchmarks/results/bench_<시각>.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준선으로 저장")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    names = [s.strip() for s in args.only.split(",") if s.strip()] or None
+    unknown = [n for n in names or [] if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"알 수 없는 벤치마크: {', '.join(unknown)}")
+
+    print("🏁 Smart Assistant 벤치마크")
+    print("=" * 60)
+    report = run_suite(sizes, names, repeat=args.repeat, llm_latency=args.llm_latency)
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    baseline = load_json(baseline_path)
+    if baseline and not args.update_baseline:
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+    report["regressions"] = regressions
+
+    output = Path(args.output) if args.output else \
+        BENCH_DIR / "results" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"💾 결과 저장: {output}")
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📌 기준선 갱신: {baseline_path}")
+        return 0
+
+    if baseline is None:
+        print(f"⚠️ 기준선 없음 ({baseline_path}) - 회귀 검사 생략")
+        return 0
+
+    if regressions:
+        print(f"❌ 처리량 회귀 {len(regressions)}건 (허용 {args.tolerance:.0%}):")
+        for r in regressions:
+            print(f"   - {r['benchmark']} n={r['size']}: {r['throughput']:.1f} msg/s "
+                  f"(기준 {r['baseline']:.1f}, {r['ratio']:.0%})")
+        return 1
+
+    print("✅ 기준선 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
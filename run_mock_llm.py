@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+OpenAI 호환 가짜 LLM 서버 실행 스크립트 (기본: http://127.0.0.1:8799/v1)
+API 키 없이 전체 파이프라인을 로컬에서 부하/장애 테스트할 때 사용합니다.
+
+    python run_mock_llm.py --latency-mean 0.5 --rate-429 0.05
+    LLM_PROVIDER=mock python run_scheduler.py --once
+"""
+import sys
+import os
+from pathlib import Path
+
+# Windows 한글 출력 설정
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    os.environ['PYTHONUTF8'] = '1'
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from services.mock_llm import main
+
+if __name__ == "__main__":
+    main()
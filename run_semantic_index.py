@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+메시지 이력 의미 검색 인덱스 색인/검색 스크립트 (data/faiss_index)
+
+    python run_semantic_index.py --backfill
+    python run_semantic_index.py --query "지난번 결제 오류 어떻게 처리했지"
+    python run_semantic_index.py --related <msg_id>
+"""
+import sys
+import os
+from pathlib import Path
+
+# Windows 한글 출력 설정
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    os.environ['PYTHONUTF8'] = '1'
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from store.semantic_index import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+Services 패키지 - GUI 없이 동작하는 백그라운드 서비스 (스케줄러 등)
+"""
+
+from .scheduler import SchedulerService
+
+__all__ = ['SchedulerService']
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 HTTP API - assistant.db에 저장된 TODO/분석 결과를 읽기 전용으로 제공
+NLP/LLM 작업은 전혀 실행하지 않으며, 결과는 GUI 또는 스케줄러(run_scheduler.py)가 채운다.
+
+- 페이지네이션: offset / limit
+- ETag / If-None-Match: 데이터 리비전이 바뀌지 않으면 캐시된 응답 재사용, 304 응답
+- /events: 새로 생성된 TODO를 SSE(Server-Sent Events)로 스트리밍
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from config.settings import API_CONFIG
+from store.sqlite_store import AssistantStore, get_store
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE = API_CONFIG.get("max_page_size", 200)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [h.strip() for h in header.split(",")]
+    return any(c == etag or c.removeprefix("W/") == etag for c in candidates)
+
+
+class CachedResponder:
+    """(요청 키, 데이터 리비전) 단위로 직렬화된 응답과 ETag를 캐시"""
+
+    def __init__(self, store: AssistantStore, max_entries: int = 1024):
+        self.store = store
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def respond(self, request: Request, key: str, build: Callable[[], Dict]) -> Response:
+        revision = self.store.revision()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+        if hit is None or hit[0] != revision:
+            payload = build()
+            payload["revision"] = revision
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            hit = (revision, etag, body)
+            with self._lock:
+                self._cache[key] = hit
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        _, etag, body = hit
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json; charset=utf-8", headers=headers)
+
+
+def _sse(event: str, data: Dict, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+def create_app(store: Optional[AssistantStore] = None) -> FastAPI:
+    store = store or get_store()
+    responder = CachedResponder(store)
+    app = FastAPI(title="Smart Assistant API", version="1.0")
+    app.state.store = store
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok", "revision": store.revision()}
+
+    @app.get("/todos")
+    def todos(request: Request,
+              offset: int = Query(0, ge=0),
+              limit: int = Query(50, ge=1, le=MAX_PAGE),
+              status: Optional[str] = None,
+              priority: Optional[str] = None):
+        key = f"todos|{offset}|{limit}|{status}|{priority}"
+        return responder.respond(request, key, lambda: {
+            "offset": offset, "limit": limit,
+            "items": store.query_todos(status=status, priority_level=priority, offset=offset, limit=limit),
+        })
+
+    @app.get("/messages")
+    def messages(request: Request,
+                 offset: int = Query(0, ge=0),
+                 limit: int = Query(50, ge=1, le=MAX_PAGE),
+                 priority: Optional[str] = None):
+        key = f"messages|{offset}|{limit}|{priority}"
+        return responder.respond(request, key, lambda: {
+            "offset": offset, "limit": limit,
+            "items": store.query_ranked_messages(priority_level=priority, offset=offset, limit=limit),
+        })
+
+    @app.get("/summaries")
+    def summaries(request: Request,
+                  offset: int = Query(0, ge=0),
+                  limit: int = Query(50, ge=1, le=MAX_PAGE)):
+        key = f"summaries|{offset}|{limit}"
+        return responder.respond(request, key, lambda: {
+            "offset": offset, "limit": limit,
+            "items": store.query_summaries(offset=offset, limit=limit),
+        })
+
+    @app.get("/report")
+    def report(request: Request):
+        def build():
+            cycle = store.latest_cycle() or {}
+            return {
+                "cycle_id": cycle.get("cycle_id"),
+                "finished_at": cycle.get("finished_at"),
+                "message_count": cycle.get("message_count"),
+                "todo_count": cycle.get("todo_count"),
+                "analysis_report_text": cycle.get("report_text") or "",
+            }
+        return responder.respond(request, "report", build)
+
+    @app.get("/events")
+    async def events(request: Request):
+        """새 실행(cycle)이 저장될 때마다 새로 생긴 TODO와 cycle 이벤트를 SSE로 전송"""
+        poll = API_CONFIG.get("sse_poll_interval", 1.0)
+
+        async def stream():
+            last = await asyncio.to_thread(store.latest_cycle_id)
+            yield f"retry: {int(poll * 3000)}\n\n"
+            while not await request.is_disconnected():
+                cycle_id = await asyncio.to_thread(store.latest_cycle_id)
+                if cycle_id > last:
+                    for cid in range(last + 1, cycle_id + 1):
+                        new_items = await asyncio.to_thread(
+                            store.query_todos, None, None, 0, MAX_PAGE, None, cid
+                        )
+                        for item in new_items:
+                            yield _sse("todo", item, event_id=f"{cid}:{item['todo_id']}")
+                        yield _sse("cycle", {"cycle_id": cid, "new_todos": len(new_items)}, event_id=str(cid))
+                    last = cycle_id
+                else:
+                    yield ": keep-alive\n\n"
+                await asyncio.sleep(poll)
+
+        return StreamingResponse(stream(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return app
+
+
+def main():
+    import uvicorn
+    uvicorn.run(create_app(), host=API_CONFIG["host"], port=API_CONFIG["port"], log_level="info")
+
+
+if __name__ == "__main__":
+    main()
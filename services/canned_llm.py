@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+가짜 LLM 응답 본문 - 프롬프트로 결정되는 요약 스키마 JSON (같은 입력 → 같은 출력)
+가짜 LLM 서버(services/mock_llm.py)와 프로세스 내 가짜 클라이언트(benchmarks/fake_llm.py)가 함께 쓴다.
+"""
+import hashlib
+import json
+import re
+from typing import Dict, List
+
+
+_PACK_ID = re.compile(r"^\[id: ([^\]]+)\]$", re.M)
+
+
+def _message_summary(text: str) -> Dict:
+    digest = hashlib.sha1(text.encode("utf-8")).digest()
+    urgency = ("high", "medium", "low")[digest[0] % 3]
+    return {
+        "summary": f"요약 {digest.hex()[:8]}",
+        "key_points": ["핵심 포인트 1", "핵심 포인트 2"],
+        "sentiment": ("positive", "neutral", "negative")[digest[1] % 3],
+        "urgency_level": urgency,
+        "action_required": urgency != "low",
+        "suggested_response": "",
+    }
+
+
+def fake_completion_text(messages: List[Dict]) -> str:
+    """
+    프롬프트 내용으로 결정되는 응답 JSON (같은 입력 → 같은 출력)
+    묶음 요약이면 {"items": [...]}, 대화 요약이면 summarize_conversation 스키마,
+    그 외에는 메시지 요약 스키마를 따른다.
+    """
+    prompt = messages[-1].get("content", "") if messages else ""
+    system = messages[0].get("content", "") if messages else ""
+
+    marks = list(_PACK_ID.finditer(prompt))
+    if marks:
+        items = []
+        for k, mark in enumerate(marks):
+            end = marks[k + 1].start() if k + 1 < len(marks) else len(prompt)
+            items.append({"id": mark.group(1), **_message_summary(prompt[mark.end():end].strip())})
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    digest = hashlib.sha1(prompt.encode("utf-8")).digest()
+    tag = digest.hex()[:8]
+
+    if "대화 요약" in system:
+        return json.dumps({
+            "summary": f"대화 요약 {tag}",
+            "key_points": [f"핵심 포인트 {i}" for i in range(1, 1 + digest[0] % 3 + 1)],
+            "decisions": [f"결정 사항 {tag}"] if digest[1] % 2 else [],
+            "unresolved": [f"미해결 항목 {tag}"] if digest[2] % 2 else [],
+            "risks": [],
+            "action_items": [{"title": f"후속 작업 {tag}", "owner": None, "due": None,
+                              "priority": ("High", "Medium", "Low")[digest[3] % 3]}],
+            "participants": [],
+        }, ensure_ascii=False)
+
+    return json.dumps(_message_summary(prompt), ensure_ascii=False)
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한글/영문 혼합 기준 2자당 1토큰)"""
+    return max(1, len(text) // 2)
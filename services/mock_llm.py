@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+OpenAI 호환 가짜 LLM 서버 - /v1/chat/completions
+실제 API 키 없이 동시성/재시도/캐시 동작을 시험하거나 파이프라인 전체에 부하를 걸 때 사용한다.
+
+- 응답 지연 분포: fixed | uniform | normal | lognormal | exponential
+- 스트리밍(stream=true): tokens_per_second 속도로 청크 전송 (SSE, data: [DONE] 종료)
+- 장애 주입: 429(Retry-After 포함) / 500 / 타임아웃(응답 지연) 비율
+- 응답 본문은 프롬프트로 결정되는 요약 스키마 JSON (services.canned_llm, benchmarks.fake_llm과 동일)
+
+LLM_CONFIG["provider"]를 "mock"으로 두면 MessageSummarizer가 이 서버를 사용한다.
+    LLM_PROVIDER=mock python run_gui.py
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from services.canned_llm import estimate_tokens, fake_completion_text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MockLLMConfig:
+    """가짜 서버 동작 설정 (실행 중 POST /_mock/config 로 변경 가능)"""
+    latency_dist: str = "lognormal"   # fixed | uniform | normal | lognormal | exponential
+    latency_mean: float = 0.8         # 평균 응답 지연(초)
+    latency_spread: float = 0.5       # uniform: ±폭, normal: 표준편차, lognormal: sigma
+    tokens_per_second: float = 80.0   # 스트리밍 출력 속도
+    rate_429: float = 0.0             # 429 Too Many Requests 비율
+    rate_500: float = 0.0             # 500 Internal Server Error 비율
+    rate_timeout: float = 0.0         # 응답하지 않고 timeout_seconds 동안 대기하는 비율
+    timeout_seconds: float = 120.0
+    retry_after: float = 1.0          # 429 응답의 Retry-After(초)
+    seed: int = 0                     # 0이면 매 실행 무작위
+
+    def update(self, data: Dict) -> None:
+        names = {f.name: f.type for f in fields(self)}
+        for key, value in data.items():
+            if key in names:
+                setattr(self, key, type(getattr(self, key))(value))
+
+
+class LatencyModel:
+    def __init__(self, config: MockLLMConfig):
+        self.config = config
+        self.rng = random.Random(config.seed or None)
+
+    def sample(self) -> float:
+        c = self.config
+        mean, spread = max(0.0, c.latency_mean), max(0.0, c.latency_spread)
+        if c.latency_dist == "fixed" or mean == 0:
+            value = mean
+        elif c.latency_dist == "uniform":
+            value = self.rng.uniform(mean - spread, mean + spread)
+        elif c.latency_dist == "normal":
+            value = self.rng.gauss(mean, spread)
+        elif c.latency_dist == "exponential":
+            value = self.rng.expovariate(1.0 / mean)
+        else:
+            # lognormal: 평균이 latency_mean이 되도록 mu 보정 (긴 꼬리 지연 재현)
+            mu = math.log(mean) - spread ** 2 / 2
+            value = self.rng.lognormvariate(mu, spread)
+        return max(0.0, value)
+
+    def fault(self) -> str:
+        """이번 요청에 주입할 장애 ('429' | '500' | 'timeout' | '')"""
+        c = self.config
+        r = self.rng.random()
+        for name, rate in (("429", c.rate_429), ("500", c.rate_500), ("timeout", c.rate_timeout)):
+            if r < rate:
+                return name
+            r -= rate
+        return ""
+
+
+def _error(status: int, message: str, err_type: str, headers: Dict = None) -> JSONResponse:
+    return JSONResponse(status_code=status, headers=headers or {},
+                        content={"error": {"message": message, "type": err_type, "code": status}})
+
+
+def _chunks(text: str, size: int = 4) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def create_app(config: MockLLMConfig = None) -> FastAPI:
+    config = config or MockLLMConfig()
+    model = LatencyModel(config)
+    stats = {"requests": 0, "ok": 0, "429": 0, "500": 0, "timeout": 0, "stream": 0, "in_flight": 0,
+             "max_in_flight": 0}
+    app = FastAPI(title="Smart Assistant Mock LLM", version="1.0")
+    app.state.config = config
+    app.state.stats = stats
+
+    @app.get("/v1/models")
+    def models():
+        return {"object": "list", "data": [{"id": "mock/summarizer", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/_mock/stats")
+    def get_stats():
+        return {**stats, "config": asdict(config)}
+
+    @app.post("/_mock/config")
+    async def set_config(request: Request):
+        config.update(await request.json())
+        model.rng.seed(config.seed or None)
+        return asdict(config)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        model_name = body.get("model") or "mock/summarizer"
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        streaming = False
+        try:
+            fault = model.fault()
+            delay = model.sample()
+            if fault == "timeout":
+                stats["timeout"] += 1
+                await asyncio.sleep(config.timeout_seconds)
+                return _error(504, "mock upstream timeout", "timeout")
+            if fault == "429":
+                stats["429"] += 1
+                await asyncio.sleep(min(delay, 0.05))
+                return _error(429, "Rate limit reached (mock)", "rate_limit_exceeded",
+                              headers={"Retry-After": f"{config.retry_after:g}"})
+            if fault == "500":
+                stats["500"] += 1
+                await asyncio.sleep(delay)
+                return _error(500, "Internal server error (mock)", "server_error")
+
+            text = fake_completion_text(messages)
+            prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": estimate_tokens(text),
+                     "total_tokens": prompt_tokens + estimate_tokens(text)}
+            completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+            created = int(time.time())
+
+            if body.get("stream"):
+                stats["stream"] += 1
+                # 응답 본문은 이 핸들러가 반환된 뒤에 전송되므로 in_flight 감소는 _stream이 끝날 때 한다
+                streaming = True
+                return StreamingResponse(
+                    _stream(completion_id, created, model_name, text, delay, config.tokens_per_second, usage,
+                            stats),
+                    media_type="text/event-stream",
+                )
+
+            await asyncio.sleep(delay)
+            stats["ok"] += 1
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model_name,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            }
+        finally:
+            if not streaming:
+                stats["in_flight"] -= 1
+
+    return app
+
+
+async def _stream(completion_id: str, created: int, model_name: str, text: str, first_token_delay: float,
+                  tokens_per_second: float, usage: Dict, stats: Dict):
+    def chunk(delta: Dict, finish=None, extra: Dict = None) -> str:
+        payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                   "model": model_name, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+        if extra:
+            payload.update(extra)
+        return "data: " + json.dumps(payload, ensure_ascii=False) + "\n\n"
+
+    try:
+        await asyncio.sleep(first_token_delay)
+        yield chunk({"role": "assistant", "content": ""})
+        interval = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+        for piece in _chunks(text):
+            if interval:
+                await asyncio.sleep(interval)
+            yield chunk({"content": piece})
+        yield chunk({}, finish="stop", extra={"usage": usage})
+        yield "data: [DONE]\n\n"
+        stats["ok"] += 1
+    finally:
+        stats["in_flight"] -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 가짜 LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    defaults = MockLLMConfig()
+    for f in fields(MockLLMConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(getattr(defaults, f.name)),
+                            default=getattr(defaults, f.name))
+    args = parser.parse_args()
+
+    config = MockLLMConfig(**{f.name: getattr(args, f.name) for f in fields(MockLLMConfig)})
+    print(f"🧪 가짜 LLM 서버: http://{args.host}:{args.port}/v1 ({config.latency_dist}, "
+          f"평균 {config.latency_mean}s, 429 {config.rate_429:.0%}, 500 {config.rate_500:.0%}, "
+          f"timeout {config.rate_timeout:.0%})")
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
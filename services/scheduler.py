@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+헤드리스 스케줄러 - SCHEDULER_CONFIG 주기로 수집/분석을 반복하고 결과를 assistant.db에 저장
+데스크톱 세션 없이 서버에서 상시 실행하는 용도 (asyncio 기반, 추가 의존성 없음)
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import signal
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from config.settings import SCHEDULER_CONFIG, METRICS_CONFIG
+from pipeline.metrics import METRICS
+from nlp.llm_client import close_clients
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerService:
+    """SmartAssistant를 주기적으로 실행하는 헤드리스 서비스"""
+
+    def __init__(self, email_config: Dict = None, messenger_config: Dict = None,
+                 config: Dict = None, assistant=None):
+        self.config = {**SCHEDULER_CONFIG, **(config or {})}
+        self.email_config = email_config
+        self.messenger_config = messenger_config
+        if assistant is None:
+            from main import SmartAssistant
+            assistant = SmartAssistant()
+        self.assistant = assistant
+
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks = []
+        self._jobs: Set[asyncio.Task] = set()  # 실행 중인 주기 작업 (참조를 잡아 두어야 GC로 사라지지 않음)
+        self._stopping = asyncio.Event()
+        self._initialized = False
+        self.last_cycle: Optional[Dict] = None
+
+    # ─────────────────────────────────────────────
+    # 작업
+    # ─────────────────────────────────────────────
+    async def run_cycle(self) -> Optional[Dict]:
+        """수집 → 분석 → TODO 생성 1회. 결과는 SmartAssistant가 assistant.db에 저장"""
+        if not self._initialized:
+            await self.assistant.initialize(self.email_config, self.messenger_config)
+            self._initialized = True
+
+        started = time.perf_counter()
+        try:
+            with METRICS.stage("cycle"):
+                messages = await self.assistant.collect_messages()
+                if not messages:
+                    logger.info("⏰ 수집된 메시지 없음 - 이번 주기 건너뜀")
+                    return None
+                results = await self.assistant.analyze_messages()
+                todo_list = await self.assistant.generate_todo_list(results)
+        finally:
+            await self.assistant.cleanup()
+            self._export_metrics()
+
+        self.last_cycle = {
+            "finished_at": datetime.now().isoformat(),
+            "elapsed_sec": round(time.perf_counter() - started, 3),
+            "messages": len(messages),
+            "todos": todo_list["total_items"],
+        }
+        routing = getattr(self.assistant, "routing_report", None)
+        if routing is not None and routing.items:
+            self.last_cycle["routing"] = routing.to_dict()
+        gate = getattr(self.assistant, "gate_report", None)
+        if gate is not None and gate.seen:
+            self.last_cycle["gate"] = gate.to_dict()
+            if gate.shadow_pending:
+                self._track(asyncio.ensure_future(self._update_gate(self.last_cycle, gate)))
+        coalesced = getattr(self.assistant, "coalesce_report", None)
+        if coalesced is not None and coalesced.coalesced:
+            self.last_cycle["coalesced"] = coalesced.to_dict()
+        logger.info(f"⏰ 주기 실행 완료: 메시지 {len(messages)}개, TODO {todo_list['total_items']}개 "
+                    f"({self.last_cycle['elapsed_sec']}초)")
+        return self.last_cycle
+
+    async def _update_gate(self, cycle: Dict, gate):
+        """섀도 측정이 끝나면 해당 주기 결과의 게이트 일치율 갱신"""
+        await self.assistant.wait_shadow()
+        cycle["gate"] = gate.to_dict()
+
+    def _export_metrics(self):
+        if not METRICS.enabled or not METRICS_CONFIG.get("snapshot_path"):
+            return
+        try:
+            METRICS.write_snapshot(METRICS_CONFIG["snapshot_path"])
+        except Exception as e:
+            logger.error(f"메트릭 스냅샷 저장 오류: {e}")
+
+    async def send_daily_reminder(self):
+        """마감이 임박했거나 우선순위가 높은 미완료 TODO 요약을 로그로 남김"""
+        db = self.assistant.db
+        if db is None:
+            return
+        today_end = datetime.now().replace(hour=23, minute=59, second=59).isoformat()
+        todos = await asyncio.to_thread(db.query_todos, "pending", None, 0, 200)
+        due = [t for t in todos if t.get("deadline") and t["deadline"] <= today_end]
+        high = [t for t in todos if t.get("priority") == "high" and t not in due]
+        logger.info(f"🔔 일일 리마인더: 오늘 마감 {len(due)}개, 높은 우선순위 {len(high)}개")
+        for t in (due + high)[:10]:
+            logger.info(f"   - [{(t.get('priority') or '').upper()}] {t.get('title')}"
+                        + (f" (마감 {t['deadline']})" if t.get("deadline") else ""))
+
+    async def run_cleanup(self):
+        """보관 기간이 지난 메시지/실행 이력 정리"""
+        db = self.assistant.db
+        if db is None:
+            return
+        removed = await asyncio.wrap_future(db.prune(self.config.get("retention_days", 30)))
+        logger.info(f"🧹 정리 완료: {removed}개 레코드 삭제")
+
+    # ─────────────────────────────────────────────
+    # 스케줄링
+    # ─────────────────────────────────────────────
+    async def _run_job(self, name: str, job: Callable[[], Awaitable]):
+        """같은 작업이 아직 실행 중이면 이번 회차는 건너뜀 (중복 실행 방지)"""
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        if lock.locked():
+            logger.warning(f"⏰ '{name}' 이전 실행이 아직 진행 중이라 이번 회차를 건너뜁니다.")
+            return
+        async with lock:
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"⏰ '{name}' 실행 오류: {e}")
+
+    def _jitter(self) -> float:
+        return random.uniform(0, self.config.get("jitter_seconds", 0))
+
+    async def _sleep(self, seconds: float) -> bool:
+        """stop() 되면 True 반환"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=max(0.0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _track(self, task: asyncio.Task):
+        """종료 시 기다렸다가 취소할 수 있도록 백그라운드 작업 참조 보관"""
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+
+    async def _every(self, name: str, interval: float, job: Callable[[], Awaitable], run_now: bool = True):
+        if run_now and await self._sleep(self._jitter()):
+            return
+        while not self._stopping.is_set():
+            if run_now:
+                # 실행이 주기보다 길어지면 다음 회차는 _run_job에서 건너뜀
+                self._track(asyncio.create_task(self._run_job(name, job)))
+            run_now = True
+            if await self._sleep(interval + self._jitter()):
+                return
+
+    async def _daily(self, name: str, at: str, job: Callable[[], Awaitable]):
+        hour, minute = (int(x) for x in at.split(":"))
+        while not self._stopping.is_set():
+            now = datetime.now()
+            target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target <= now:
+                target += timedelta(days=1)
+            if await self._sleep((target - now).total_seconds() + self._jitter()):
+                return
+            await self._run_job(name, job)
+
+    async def run_forever(self):
+        """스케줄러 실행 (stop() 또는 SIGINT/SIGTERM까지)"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows 등
+
+        logger.info(f"⏰ 스케줄러 시작: 수집 {self.config['email_poll_interval']}초, "
+                    f"리마인더 {self.config['daily_reminder_time']}, 정리 {self.config['cleanup_interval']}초")
+        self._tasks = [
+            asyncio.create_task(self._every("cycle", self.config["email_poll_interval"], self.run_cycle)),
+            asyncio.create_task(self._daily("reminder", self.config["daily_reminder_time"], self.send_daily_reminder)),
+            asyncio.create_task(self._every("cleanup", self.config["cleanup_interval"], self.run_cleanup, run_now=False)),
+        ]
+        await self._stopping.wait()
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # 진행 중인 작업은 shutdown_grace_seconds까지 기다린 뒤 남은 것만 취소
+        jobs = list(self._jobs)
+        if jobs:
+            logger.info(f"⏰ 진행 중인 작업 {len(jobs)}개 종료 대기...")
+            _, pending = await asyncio.wait(jobs, timeout=self.config.get("shutdown_grace_seconds", 60))
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            if pending:
+                logger.warning(f"⏰ 제한 시간 안에 끝나지 않은 작업 {len(pending)}개 취소")
+        logger.info("⏰ 스케줄러 종료")
+
+    def stop(self):
+        self._stopping.set()
+
+
+def _email_config_from_env() -> Optional[Dict]:
+    email = os.getenv("EMAIL_ADDRESS")
+    password = os.getenv("EMAIL_PASSWORD")
+    if not email or not password:
+        return None
+    return {"email": email, "password": password, "provider": os.getenv("EMAIL_PROVIDER", "naver")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart Assistant 헤드리스 스케줄러")
+    parser.add_argument("--once", action="store_true", help="수집/분석을 1회만 실행하고 종료")
+    parser.add_argument("--no-email", action="store_true", help="이메일 수집 비활성화")
+    args = parser.parse_args()
+
+    email_config = None if args.no_email else _email_config_from_env()
+    messenger_config = {
+        "source": "sqlite",
+        "sqlite": {"db_path": "data/messenger/messages.db"},
+        "use_simulator": False,
+    }
+
+    async def _run():
+        service = SchedulerService(email_config, messenger_config)
+        if METRICS.enabled and METRICS_CONFIG.get("port"):
+            METRICS.serve(METRICS_CONFIG["port"])
+        if args.once:
+            await service.run_cycle()
+            await service.assistant.wait_shadow()
+        else:
+            await service.run_forever()
+        service.assistant.close()
+        await close_clients()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Store 패키지 - 분석 결과/메시지 저장소
+"""
+
+from .analysis_store import AnalysisStore, AnalysisEntry
+from .sqlite_store import AssistantStore, get_store
+from .semantic_index import SemanticIndex
+
+__all__ = ['AnalysisStore', 'AnalysisEntry', 'AssistantStore', 'get_store', 'SemanticIndex']
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+분석 결과 저장소 - 메시지 내용 해시 기준으로 우선순위/요약/액션 결과를 보관
+동일한 메시지는 다시 분석(LLM 호출)하지 않도록 증분 분석에 사용
+"""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AnalysisEntry:
+    """메시지 1건의 분석 결과 묶음 (None = 아직 계산 안 됨)"""
+    priority: Any = None           # PriorityScore
+    summary: Any = None            # MessageSummary
+    actions: Optional[List] = None  # List[ActionItem]
+    meta: Dict = field(default_factory=dict)
+
+
+class AnalysisStore:
+    """
+    내용 해시 → AnalysisEntry (LRU 상한이 있는 메모리 저장소)
+    backend(AssistantStore)가 주어지면 update()는 write-through, preload()로 일괄 로드
+    """
+
+    def __init__(self, max_entries: int = 20000, backend=None):
+        self.max_entries = max_entries
+        self.backend = backend
+        self._entries: "OrderedDict[str, AnalysisEntry]" = OrderedDict()
+        self._aggregates: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_key(message: Dict, model: str = "", prompt_version: str = "") -> str:
+        """(sender, subject, body, model, prompt version) 기반의 안정적인 해시 키"""
+        body = message.get("body") or message.get("content") or ""
+        payload = [
+            (message.get("sender") or "").strip(),
+            (message.get("subject") or "").strip(),
+            body.strip(),
+            model or "",
+            prompt_version or "",
+        ]
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def aggregate_key(*parts: str) -> str:
+        """여러 메시지/텍스트를 묶은 집계 결과(대화 요약, 전체 요약 등)용 키"""
+        raw = "\x1f".join(p or "" for p in parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def preload(self, keys) -> int:
+        """메모리에 없는 키를 backend에서 일괄 로드. 로드한 개수 반환"""
+        if self.backend is None:
+            return 0
+        missing = [k for k in keys if k not in self._entries]
+        if not missing:
+            return 0
+        try:
+            loaded = self.backend.load_analysis(missing)
+        except Exception as e:
+            logger.error(f"분석 결과 로드 오류: {e}")
+            return 0
+        for k, entry in loaded.items():
+            self._entries[k] = entry
+        self._evict(self._entries)
+        return len(loaded)
+
+    def get(self, key: str) -> Optional[AnalysisEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def entry(self, key: str) -> AnalysisEntry:
+        """항목 조회, 없으면 빈 항목 생성"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = AnalysisEntry()
+            self._entries[key] = entry
+            self._evict(self._entries)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def update(self, key: str, **fields) -> AnalysisEntry:
+        entry = self.entry(key)
+        for name, value in fields.items():
+            setattr(entry, name, value)
+        if self.backend is not None:
+            persisted = {k: v for k, v in fields.items() if k in ("priority", "summary", "actions")}
+            if persisted:
+                self.backend.save_analysis(key, **persisted)
+        return entry
+
+    def get_aggregate(self, kind: str, key: str) -> Any:
+        value = self._aggregates.get(f"{kind}:{key}")
+        if value is not None:
+            self._aggregates.move_to_end(f"{kind}:{key}")
+        elif self.backend is not None:
+            try:
+                value = self.backend.load_aggregate(kind, key)
+            except Exception as e:
+                logger.error(f"집계 결과 로드 오류: {e}")
+            if value is not None:
+                self._aggregates[f"{kind}:{key}"] = value
+        return value
+
+    def put_aggregate(self, kind: str, key: str, value: Any):
+        self._aggregates[f"{kind}:{key}"] = value
+        self._aggregates.move_to_end(f"{kind}:{key}")
+        self._evict(self._aggregates, limit=256)
+        if self.backend is not None:
+            self.backend.save_aggregate(kind, key, value)
+
+    def _evict(self, table: OrderedDict, limit: Optional[int] = None):
+        limit = limit or self.max_entries
+        while len(table) > limit:
+            table.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self._aggregates.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
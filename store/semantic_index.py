@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+메시지 이력 의미 검색 인덱스 (FAISS)
+
+- 임베딩: 로컬 CPU 모델(sentence-transformers, LLM_CONFIG["embedding_model"])로 묶음 단위 계산
+  패키지가 없으면 글자 bigram 해시 임베딩으로 대체 (의미 유사도보다는 어휘 유사도에 가까움)
+- 벡터는 L2 정규화 → 내적(IndexFlatIP / HNSW inner product) = 코사인 유사도
+- 인덱스: 작을 때는 Flat(정확한 전수 비교), hnsw_threshold를 넘으면 HNSW로 한 번 재구성
+  → 수년치 이력에서도 검색 1건이 수 ms
+- 증분 추가: 이미 색인한 msg_id는 건너뛰고 새 메시지만 임베딩/추가
+- 파일 저장은 인덱스 전체를 다시 쓰므로 매번 하지 않고, 저장 후 새 벡터가 save_min_new개 이상 쌓였거나
+  save_interval_seconds가 지났을 때, 그리고 close() 때 한다. (HNSW 전환 직후에는 바로 저장)
+  메타는 추가할 때마다 커밋하고, 다시 열 때 파일에 없는 vid(마지막 저장 이후 추가분)의 메타를 지워 다시 색인되게 한다.
+- 저장 위치: FAISS_INDEX_PATH/index.faiss (벡터), FAISS_INDEX_PATH/meta.db (msg_id/방/발신자/미리보기)
+- 임베딩 모델이 바뀌면 (벡터 공간이 달라지므로) 인덱스를 비우고 다시 쌓는다.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+from config.settings import FAISS_INDEX_PATH, LLM_CONFIG, SEMANTIC_INDEX_CONFIG
+from nlp.extractive import tokenize
+from pipeline.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS info (
+  key   TEXT PRIMARY KEY,
+  value TEXT
+);
+CREATE TABLE IF NOT EXISTS vectors (
+  vid     INTEGER PRIMARY KEY,
+  msg_id  TEXT UNIQUE,
+  room    TEXT,
+  sender  TEXT,
+  subject TEXT,
+  date    TEXT,
+  preview TEXT
+);
+"""
+
+
+def _text_of(message: Dict) -> str:
+    subject = (message.get("subject") or "").strip()
+    body = (message.get("content") or message.get("body") or "").strip()
+    return f"{subject}\n{body}" if subject else body
+
+
+# ─────────────────────────────────────────────
+# 임베딩
+# ─────────────────────────────────────────────
+class SentenceTransformerEmbedder:
+    """sentence-transformers 로컬 모델 (CPU, 첫 사용 시 로드)"""
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 64):
+        self.name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                logger.info(f"🧠 임베딩 모델 로드: {self.name} ({self.device})")
+                self._model = SentenceTransformer(self.name, device=self.device)
+            return self._model
+
+    @property
+    def dim(self) -> int:
+        return int(self.model.get_sentence_embedding_dimension())
+
+    def encode(self, texts: Sequence[str]) -> "np.ndarray":
+        vectors = self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+class HashingEmbedder:
+    """sentence-transformers가 없을 때 쓰는 해시 임베딩 (extractive.tokenize 토큰 → 고정 차원, 부호 해시)"""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-bigram-{dim}"
+
+    def encode(self, texts: Sequence[str]) -> "np.ndarray":
+        rows, cols, vals = [], [], []
+        for i, text in enumerate(texts):
+            for token in tokenize(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                rows.append(i)
+                cols.append(h % self.dim)
+                vals.append(1.0 if h & 0x80000000 else -1.0)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(out, (np.asarray(rows), np.asarray(cols)), np.asarray(vals, dtype=np.float32))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms > 0, norms, 1.0)
+
+
+def get_embedder(model_name: Optional[str] = None, batch_size: int = 64):
+    model_name = model_name or LLM_CONFIG.get("embedding_model")
+    if SentenceTransformer is not None and model_name:
+        return SentenceTransformerEmbedder(model_name, device=SEMANTIC_INDEX_CONFIG.get("device", "cpu"),
+                                           batch_size=batch_size)
+    logger.warning("sentence-transformers 패키지가 없어 해시 임베딩으로 동작합니다. (어휘 기반 유사도)")
+    return HashingEmbedder(SEMANTIC_INDEX_CONFIG.get("hashing_dim", 512))
+
+
+# ─────────────────────────────────────────────
+# 검색 결과
+# ─────────────────────────────────────────────
+@dataclass
+class SimilarMessage:
+    """의미 검색 결과 1건"""
+    msg_id: str
+    score: float      # 코사인 유사도 (1에 가까울수록 비슷함)
+    room: str = ""
+    sender: str = ""
+    subject: str = ""
+    date: str = ""
+    preview: str = ""
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class SemanticIndex:
+    """FAISS 기반 메시지 의미 검색 인덱스"""
+
+    def __init__(self, path: Optional[Path] = None, embedder=None,
+                 hnsw_threshold: Optional[int] = None, batch_size: Optional[int] = None):
+        self.path = Path(path or FAISS_INDEX_PATH)
+        self.batch_size = batch_size or SEMANTIC_INDEX_CONFIG.get("embed_batch_size", 64)
+        self.hnsw_threshold = hnsw_threshold or SEMANTIC_INDEX_CONFIG.get("hnsw_threshold", 20000)
+        self.preview_chars = SEMANTIC_INDEX_CONFIG.get("preview_chars", 200)
+        self.save_min_new = SEMANTIC_INDEX_CONFIG.get("save_min_new", 2000)
+        self.save_interval = SEMANTIC_INDEX_CONFIG.get("save_interval_seconds", 600)
+        self.is_available = faiss is not None and np is not None
+        self.index = None
+        self._next_vid = 0
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._unsaved = 0  # 마지막 파일 저장 이후 추가한 벡터 수
+        self._saved_at = time.monotonic()
+
+        if not self.is_available:
+            logger.warning("faiss/numpy 패키지가 없어 의미 검색 인덱스를 사용하지 않습니다.")
+            return
+
+        self.embedder = embedder or get_embedder(batch_size=self.batch_size)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path / "meta.db", timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA_SQL)
+        self._conn.commit()
+        self._open()
+
+    # ─────────────────────────────────────────────
+    # 인덱스 파일 / 메타
+    # ─────────────────────────────────────────────
+    @property
+    def index_file(self) -> Path:
+        return self.path / "index.faiss"
+
+    def _info(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_info(self, key: str, value) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _open(self):
+        if self._info("model") == self.embedder.name and self.index_file.exists():
+            try:
+                self.index = faiss.read_index(str(self.index_file))
+                self._tune(self.index)
+                ids = faiss.vector_to_array(self.index.id_map)
+                saved = int(ids.max()) if len(ids) else -1
+                # 마지막 저장 이후 추가분(파일에 없는 vid)은 메타에서 지워 다음 add_messages에서 다시 색인
+                dropped = self._conn.execute("DELETE FROM vectors WHERE vid > ?", (saved,)).rowcount
+                self._conn.commit()
+                if dropped:
+                    logger.info(f"🔎 저장되지 않은 {dropped}개 메타를 지움 (다시 색인됨)")
+                self._next_vid = saved + 1
+                logger.info(f"🔎 의미 검색 인덱스 로드: {self.index.ntotal}개 ({self._info('kind')})")
+                return
+            except Exception as e:
+                logger.error(f"의미 검색 인덱스 로드 오류, 새로 만듭니다: {e}")
+        self._reset()
+
+    def _reset(self):
+        """빈 Flat 인덱스로 초기화 (메타도 비움)"""
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedder.dim))
+        self._next_vid = 0
+        self._conn.execute("DELETE FROM vectors")
+        self._set_info("model", self.embedder.name)
+        self._set_info("kind", "flat")
+        self._conn.commit()
+        if self.index_file.exists():
+            self.index_file.unlink()
+
+    def _tune(self, index):
+        inner = faiss.downcast_index(index.index)
+        if isinstance(inner, faiss.IndexHNSWFlat):
+            inner.hnsw.efSearch = SEMANTIC_INDEX_CONFIG.get("hnsw_ef_search", 64)
+
+    def _maybe_upgrade(self):
+        """벡터 수가 임계값을 넘으면 Flat → HNSW로 재구성 (같은 vid 유지)"""
+        if self._info("kind") != "flat" or self.index.ntotal < self.hnsw_threshold:
+            return
+        with METRICS.stage("semantic_index.upgrade", items=self.index.ntotal):
+            ids = faiss.vector_to_array(self.index.id_map).astype(np.int64)
+            vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+            hnsw = faiss.IndexHNSWFlat(self.embedder.dim, SEMANTIC_INDEX_CONFIG.get("hnsw_m", 32),
+                                       faiss.METRIC_INNER_PRODUCT)
+            hnsw.hnsw.efConstruction = SEMANTIC_INDEX_CONFIG.get("hnsw_ef_construction", 40)
+            index = faiss.IndexIDMap2(hnsw)
+            index.add_with_ids(vectors, ids)
+            self._tune(index)
+        self.index = index
+        # 파일을 먼저 쓰고 kind를 커밋 (중간에 종료되면 다음 실행에서 다시 전환할 뿐)
+        self.save()
+        self._set_info("kind", "hnsw")
+        self._conn.commit()
+        logger.info(f"🔎 의미 검색 인덱스를 HNSW로 전환 ({index.ntotal}개)")
+
+    def save(self):
+        """인덱스 전체를 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            if self.index is None:
+                return
+            with METRICS.stage("semantic_index.save", items=self.index.ntotal):
+                tmp = self.index_file.with_suffix(".tmp")
+                faiss.write_index(self.index, str(tmp))
+                os.replace(tmp, self.index_file)
+            self._unsaved = 0
+            self._saved_at = time.monotonic()
+
+    def _maybe_save(self):
+        """새 벡터가 충분히 쌓였거나 저장 간격이 지났을 때만 저장"""
+        if self._unsaved and (self._unsaved >= self.save_min_new
+                              or time.monotonic() - self._saved_at >= self.save_interval):
+            self.save()
+
+    def __len__(self) -> int:
+        return self.index.ntotal if self.index is not None else 0
+
+    def close(self):
+        """남은 추가분을 저장하고 메타 연결을 닫음 (프로세스 종료 시)"""
+        with self._lock:
+            if self._unsaved:
+                self.save()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ─────────────────────────────────────────────
+    # 추가
+    # ─────────────────────────────────────────────
+    def _known(self, msg_ids: List[str]) -> set:
+        known = set()
+        for i in range(0, len(msg_ids), 500):
+            part = msg_ids[i:i + 500]
+            q = f"SELECT msg_id FROM vectors WHERE msg_id IN ({','.join('?' * len(part))})"
+            known.update(r["msg_id"] for r in self._conn.execute(q, part))
+        return known
+
+    def add_messages(self, messages: Iterable[Dict]) -> int:
+        """아직 색인하지 않은 메시지만 묶음 단위로 임베딩해 추가. 반환: 새로 추가한 수"""
+        if not self.is_available:
+            return 0
+        with self._lock:
+            pending: Dict[str, Dict] = {}
+            for m in messages:
+                if m.get("msg_id") and _text_of(m):
+                    pending.setdefault(m["msg_id"], m)
+            known = self._known(list(pending))
+            new = [m for mid, m in pending.items() if mid not in known]
+            METRICS.cache("semantic_index", True, len(known))
+            METRICS.cache("semantic_index", False, len(new))
+            if not new:
+                return 0
+
+            with METRICS.stage("semantic_index.add", items=len(new)):
+                # 임베딩은 묶음 단위, 인덱스 추가는 한 번에 (HNSW는 큰 묶음으로 넣어야 병렬로 구성됨)
+                vectors = np.concatenate([self.embedder.encode([_text_of(m) for m in new[i:i + self.batch_size]])
+                                          for i in range(0, len(new), self.batch_size)])
+                vids = np.arange(self._next_vid, self._next_vid + len(new), dtype=np.int64)
+                self.index.add_with_ids(vectors, vids)
+                self._conn.executemany(
+                    "INSERT INTO vectors (vid, msg_id, room, sender, subject, date, preview) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(int(v), m["msg_id"], m.get("room") or m.get("platform") or "", m.get("sender") or "",
+                      m.get("subject") or "", m.get("date") or "",
+                      (m.get("content") or m.get("body") or "")[:self.preview_chars])
+                     for v, m in zip(vids, new)])
+                self._next_vid += len(new)
+                self._conn.commit()
+                self._unsaved += len(new)
+                self._maybe_upgrade()
+                self._maybe_save()
+
+            logger.info(f"🔎 의미 검색 인덱스에 {len(new)}개 추가 (총 {self.index.ntotal}개)")
+            return len(new)
+
+    def backfill(self, store, page_size: int = 1000) -> int:
+        """assistant.db(AssistantStore)에 쌓인 과거 메시지 전체를 색인"""
+        added, offset = 0, 0
+        while True:
+            rows = store.query_messages(offset=offset, limit=page_size)
+            if not rows:
+                return added
+            added += self.add_messages(rows)
+            offset += len(rows)
+
+    # ─────────────────────────────────────────────
+    # 검색
+    # ─────────────────────────────────────────────
+    def _search(self, vector: "np.ndarray", k: int, exclude: Optional[str] = None,
+                before: Optional[str] = None, min_score: float = 0.0) -> List[SimilarMessage]:
+        if self.index is None or self.index.ntotal == 0 or k <= 0:
+            return []
+        # 제외/시각 조건으로 걸러지면 더 많이 가져와 다시 거름 (최대 4회)
+        fetch = k + 1
+        vector = vector.reshape(1, -1).astype(np.float32)
+        for _ in range(4):
+            fetch = min(self.index.ntotal, fetch)
+            scores, vids = self.index.search(vector, fetch)
+            out = self._collect(scores[0], vids[0], k, exclude, before, min_score)
+            if len(out) >= k or fetch >= self.index.ntotal or scores[0][-1] < min_score:
+                return out
+            fetch *= 8
+        return out
+
+    def _collect(self, scores, vids, k: int, exclude: Optional[str], before: Optional[str],
+                 min_score: float) -> List[SimilarMessage]:
+        hits = [(int(v), float(s)) for v, s in zip(vids, scores) if v >= 0 and s >= min_score]
+        if not hits:
+            return []
+        meta: Dict[int, sqlite3.Row] = {}
+        for i in range(0, len(hits), 500):
+            part = [v for v, _ in hits[i:i + 500]]
+            q = f"SELECT * FROM vectors WHERE vid IN ({','.join('?' * len(part))})"
+            meta.update((r["vid"], r) for r in self._conn.execute(q, part))
+        out = []
+        for vid, score in hits:
+            row = meta.get(vid)
+            if row is None or row["msg_id"] == exclude or (before and row["date"] and row["date"] >= before):
+                continue
+            out.append(SimilarMessage(msg_id=row["msg_id"], score=round(score, 4), room=row["room"],
+                                      sender=row["sender"], subject=row["subject"], date=row["date"],
+                                      preview=row["preview"]))
+            if len(out) >= k:
+                break
+        return out
+
+    def search_similar(self, text: str, k: int = 5, min_score: float = 0.0) -> List[SimilarMessage]:
+        """자연어 질의와 의미가 가까운 과거 메시지 k개 (유사도 내림차순)"""
+        if not self.is_available or not (text or "").strip():
+            return []
+        with METRICS.stage("semantic_index.search"):
+            vector = self.embedder.encode([text])[0]
+            with self._lock:
+                return self._search(vector, k, min_score=min_score)
+
+    def related_history(self, msg_id: str, k: int = 5, message: Optional[Dict] = None,
+                        min_score: float = 0.0) -> List[SimilarMessage]:
+        """
+        msg_id 메시지와 관련된 과거(그 메시지보다 이전) 메시지 k개
+        색인된 메시지는 저장된 벡터를 그대로 쓰고, 아니면 message 본문을 임베딩한다.
+        """
+        if not self.is_available:
+            return []
+        with METRICS.stage("semantic_index.related"):
+            with self._lock:
+                row = self._conn.execute("SELECT vid, date FROM vectors WHERE msg_id = ?", (msg_id,)).fetchone()
+                if row is not None:
+                    vector = self.index.reconstruct(int(row["vid"]))
+                    return self._search(vector, k, exclude=msg_id, before=row["date"] or None, min_score=min_score)
+            if not message or not _text_of(message):
+                return []
+            vector = self.embedder.encode([_text_of(message)])[0]
+            with self._lock:
+                return self._search(vector, k, exclude=msg_id, before=message.get("date") or None,
+                                    min_score=min_score)
+
+
+def main():
+    """색인 채우기 / 검색 CLI (run_semantic_index.py)"""
+    from store.sqlite_store import get_store
+
+    parser = argparse.ArgumentParser(description="메시지 이력 의미 검색 인덱스")
+    parser.add_argument("--backfill", action="store_true", help="assistant.db의 과거 메시지 전체 색인")
+    parser.add_argument("--query", help="질의와 비슷한 메시지 검색")
+    parser.add_argument("--related", metavar="MSG_ID", help="해당 메시지와 관련된 과거 메시지 검색")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    index = SemanticIndex()
+    if not index.is_available:
+        return
+    store = get_store()
+    if args.backfill:
+        print(f"새로 색인: {index.backfill(store)}개 (총 {len(index)}개)")
+    if args.query:
+        hits = index.search_similar(args.query, k=args.k)
+    elif args.related:
+        hits = index.related_history(args.related, k=args.k, message=store.get_message(args.related))
+    else:
+        hits = []
+    for h in hits:
+        print(f"{h.score:.3f}  [{h.room}] {h.date} {h.sender}: {h.preview[:80]}")
+    store.close()
+    index.close()
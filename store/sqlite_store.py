@@ -0,0 +1,556 @@
+# -*- coding: utf-8 -*-
+"""
+assistant.db 저장소 - 메시지/분석 결과/TODO/실행 이력을 SQLite에 영구 저장
+- WAL 모드: 쓰는 동안에도 다른 스레드/프로세스(GUI, 스케줄러, API)가 읽을 수 있음
+- 쓰기는 단일 writer 스레드가 큐에서 꺼내 묶음 커밋 (작업마다 SAVEPOINT → 실패한 작업만 되돌림)
+  프로세스 안에서는 get_store()로 DB 파일당 저장소(= writer 스레드) 1개를 공유
+- 쓰기가 커밋될 때마다 info 테이블의 revision이 1씩 증가 (API ETag)
+- 읽기는 스레드별 연결 사용
+"""
+import hashlib
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.settings import DATABASE_PATH
+from store.analysis_store import AnalysisEntry
+from nlp.summarize import MessageSummary
+from nlp.priority_ranker import PriorityScore
+from nlp.action_extractor import ActionItem
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS messages (
+  msg_id       TEXT PRIMARY KEY,
+  content_key  TEXT,
+  platform     TEXT,
+  room         TEXT,
+  type         TEXT,
+  sender       TEXT,
+  subject      TEXT,
+  body         TEXT,
+  date         TEXT,
+  collected_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_platform_date ON messages(platform, date);
+CREATE INDEX IF NOT EXISTS idx_messages_content_key ON messages(content_key);
+
+CREATE TABLE IF NOT EXISTS priority_scores (
+  content_key    TEXT PRIMARY KEY,
+  overall_score  REAL,
+  priority_level TEXT,
+  data           TEXT NOT NULL,
+  updated_at     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_priority_scores_score ON priority_scores(overall_score);
+
+CREATE TABLE IF NOT EXISTS summaries (
+  content_key     TEXT PRIMARY KEY,
+  summary         TEXT,
+  urgency_level   TEXT,
+  action_required INTEGER,
+  data            TEXT NOT NULL,
+  updated_at      TEXT
+);
+
+-- 액션 추출 완료 표시 (추출 결과가 0개인 메시지도 다시 추출하지 않도록)
+CREATE TABLE IF NOT EXISTS action_extractions (
+  content_key  TEXT PRIMARY KEY,
+  action_count INTEGER,
+  extracted_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS actions (
+  content_key TEXT,
+  seq         INTEGER,
+  action_type TEXT,
+  priority    TEXT,
+  deadline    TEXT,
+  data        TEXT NOT NULL,
+  PRIMARY KEY (content_key, seq)
+);
+
+-- 여러 메시지를 묶은 집계 결과 (전체 요약, 대화 요약 등)
+CREATE TABLE IF NOT EXISTS aggregates (
+  kind       TEXT,
+  agg_key    TEXT,
+  data       TEXT NOT NULL,
+  updated_at TEXT,
+  PRIMARY KEY (kind, agg_key)
+);
+
+-- 대화방별 누적 요약 + 워터마크 (다음 실행은 워터마크 이후 메시지만 반영)
+CREATE TABLE IF NOT EXISTS room_summaries (
+  room       TEXT PRIMARY KEY,
+  data       TEXT NOT NULL,
+  watermark  TEXT,
+  updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS todos (
+  todo_id         TEXT PRIMARY KEY,
+  source_msg_id   TEXT,
+  title           TEXT,
+  description     TEXT,
+  priority_level  TEXT,
+  deadline        TEXT,
+  requester       TEXT,
+  type            TEXT,
+  status          TEXT DEFAULT 'pending',
+  data            TEXT NOT NULL,
+  created_at      TEXT,
+  updated_at      TEXT,
+  first_seen_cycle INTEGER,
+  last_seen_cycle INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_todos_priority_deadline ON todos(priority_level, deadline);
+CREATE INDEX IF NOT EXISTS idx_todos_status ON todos(status);
+CREATE INDEX IF NOT EXISTS idx_todos_updated ON todos(updated_at);
+
+-- 저장소 메타 정보 (revision: 쓰기 커밋마다 증가)
+CREATE TABLE IF NOT EXISTS info (
+  key   TEXT PRIMARY KEY,
+  value TEXT
+);
+INSERT OR IGNORE INTO info (key, value) VALUES ('revision', '0');
+
+CREATE TABLE IF NOT EXISTS cycles (
+  cycle_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+  started_at    TEXT,
+  finished_at   TEXT,
+  message_count INTEGER,
+  todo_count    INTEGER,
+  report_text   TEXT,
+  todo_list     TEXT
+);
+"""
+
+# 기존 DB에 없을 수 있는 컬럼 (table, column, type)
+_MIGRATIONS = [
+    ("todos", "first_seen_cycle", "INTEGER"),
+]
+
+_STOP = object()
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+def todo_id_for(item: Dict) -> str:
+    """TODO 아이템의 안정적인 ID (같은 메시지의 같은 액션이면 실행마다 동일)"""
+    src = (item.get("source_message") or {}).get("id") or ""
+    raw = "\x1f".join([src, item.get("type") or "", item.get("title") or "", item.get("description") or ""])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class AssistantStore:
+    """assistant.db 영구 저장소"""
+
+    def __init__(self, db_path: Optional[Path] = None, batch_size: int = 200):
+        self.db_path = Path(db_path or DATABASE_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+
+        self._local = threading.local()
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._refs = 1          # get_store()가 돌려준 핸들 수 (마지막 close()에서 writer 종료)
+        self._closed = False
+        self._state_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._init_error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._writer_loop, name="assistant-db-writer", daemon=True)
+        self._writer.start()
+        self._ready.wait()
+        if self._init_error is not None:
+            raise self._init_error
+
+    # ─────────────────────────────────────────────
+    # 연결 / writer 스레드
+    # ─────────────────────────────────────────────
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _writer_loop(self):
+        try:
+            conn = self._connect()
+            conn.executescript(SCHEMA_SQL)
+            for table, column, col_type in _MIGRATIONS:
+                cols = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in cols:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+            conn.commit()
+        except BaseException as e:
+            self._init_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while True:
+            job = self._jobs.get()
+            batch = [job]
+            # 쌓여 있는 쓰기를 한 트랜잭션으로 묶어 커밋
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            done = []
+            changed = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                fn, fut, bump = item
+                # 작업 하나가 중간에 실패하면 그 작업이 실행한 문장만 되돌림 (묶음의 다른 작업은 커밋)
+                conn.execute("SAVEPOINT job")
+                try:
+                    value = fn(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    logger.error(f"assistant.db 쓰기 오류: {e}")
+                    fut.set_exception(e)
+                    continue
+                conn.execute("RELEASE job")
+                done.append((fut, value))
+                changed = changed or bump
+            try:
+                if changed:
+                    conn.execute("UPDATE info SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision'")
+                conn.commit()
+                for fut, value in done:
+                    fut.set_result(value)
+            except Exception as e:
+                logger.error(f"assistant.db 커밋 오류: {e}")
+                for fut, _ in done:
+                    fut.set_exception(e)
+            if stop:
+                conn.close()
+                return
+
+    def _write(self, fn: Callable[[sqlite3.Connection], Any], bump: bool = True) -> Future:
+        fut: Future = Future()
+        with self._state_lock:
+            if self._closed:
+                raise RuntimeError(f"assistant.db 저장소가 이미 닫혔습니다: {self.db_path}")
+            self._jobs.put((fn, fut, bump))
+        return fut
+
+    def flush(self, timeout: Optional[float] = None):
+        """지금까지 요청된 쓰기가 모두 커밋될 때까지 대기"""
+        self._write(lambda conn: None, bump=False).result(timeout)
+
+    def close(self):
+        """핸들 1개 반납. get_store()로 받은 핸들이 모두 닫혀야 writer를 멈추고 저장소를 닫는다"""
+        with _STORES_LOCK:
+            with self._state_lock:
+                if self._closed:
+                    return
+                self._refs -= 1
+                if self._refs > 0:
+                    return
+                self._closed = True
+                self._jobs.put(_STOP)
+            if _STORES.get(self.db_path.resolve()) is self:
+                del _STORES[self.db_path.resolve()]
+        if self._writer.is_alive():
+            self._writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ─────────────────────────────────────────────
+    # 메시지
+    # ─────────────────────────────────────────────
+    def save_messages(self, messages: List[Dict], keys: Optional[Dict[str, str]] = None) -> Future:
+        """수집된 메시지 저장 (keys: msg_id → content_key)"""
+        keys = keys or {}
+        now = _now()
+        rows = [(
+            m.get("msg_id"), keys.get(m.get("msg_id")), m.get("platform"), m.get("room"), m.get("type"),
+            m.get("sender"), m.get("subject"), m.get("body") or m.get("content"), m.get("date"), now,
+        ) for m in messages if m.get("msg_id")]
+
+        def _do(conn):
+            conn.executemany("""
+                INSERT INTO messages (msg_id, content_key, platform, room, type, sender, subject, body, date, collected_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(msg_id) DO UPDATE SET
+                  content_key=excluded.content_key, platform=excluded.platform, room=excluded.room,
+                  type=excluded.type, sender=excluded.sender, subject=excluded.subject,
+                  body=excluded.body, date=excluded.date
+            """, rows)
+            return len(rows)
+        return self._write(_do)
+
+    def query_messages(self, platform: Optional[str] = None, since: Optional[str] = None,
+                       offset: int = 0, limit: int = 100) -> List[Dict]:
+        q = "SELECT * FROM messages WHERE 1=1"
+        params: List[Any] = []
+        if platform:
+            q += " AND platform = ?"; params.append(platform)
+        if since:
+            q += " AND date >= ?"; params.append(since)
+        q += " ORDER BY date DESC LIMIT ? OFFSET ?"; params += [limit, offset]
+        return [dict(r) for r in self._reader().execute(q, params)]
+
+    def query_ranked_messages(self, priority_level: Optional[str] = None,
+                              offset: int = 0, limit: int = 100) -> List[Dict]:
+        """우선순위 점수 순으로 정렬된 메시지 (점수가 계산된 메시지만)"""
+        q = """SELECT m.*, p.overall_score, p.priority_level, p.data AS priority
+               FROM messages m JOIN priority_scores p ON p.content_key = m.content_key WHERE 1=1"""
+        params: List[Any] = []
+        if priority_level:
+            q += " AND p.priority_level = ?"; params.append(priority_level)
+        q += " ORDER BY p.overall_score DESC, m.date DESC LIMIT ? OFFSET ?"; params += [limit, offset]
+        out = []
+        for r in self._reader().execute(q, params):
+            row = dict(r)
+            row["priority"] = json.loads(row["priority"])
+            out.append(row)
+        return out
+
+    def query_summaries(self, offset: int = 0, limit: int = 100) -> List[Dict]:
+        """최근 메시지 순 요약 목록"""
+        q = """SELECT m.msg_id, m.sender, m.subject, m.platform, m.date, s.data AS summary
+               FROM messages m JOIN summaries s ON s.content_key = m.content_key
+               ORDER BY m.date DESC LIMIT ? OFFSET ?"""
+        out = []
+        for r in self._reader().execute(q, (limit, offset)):
+            row = dict(r)
+            row["summary"] = json.loads(row["summary"])
+            out.append(row)
+        return out
+
+    def get_message(self, msg_id: str) -> Optional[Dict]:
+        row = self._reader().execute("SELECT * FROM messages WHERE msg_id = ?", (msg_id,)).fetchone()
+        return dict(row) if row else None
+
+    # ─────────────────────────────────────────────
+    # 분석 결과 (content_key 기준)
+    # ─────────────────────────────────────────────
+    def save_analysis(self, content_key: str, priority: Optional[PriorityScore] = None,
+                      summary: Optional[MessageSummary] = None,
+                      actions: Optional[List[ActionItem]] = None) -> Future:
+        now = _now()
+
+        def _do(conn):
+            if priority is not None:
+                conn.execute("""
+                    INSERT OR REPLACE INTO priority_scores (content_key, overall_score, priority_level, data, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (content_key, priority.overall_score, priority.priority_level, _dumps(priority.to_dict()), now))
+            if summary is not None:
+                conn.execute("""
+                    INSERT OR REPLACE INTO summaries (content_key, summary, urgency_level, action_required, data, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (content_key, summary.summary, summary.urgency_level, int(bool(summary.action_required)),
+                      _dumps(summary.to_dict()), now))
+            if actions is not None:
+                conn.execute("DELETE FROM actions WHERE content_key = ?", (content_key,))
+                conn.executemany("""
+                    INSERT INTO actions (content_key, seq, action_type, priority, deadline, data)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [(content_key, i, a.action_type, a.priority, a.deadline.isoformat() if a.deadline else None,
+                       _dumps(a.to_dict())) for i, a in enumerate(actions)])
+                conn.execute("""
+                    INSERT OR REPLACE INTO action_extractions (content_key, action_count, extracted_at)
+                    VALUES (?, ?, ?)
+                """, (content_key, len(actions), now))
+        return self._write(_do)
+
+    def load_analysis(self, content_keys: Iterable[str]) -> Dict[str, AnalysisEntry]:
+        """content_key 목록에 대해 저장된 분석 결과를 일괄 로드"""
+        keys = list(dict.fromkeys(content_keys))
+        entries: Dict[str, AnalysisEntry] = {}
+        conn = self._reader()
+
+        def _entry(k):
+            if k not in entries:
+                entries[k] = AnalysisEntry()
+            return entries[k]
+
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for r in conn.execute(f"SELECT content_key, data FROM priority_scores WHERE content_key IN ({marks})", chunk):
+                _entry(r["content_key"]).priority = PriorityScore.from_dict(json.loads(r["data"]))
+            for r in conn.execute(f"SELECT content_key, data FROM summaries WHERE content_key IN ({marks})", chunk):
+                _entry(r["content_key"]).summary = MessageSummary.from_dict(json.loads(r["data"]))
+            for r in conn.execute(f"SELECT content_key FROM action_extractions WHERE content_key IN ({marks})", chunk):
+                _entry(r["content_key"]).actions = []
+            for r in conn.execute(
+                f"SELECT content_key, data FROM actions WHERE content_key IN ({marks}) ORDER BY content_key, seq", chunk
+            ):
+                entry = _entry(r["content_key"])
+                if entry.actions is None:
+                    entry.actions = []
+                entry.actions.append(ActionItem.from_dict(json.loads(r["data"])))
+        return entries
+
+    def save_aggregate(self, kind: str, agg_key: str, value: Any) -> Future:
+        return self._write(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO aggregates (kind, agg_key, data, updated_at) VALUES (?, ?, ?, ?)",
+            (kind, agg_key, _dumps(value), _now())
+        ))
+
+    def load_aggregate(self, kind: str, agg_key: str) -> Any:
+        row = self._reader().execute(
+            "SELECT data FROM aggregates WHERE kind = ? AND agg_key = ?", (kind, agg_key)
+        ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def save_room_summary(self, room: str, state: Dict) -> Future:
+        return self._write(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO room_summaries (room, data, watermark, updated_at) VALUES (?, ?, ?, ?)",
+            (room, _dumps(state), state.get("watermark"), _now())
+        ))
+
+    def load_room_summaries(self) -> Dict[str, Dict]:
+        rows = self._reader().execute("SELECT room, data FROM room_summaries").fetchall()
+        return {r["room"]: json.loads(r["data"]) for r in rows}
+
+    # ─────────────────────────────────────────────
+    # TODO / 실행 이력
+    # ─────────────────────────────────────────────
+    def save_cycle(self, todo_list: Dict, todo_items: List[Dict], report_text: str = "",
+                   message_count: int = 0, started_at: Optional[str] = None) -> Future:
+        """분석 1회 실행 결과 저장. TODO는 상태(status)를 보존하며 upsert. cycle_id를 반환"""
+        now = _now()
+
+        def _do(conn):
+            cur = conn.execute("""
+                INSERT INTO cycles (started_at, finished_at, message_count, todo_count, report_text, todo_list)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (started_at or now, now, message_count, len(todo_items), report_text, _dumps(todo_list)))
+            cycle_id = cur.lastrowid
+            conn.executemany("""
+                INSERT INTO todos (todo_id, source_msg_id, title, description, priority_level, deadline,
+                                   requester, type, status, data, created_at, updated_at,
+                                   first_seen_cycle, last_seen_cycle)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(todo_id) DO UPDATE SET
+                  title=excluded.title, description=excluded.description,
+                  priority_level=excluded.priority_level, deadline=excluded.deadline,
+                  requester=excluded.requester, type=excluded.type, data=excluded.data,
+                  updated_at=excluded.updated_at, last_seen_cycle=excluded.last_seen_cycle
+            """, [(
+                todo_id_for(it), (it.get("source_message") or {}).get("id"), it.get("title"), it.get("description"),
+                it.get("priority"), it.get("deadline"), it.get("requester"), it.get("type"),
+                it.get("status") or "pending", _dumps(it), it.get("created_at") or now, now, cycle_id, cycle_id,
+            ) for it in todo_items])
+            return cycle_id
+        return self._write(_do)
+
+    def latest_cycle_id(self) -> int:
+        row = self._reader().execute("SELECT MAX(cycle_id) AS c FROM cycles").fetchone()
+        return row["c"] or 0
+
+    def latest_cycle(self) -> Optional[Dict]:
+        row = self._reader().execute("SELECT * FROM cycles ORDER BY cycle_id DESC LIMIT 1").fetchone()
+        if not row:
+            return None
+        cycle = dict(row)
+        cycle["todo_list"] = json.loads(cycle["todo_list"]) if cycle.get("todo_list") else None
+        return cycle
+
+    def query_todos(self, status: Optional[str] = None, priority_level: Optional[str] = None,
+                    offset: int = 0, limit: int = 50, cycle_id: Optional[int] = None,
+                    first_seen_cycle: Optional[int] = None) -> List[Dict]:
+        q = "SELECT todo_id, status, last_seen_cycle, data FROM todos WHERE 1=1"
+        params: List[Any] = []
+        if status:
+            q += " AND status = ?"; params.append(status)
+        if priority_level:
+            q += " AND priority_level = ?"; params.append(priority_level)
+        if cycle_id is not None:
+            q += " AND last_seen_cycle = ?"; params.append(cycle_id)
+        if first_seen_cycle is not None:
+            q += " AND first_seen_cycle = ?"; params.append(first_seen_cycle)
+        q += """ ORDER BY CASE priority_level WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END,
+                 deadline IS NULL, deadline LIMIT ? OFFSET ?"""
+        params += [limit, offset]
+        out = []
+        for r in self._reader().execute(q, params):
+            item = json.loads(r["data"])
+            item["todo_id"] = r["todo_id"]
+            item["status"] = r["status"]
+            out.append(item)
+        return out
+
+    def revision(self) -> str:
+        """데이터 변경 여부 판단용 리비전 (쓰기 커밋마다 증가, 다른 프로세스의 쓰기도 반영)"""
+        row = self._reader().execute("SELECT value FROM info WHERE key = 'revision'").fetchone()
+        return str(row["value"]) if row else "0"
+
+    def set_todo_status(self, todo_id: str, status: str) -> Future:
+        return self._write(lambda conn: conn.execute(
+            "UPDATE todos SET status = ?, updated_at = ? WHERE todo_id = ?", (status, _now(), todo_id)
+        ).rowcount)
+
+    def prune(self, keep_days: int = 30) -> Future:
+        """오래된 메시지/실행 이력 정리 (완료되지 않은 TODO는 유지)"""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat()
+
+        def _do(conn):
+            removed = conn.execute("DELETE FROM messages WHERE collected_at < ?", (cutoff,)).rowcount
+            removed += conn.execute("DELETE FROM cycles WHERE finished_at < ? AND cycle_id < (SELECT MAX(cycle_id) FROM cycles)",
+                                    (cutoff,)).rowcount
+            removed += conn.execute("DELETE FROM todos WHERE status = 'done' AND updated_at < ?", (cutoff,)).rowcount
+            removed += conn.execute("DELETE FROM aggregates WHERE updated_at < ?", (cutoff,)).rowcount
+            # 남은 메시지가 참조하지 않는 분석 결과 (같은 트랜잭션에서 함께 삭제)
+            for table in ("priority_scores", "summaries", "action_extractions", "actions"):
+                removed += conn.execute(
+                    f"DELETE FROM {table} WHERE content_key NOT IN "
+                    f"(SELECT content_key FROM messages WHERE content_key IS NOT NULL)"
+                ).rowcount
+            return removed
+        return self._write(_do)
+
+
+_STORES: Dict[Path, AssistantStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(db_path: Optional[Path] = None) -> AssistantStore:
+    """
+    DB 파일별 프로세스 공용 저장소 (GUI/스케줄러/API가 한 프로세스에서 writer 스레드 1개를 공유)
+    호출할 때마다 참조 수가 늘고, 받은 쪽이 각자 close()하면 마지막 close()에서 실제로 닫힌다.
+    """
+    path = Path(db_path or DATABASE_PATH).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is not None:
+            with store._state_lock:
+                if not store._closed and store._writer.is_alive():
+                    store._refs += 1
+                    return store
+        store = _STORES[path] = AssistantStore(path)
+        return store
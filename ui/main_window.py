@@ -4,8 +4,8 @@ Smart Assistant 메인 GUI 윈도우
 """
 import sys
 import os
-import asyncio
 import json
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -37,6 +37,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from main import SmartAssistant
+from nlp.llm_client import run_in_llm_loop
 
 
 class WorkerThread(QThread):
@@ -45,6 +46,8 @@ class WorkerThread(QThread):
     status_updated = pyqtSignal(str)
     result_ready = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
+    analysis_partial = pyqtSignal(str)  # 스트리밍 중인 분석 탭 텍스트
+    PARTIAL_INTERVAL = 0.1  # 중간 텍스트 전송 최소 간격(초)
     
     def __init__(self, assistant, email_config, messenger_config):
         super().__init__()
@@ -55,17 +58,15 @@ class WorkerThread(QThread):
     
     def run(self):
         try:
-            # 비동기 작업을 동기적으로 실행
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # 비동기 작업은 프로세스 공용 장수 루프에서 실행 (실행마다 새 루프를 만들지 않아 LLM 연결 재사용)
             
             self.status_updated.emit("시스템 초기화 중...")
-            loop.run_until_complete(self.assistant.initialize(self.email_config, self.messenger_config))
+            run_in_llm_loop(self.assistant.initialize(self.email_config, self.messenger_config))
             
             self.status_updated.emit("메시지 수집 중...")
             self.progress_updated.emit(20)
             
-            messages = loop.run_until_complete(self.assistant.collect_messages(10, 10))
+            messages = run_in_llm_loop(self.assistant.collect_messages(10, 10))
             
             if not messages:
                 self.error_occurred.emit("수집된 메시지가 없습니다.")
@@ -74,12 +75,26 @@ class WorkerThread(QThread):
             self.status_updated.emit("AI 분석 중...")
             self.progress_updated.emit(50)
             
-            analysis_results = loop.run_until_complete(self.assistant.analyze_messages())
+            # 메시지별 분석이 끝날 때마다 진행률(50~80%) 갱신
+            def on_result(_result, done, total):
+                self.progress_updated.emit(50 + int(30 * done / max(total, 1)))
+
+            # 개요/대화 요약이 스트리밍되는 동안 분석 탭을 채움 (GUI가 밀리지 않게 간격 제한)
+            last_partial = [0.0]
+
+            def on_partial(text):
+                now = time.monotonic()
+                if now - last_partial[0] >= self.PARTIAL_INTERVAL:
+                    last_partial[0] = now
+                    self.analysis_partial.emit(text)
+
+            analysis_results = run_in_llm_loop(
+                self.assistant.analyze_messages(on_result=on_result, on_partial=on_partial))
             
             self.status_updated.emit("TODO 리스트 생성 중...")
             self.progress_updated.emit(80)
             
-            todo_list = loop.run_until_complete(self.assistant.generate_todo_list(analysis_results))
+            todo_list = run_in_llm_loop(self.assistant.generate_todo_list(analysis_results))
             
             self.progress_updated.emit(100)
             self.status_updated.emit("완료")
@@ -96,8 +111,6 @@ class WorkerThread(QThread):
             
         except Exception as e:
             self.error_occurred.emit(f"오류 발생: {str(e)}")
-        finally:
-            loop.close()
     
     def stop(self):
         self._should_stop = True
@@ -296,6 +309,7 @@ class SmartAssistantGUI(QMainWindow):
         
         self.init_ui()
         self.setup_timers()
+        self.restore_last_result()
     
     def init_ui(self):
         """UI 초기화"""
@@ -696,6 +710,7 @@ class SmartAssistantGUI(QMainWindow):
         self.worker_thread = WorkerThread(self.assistant, self.email_config, self.messenger_config)
         self.worker_thread.progress_updated.connect(self.progress_bar.setValue)
         self.worker_thread.status_updated.connect(self.status_message.setText)
+        self.worker_thread.analysis_partial.connect(self.analysis_text.setPlainText)
         self.worker_thread.result_ready.connect(self.handle_result)
         self.worker_thread.error_occurred.connect(self.handle_error)
         self.worker_thread.start()
@@ -815,8 +830,19 @@ class SmartAssistantGUI(QMainWindow):
         QMessageBox.information(self, "저장", "결과 저장 기능은 향후 구현될 예정입니다.")
     
     def load_results(self):
-        """결과 불러오기"""
-        QMessageBox.information(self, "불러오기", "결과 불러오기 기능은 향후 구현될 예정입니다.")
+        """결과 불러오기 (assistant.db의 마지막 실행 결과)"""
+        if not self.restore_last_result():
+            QMessageBox.information(self, "불러오기", "저장된 실행 결과가 없습니다.")
+
+    def restore_last_result(self) -> bool:
+        """assistant.db에 저장된 마지막 결과로 화면 복원"""
+        last = self.assistant.load_last_result()
+        if not last or not last.get("todo_list"):
+            return False
+        self.update_todo_list(last["todo_list"].get("items", []))
+        self.update_analysis_tab(last.get("report_text"), None)
+        self.status_bar.showMessage(f"마지막 실행 결과 불러옴 ({last.get('finished_at', '')[:19]})")
+        return True
     
     def show_about(self):
         """정보 표시"""
@@ -832,6 +858,7 @@ class SmartAssistantGUI(QMainWindow):
         if self.worker_thread and self.worker_thread.isRunning():
             self.worker_thread.stop()
             self.worker_thread.wait(3000)
+        self.assistant.close()
         
         event.accept()
 
@@ -4,7 +4,6 @@
 """
 import os
 import json
-import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -21,6 +20,7 @@ from ingestors.messenger_adapter import MessengerAdapter
 from nlp.summarize import MessageSummarizer
 from nlp.priority_ranker import PriorityRanker
 from nlp.action_extractor import ActionExtractor
+from nlp.llm_client import run_in_llm_loop
 
 
 class OfflineCleanupWorker(QThread):
@@ -42,11 +42,8 @@ class OfflineCleanupWorker(QThread):
             messenger_config = {"use_simulator": True}
             adapter = MessengerAdapter(messenger_config)
             
-            # 비동기 작업 실행
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            messages = loop.run_until_complete(
+            # 비동기 작업은 프로세스 공용 장수 루프에서 실행 (LLM 연결 재사용)
+            messages = run_in_llm_loop(
                 adapter.get_all_unread_messages(self.cleanup_config.get("message_limit", 20))
             )
             
@@ -78,19 +75,19 @@ class OfflineCleanupWorker(QThread):
             
             self.progress_updated.emit(50)
             
-            summaries = loop.run_until_complete(
+            summaries = run_in_llm_loop(
                 summarizer.batch_summarize(message_data)
             )
             
             self.progress_updated.emit(70)
             
-            ranked = loop.run_until_complete(
+            ranked = run_in_llm_loop(
                 ranker.rank_messages(message_data)
             )
             
             self.progress_updated.emit(90)
             
-            actions = loop.run_until_complete(
+            actions = run_in_llm_loop(
                 extractor.batch_extract_actions(message_data)
             )
             
@@ -108,8 +105,6 @@ class OfflineCleanupWorker(QThread):
             self.status_updated.emit("오프라인 정리 완료")
             self.result_ready.emit(cleanup_result)
             
-            loop.close()
-            
         except Exception as e:
             self.error_occurred.emit(f"오프라인 정리 오류: {str(e)}")
 